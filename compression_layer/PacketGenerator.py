@@ -1,6 +1,8 @@
 import struct
 import binascii
 
+from SCHC_Checksum import SCHC_Checksum
+
 
 class PacketGenerator:
     def __init__(self):
@@ -76,8 +78,10 @@ class PacketGenerator:
         udp_length_bf = struct.pack('>H', udp_length)
 
         # Calculating UDP checksum
-        ipv6_pseudo_header = PacketGenerator.build_pseudo_header(ipv6_source_address, ipv6_destination_address, ipv6_next_header, udp_length)
-        udp_checksum_bf = PacketGenerator.checksum(ipv6_pseudo_header, udp_length, udp_source_port, udp_destination_port, udp_data)
+        ipv6_pseudo_header = SCHC_Checksum.pseudo_header_sum(int(ipv6_source_address[:16], 16), int(ipv6_source_address[16:], 16),
+                                                             int(ipv6_destination_address[:16], 16), int(ipv6_destination_address[16:], 16),
+                                                             ipv6_next_header)
+        udp_checksum_bf = struct.pack('>H', SCHC_Checksum.udp_checksum(ipv6_pseudo_header, udp_length, udp_source_port, udp_destination_port, udp_data_bf))
 
         # Creating UDP packet
         udp_packet = b''.join([udp_source_port_bf, udp_destination_port_bf, udp_length_bf, udp_checksum_bf, udp_data_bf])
@@ -93,37 +97,3 @@ class PacketGenerator:
         print("Packet IPv6: " + str(binascii.hexlify(headers_and_data)))
         print("Lenght: " + str(len(headers_and_data)) + " bytes")
         return (headers_and_data, udp_data_bf, headers)
-
-    @staticmethod
-    def checksum(pseudo_header, udp_length, udp_source_port, udp_destination_port, udp_data):
-        if (len(udp_data)%4) == 3:
-            udp_data = udp_data + '0'
-        elif (len(udp_data)%4) == 2:
-            udp_data = udp_data + '00'
-        elif (len(udp_data)%4) == 1:
-            udp_data = udp_data + '000'
-
-        udp_data_sum = 0
-        for i in range(0, int(len(udp_data) // 4) ):
-            udp_data_sum = int(udp_data[i * 4:i * 4 + 4], 16) + udp_data_sum
-
-        sum_udp = udp_source_port + udp_destination_port + udp_length + udp_data_sum
-        sum_total = pseudo_header + sum_udp
-        sum_sup = sum_total & 0xFFFF0000
-        sum_inf = sum_total & 0x0000FFFF
-        sum_final = (sum_sup >> 16) + sum_inf
-        result = sum_final ^ int('FFFF', 16)
-        return struct.pack('>H', result)
-
-    @staticmethod
-    def build_pseudo_header(src_ip, dest_ip, next_header, payload_len):
-        sum_ipv6_sa = 0
-        for i in range(0,int(len(src_ip)//4)):
-            sum_ipv6_sa = int(src_ip[i*4:i*4+4],16) + sum_ipv6_sa
-
-        sum_ipv6_da = 0
-        for i in range(0,int(len(dest_ip)//4)):
-            sum_ipv6_da = int(dest_ip[i*4:i*4+4],16) + sum_ipv6_da
-
-        sum_phdr = sum_ipv6_sa + sum_ipv6_da + next_header + payload_len
-        return sum_phdr
@@ -0,0 +1,70 @@
+class BitWriter:
+    """
+    Writes fields of arbitrary width (most significant bit first) into an integer accumulator.
+    The same writer can be reused for several packets calling reset().
+    """
+
+    def __init__(self):
+        self.value = 0
+        self.length = 0
+
+    def reset(self, value=0, length=0):
+        """Starts again from the length bits of value (nothing written by default)"""
+        self.value = value
+        self.length = length
+
+    def write(self, value, length):
+        """Appends the length least significant bits of value"""
+        self.value = (self.value << length) | (value & ((1 << length) - 1))
+        self.length += length
+
+    def to_bytes(self, payload=b''):
+        """
+        Returns the written bits followed by payload (bytes-like), padded with zeros up to a whole
+        number of bytes, and the number of padding bits added at the end.
+        The payload is spliced in with a single shift, its bytes are never shifted one by one.
+        """
+        payload_length = len(payload) * 8
+        total = self.length + payload_length
+        padding = -total % 8
+        value = ((self.value << payload_length) | int.from_bytes(payload, "big")) << padding
+        return value.to_bytes((total + padding) // 8, "big"), padding
+
+
+class BitReader:
+    """
+    Reads fields of arbitrary width (most significant bit first) from a bytes-like object.
+    Data is accessed through a memoryview, so reading never copies the packet.
+    """
+
+    def __init__(self, data, offset=0):
+        self.data = memoryview(data)
+        self.offset = offset  # in bits
+
+    def read(self, length):
+        """Reads the next length bits as an unsigned integer"""
+        if length == 0:
+            return 0
+        if self.offset + length > len(self.data) * 8:
+            raise ValueError('Truncated residue ', self.offset + length)
+        start = self.offset >> 3
+        end = (self.offset + length + 7) >> 3
+        self.offset += length
+        window = int.from_bytes(self.data[start:end], "big")
+        return (window >> ((end << 3) - self.offset)) & ((1 << length) - 1)
+
+    def remaining(self):
+        """
+        Returns the whole bytes left after the current offset, bits that do not complete
+        a byte are padding and are discarded.
+        When the offset is on a byte boundary this is a memoryview slice (no copy), otherwise
+        the remaining bytes are realigned with one integer shift.
+        """
+        start = self.offset >> 3
+        shift = self.offset & 7
+        if shift == 0:
+            return self.data[start:]
+        rest = self.data[start:]
+        length = len(rest) - 1
+        value = int.from_bytes(rest, "big") >> (8 - shift)
+        return (value & ((1 << (length * 8)) - 1)).to_bytes(length, "big")
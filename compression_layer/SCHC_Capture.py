@@ -0,0 +1,189 @@
+import mmap
+import struct
+
+
+class CaptureReader:
+    """
+    Iterates over the IPv6 packets of a pcap, pcapng or raw IPv6 file (packets one after the other).
+    The file is mapped in memory and read lazily, only the packet being yielded is copied.
+    Frames that do not carry IPv6 are skipped.
+    """
+    LINKTYPE_ETHERNET = 1
+    LINKTYPE_RAW = 101
+    LINKTYPE_LINUX_SLL = 113
+    LINKTYPE_IPV6 = 229
+
+    PCAP_MAGICS = {
+        b'\xd4\xc3\xb2\xa1': ("<", 1e-6),
+        b'\xa1\xb2\xc3\xd4': (">", 1e-6),
+        b'\x4d\x3c\xb2\xa1': ("<", 1e-9),
+        b'\xa1\xb2\x3c\x4d': (">", 1e-9)
+    }
+    PCAPNG_MAGIC = b'\x0a\x0d\x0d\x0a'
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        """Yields (timestamp, packet) tuples, timestamp in seconds (0 for raw files)"""
+        with open(self.path, "rb") as capture:
+            try:
+                data = mmap.mmap(capture.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return
+            with data:
+                magic = data[:4]
+                if magic in self.PCAP_MAGICS:
+                    yield from self.read_pcap(data)
+                elif magic == self.PCAPNG_MAGIC:
+                    yield from self.read_pcapng(data)
+                else:
+                    yield from self.read_raw(data)
+
+    @staticmethod
+    def ip_packet(linktype, frame):
+        """IPv6 packet carried by a frame of the given link type, None if there is none"""
+        if linktype == CaptureReader.LINKTYPE_ETHERNET:
+            ethertype, offset = struct.unpack_from(">H", frame, 12)[0], 14
+            while ethertype == 0x8100 and len(frame) >= offset + 4:  # 802.1Q tags
+                ethertype, offset = struct.unpack_from(">H", frame, offset + 2)[0], offset + 4
+            if ethertype != 0x86DD:
+                return None
+            frame = frame[offset:]
+        elif linktype == CaptureReader.LINKTYPE_LINUX_SLL:
+            if struct.unpack_from(">H", frame, 14)[0] != 0x86DD:
+                return None
+            frame = frame[16:]
+        elif linktype != CaptureReader.LINKTYPE_RAW and linktype != CaptureReader.LINKTYPE_IPV6:
+            return None
+        if len(frame) == 0 or frame[0] >> 4 != 6:
+            return None
+        return frame
+
+    def read_pcap(self, data):
+        endian, resolution = self.PCAP_MAGICS[data[:4]]
+        linktype = struct.unpack_from(endian + "I", data, 20)[0] & 0x0FFFFFFF
+        record = struct.Struct(endian + "IIII")
+        offset = 24
+        while offset + record.size <= len(data):
+            seconds, fraction, captured, _ = record.unpack_from(data, offset)
+            offset += record.size
+            frame = data[offset:offset + captured]
+            offset += captured
+            packet = self.ip_packet(linktype, frame)
+            if packet is not None:
+                yield seconds + fraction * resolution, packet
+
+    @staticmethod
+    def interface_resolution(data, start, end, endian):
+        """Timestamp resolution (in seconds) set by the if_tsresol option of an interface description"""
+        while start + 4 <= end:
+            code, length = struct.unpack_from(endian + "HH", data, start)
+            if code == 0:  # opt_endofopt
+                break
+            if code == 9 and length >= 1:  # if_tsresol: 2^-n if the most significant bit is set, 10^-n otherwise
+                tsresol = data[start + 4]
+                return 2.0 ** -(tsresol & 0x7F) if tsresol & 0x80 else 10.0 ** -tsresol
+            start += 4 + length + -length % 4
+        return 1e-6
+
+    def read_pcapng(self, data):
+        endian = "<"
+        # (link type, timestamp resolution) of the interfaces of the current section, by interface ID
+        interfaces = []
+        offset = 0
+        while offset + 12 <= len(data):
+            block_type = data[offset:offset + 4]
+            if block_type == self.PCAPNG_MAGIC:
+                # Section header: the byte order magic sets the endianness of the section
+                endian = "<" if data[offset + 8:offset + 12] == b'\x4d\x3c\x2b\x1a' else ">"
+                interfaces = []
+            block_type, length = struct.unpack_from(endian + "II", data, offset)
+            if length < 12:
+                break
+            body = offset + 8
+            if block_type == 1:  # Interface description
+                interfaces.append((struct.unpack_from(endian + "H", data, body)[0],
+                                   self.interface_resolution(data, body + 8, offset + length - 4, endian)))
+            elif block_type == 6:  # Enhanced packet
+                interface, high, low, captured, _ = struct.unpack_from(endian + "IIIII", data, body)
+                if interface >= len(interfaces):
+                    raise ValueError('Enhanced packet block of an undescribed interface ', interface)
+                linktype, resolution = interfaces[interface]
+                packet = self.ip_packet(linktype, data[body + 20:body + 20 + captured])
+                if packet is not None:
+                    yield ((high << 32) | low) * resolution, packet
+            elif block_type == 3:  # Simple packet, always from the first interface
+                if len(interfaces) == 0:
+                    raise ValueError('Simple packet block without an interface description ', offset)
+                captured = min(struct.unpack_from(endian + "I", data, body)[0], length - 16)
+                packet = self.ip_packet(interfaces[0][0], data[body + 4:body + 4 + captured])
+                if packet is not None:
+                    yield 0, packet
+            offset += length
+
+    def read_raw(self, data):
+        offset = 0
+        while offset + 40 <= len(data) and data[offset] >> 4 == 6:
+            end = offset + 40 + struct.unpack_from(">H", data, offset + 4)[0]
+            if end > len(data):
+                break
+            yield 0, data[offset:end]
+            offset = end
+
+
+class CaptureWriter:
+    """Writes packets into a pcap file of a single link type"""
+    LINKTYPE_RAW = 101
+    LINKTYPE_USER0 = 147  # used for SCHC packets, there is no registered link type for them
+    SNAPLEN = 65535
+
+    def __init__(self, path, linktype=LINKTYPE_RAW):
+        self.file = open(path, "wb")
+        self.file.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, self.SNAPLEN, linktype))
+        self.record = struct.Struct("<IIII")
+
+    def write(self, packet, timestamp=0):
+        seconds = int(timestamp)
+        self.file.write(self.record.pack(seconds, int(round((timestamp - seconds) * 1e6)) % 1000000,
+                                         len(packet), len(packet)))
+        self.file.write(packet)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CompressionStats:
+    """Per rule hit counts and compression ratios of a stream of compressed packets"""
+    HEADER_LENGTH = 48  # IPv6 + UDP headers, in bytes
+
+    def __init__(self):
+        # ruleid -> [packets, bytes before compression, bytes after compression, header residue bits]
+        self.rules = {}
+
+    def add(self, rule_id, packet_length, schc_length, unused_bits):
+        stats = self.rules.setdefault(rule_id, [0, 0, 0, 0])
+        stats[0] += 1
+        stats[1] += packet_length
+        stats[2] += schc_length
+        # rule ID and residue, without the payload and padding
+        stats[3] += schc_length * 8 - unused_bits - (packet_length - self.HEADER_LENGTH) * 8
+
+    def report(self):
+        lines = ["Rule  Packets  Bytes in  Bytes out  Ratio  Header ratio"]
+        totals = [0, 0, 0]
+        for rule_id in sorted(self.rules):
+            packets, bytes_in, bytes_out, header_bits = self.rules[rule_id]
+            totals = [totals[0] + packets, totals[1] + bytes_in, totals[2] + bytes_out]
+            header_ratio = header_bits / (packets * self.HEADER_LENGTH * 8)
+            lines.append('%4d  %7d  %8d  %9d  %.3f  %.3f' % (rule_id, packets, bytes_in, bytes_out,
+                                                             bytes_out / bytes_in, header_ratio))
+        if totals[0]:
+            lines.append('All   %7d  %8d  %9d  %.3f' % (totals[0], totals[1], totals[2], totals[2] / totals[1]))
+        return "\n".join(lines)
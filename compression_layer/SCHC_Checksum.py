@@ -0,0 +1,48 @@
+import sys
+from array import array
+
+
+class SCHC_Checksum:
+    """
+    Internet checksum (RFC 1071) of the UDP header over IPv6 (RFC 8200 section 8.1),
+    computed on bytes-like objects without converting them to text.
+    """
+
+    @staticmethod
+    def words_sum(data):
+        """Sum of the 16-bit big endian words of data (bytes-like), odd length is padded with a zero byte"""
+        data = memoryview(data).cast("B")
+        odd = len(data) & 1
+        words = array("H")
+        words.frombytes(data[:len(data) - odd])
+        if sys.byteorder == "little":
+            words.byteswap()
+        total = sum(words)
+        if odd:
+            total += data[-1] << 8
+        return total
+
+    @staticmethod
+    def fold(total):
+        """One's complement sum of a partial sum: carries are added back until it fits in 16 bits"""
+        while total >> 16:
+            total = (total & 0xFFFF) + (total >> 16)
+        return total
+
+    @staticmethod
+    def pseudo_header_sum(dev_prefix, dev_iid, app_prefix, app_iid, next_header):
+        """
+        Partial sum of the IPv6 pseudo-header without the upper-layer length, the only part that
+        changes from packet to packet. Source and destination are summed together, so it does not
+        depend on the direction.
+        """
+        addresses = (dev_prefix << 192 | dev_iid << 128 | app_prefix << 64 | app_iid).to_bytes(32, "big")
+        return SCHC_Checksum.fold(SCHC_Checksum.words_sum(addresses) + next_header)
+
+    @staticmethod
+    def udp_checksum(pseudo_sum, udp_length, udp_source_port, udp_destination_port, udp_data):
+        """UDP checksum given the pseudo_header_sum, the UDP header fields and its payload"""
+        total = pseudo_sum + udp_length + udp_length + udp_source_port + udp_destination_port
+        checksum = SCHC_Checksum.fold(total + SCHC_Checksum.words_sum(udp_data)) ^ 0xFFFF
+        # a computed checksum of zero is transmitted as all ones (RFC 768)
+        return checksum or 0xFFFF
@@ -1,18 +1,28 @@
 import struct
 import binascii
+from operator import itemgetter
 
+from SCHC_Bits import BitWriter
+from SCHC_IID import iid_cache
 from SCHC_Parser import SCHC_Parser
 from SCHC_RuleManager import SCHC_RuleManager
 
 
 class SCHC_Compressor:
 
-    def __init__(self, rm):
+    def __init__(self, rm, app_eui=None, key=None, iids=iid_cache):
         self.rule_manager = rm
+        # application EUI and key (AppSKey) the appIID is derived from
+        self.app_eui = app_eui
+        self.key = key
+        self.iids = iids
         self.context = rm.context
         self.parser = SCHC_Parser()
+        self.writer = BitWriter()
+        # (ruleid, direction) -> compression program bound to the actions below
+        self.programs = {}
         self.CompressionActions = {
-            "not-sent": self.ca_not_sent,
+            "not-sent": self.ca_send_nothing,
             "value-sent": self.ca_value_sent,
             "mapping-sent": self.ca_mapping_sent,
             "LSB": self.ca_lsb,
@@ -22,88 +32,60 @@ class SCHC_Compressor:
             "compute-checksum": self.ca_send_nothing
         }
 
-    def ca_not_sent(self, length, tv, fv, mo):
-        if mo is "equal":
-            return None
-        else:
-            print("Warning: The CDA \"not-send\" SHOULD be used with the \"equal\" MO")
-            return None
-
-    def ca_value_sent(self, length, tv, fv, mo):
-        if mo != "ignore":
-            print("Warning: The CDA \"value-sent\" SHOULD be used with the \"ignore\" MO")
-        return self.__left_align_bits(length, fv[0])
-
-    def ca_mapping_sent(self, length, tv, fv, mo):
-        max_index = -1
-        mapping = None
-        if type(tv) is dict:
-            for mappingID, mappingValue in tv.items():
-                if mappingValue == fv[0]:
-                    mapping = mappingID
-                if mappingID > max_index:
-                    max_index = mappingID
-        elif type(tv) is list:
-            max_index = len(tv) - 1
-            for i in range(len(tv)):
-                if tv[i] == fv[0]:
-                    mapping = i
-                    break
-        
-        length_remain = 0
-        while max_index > 0:
-            length_remain += 1
-            max_index >>= 1
-
-        return self.__left_align_bits(length_remain, mapping)
-
-    def ca_lsb(self, length, tv, fv, mo):
-        length_remain = length - int(mo[4:-1]) # length - n_bits
-        val = fv[0] - (tv << length_remain)
-        return self.__left_align_bits(length_remain, val)
-
-    def ca_send_nothing(self, length, tv, fv, mo): # used for deviid and compute-*. doesnt show warning
+    # Compression actions write the residue of field value fv, operands are precomputed by
+    # SCHC_RuleManager.compile_program
+    def ca_value_sent(self, writer, fv, length):
+        writer.write(fv, length)
+
+    def ca_mapping_sent(self, writer, fv, indexes, length):
+        writer.write(indexes[fv], length)
+
+    def ca_lsb(self, writer, fv, msb, length):
+        writer.write(fv - msb, length)
+
+    def ca_send_nothing(self, writer, fv): # used for not-sent, deviid and compute-*
         return None
-    
-    def ca_app_iid(self, length, tv, fv, mo):
-        raise NotImplementedError
-
-    def __left_align_bits(self, length, value):
-        length_cociente = length // 8
-        length_remain = length % 8
-        mask = 0xFF
-        buff = bytearray(length_cociente + (1 if length_remain else 0))
-        
-        # full bytes
-        for i in range(length_cociente):
-            struct.pack_into(">B", buff, i, (value >> (length_remain + (length_cociente - i - 1) * 8)) & mask)
-
-        # remaining bits
-        if length_remain != 0:
-            struct.pack_into(">B", buff, length_cociente, (value << (8 - length_remain)) & mask)
-
-        return bytes(buff), length
+
+    def ca_app_iid(self, writer, fv):
+        # nothing is sent, the field must be the IID the decompressor derives
+        if self.app_eui is None or self.key is None:
+            raise ValueError('appIID needs an application EUI and key ', self.app_eui)
+        if fv != self.iids.get(self.app_eui, self.key):
+            raise ValueError('appIID does not match the derived IID ', fv)
+
+    def get_program(self, rule_id, direction, fields=None):
+        """
+        Compression program of a rule with its actions already resolved. If fields (a tuple of
+        (FID, FP) keys) is given, the program reads the values of a tuple in that order by index.
+        """
+        program = self.programs.get((rule_id, direction, fields))
+        if program is None:
+            compression, _, _ = self.rule_manager.get_program(rule_id, direction)
+            program = tuple((self.CompressionActions.get(cda), key if fields is None else fields.index(key), operands)
+                            for cda, key, operands in compression
+                            if self.CompressionActions.get(cda) != self.ca_send_nothing)
+            self.programs[(rule_id, direction, fields)] = program
+        return program
 
     def compress(self, package, direction):
         # Parsing Package
         self.parser.parser(package, direction)
 
+        values = dict((key, field[0]) for key, field in self.parser.header_fields.items())
+
         # Get Rule ID
-        rule_id = self.rule_manager.find_rule_from_headers(self.parser.header_fields, direction)
+        rule_id = self.rule_manager.find_rule_from_values(values, direction)
         rule_id_bf = struct.pack(">B", rule_id)
         if rule_id == SCHC_RuleManager.RULE_ID_NOT_COMPRESSED:
             packet = b''.join([rule_id_bf, bytes(self.parser.unparsed_headers), bytes(self.parser.udp_data[0])])
             unused_bits = 0
 
         else:
-            # Get Compression Residue
-            comp_res_bf, bit_pos = self.calc_compression_residue(self.parser.header_fields, self.rule_manager.get_rule_from_id(rule_id), direction)
-
-            # Shift payload bytes
-            almost_packet = self.add_bits_to_array(comp_res_bf, bit_pos, self.parser.udp_data[0])
-
-            packet = b''.join([rule_id_bf, bytes(almost_packet)])
-            unused_bits = 8 - (bit_pos % 8)
+            # Rule ID, compression residue and payload are written as one bit sequence
+            self.writer.reset()
+            self.writer.write(rule_id, 8)
+            bit_pos = self.calc_compression_residue(values, self.get_program(rule_id, direction), self.writer)
+            packet, unused_bits = self.writer.to_bytes(bytes(self.parser.udp_data[0]))
 
             print("Length of uncompressed headers: " + str(len(self.parser.unparsed_headers)) + " bytes")
             print("Length of compressed headers: " + str((bit_pos + 7) // 8) + " bytes")
@@ -115,34 +97,65 @@ class SCHC_Compressor:
         return packet, unused_bits
 
 
-    def add_bits_to_array(self, array, offset, value):
-        mask = 0xFF
-        if offset % 8 == 0:
-            for byte in value:
-                array.append(byte)
-        else:
-            for byte in value:
-                array[-1] += byte >> (offset % 8)
-                array.append((byte << (8 - offset % 8)) & mask)
-        return array
-
-    def calc_compression_residue(self, headers, rule, direction):
-        buffer = []
-        offset = 0
-        for fd in rule["content"]:
-            for header in headers:
-                if header[0] == fd[0] and (direction == fd[3] or fd[3] == 'Bi'):
-                    fv = headers[header]
-                    length = fd[1]
-                    tv = fd[4]
-                    mo = fd[5]
-                    cda = fd[6]
-                    result = self.CompressionActions.get(cda)(length, tv, fv, mo)
-                    if result is not None:
-                        residue, res_length = result
-                        buffer = self.add_bits_to_array(buffer, offset, residue)
-                        offset += res_length
-                        # ceiling(offset / 8)
-                        if len(buffer) > ((offset + 7) // 8):
-                            buffer.pop()
-        return buffer, offset
+    def compress_batch(self, packets, direction):
+        """
+        Compresses a burst of IPv6 + UDP packets. Headers are parsed together by
+        SCHC_Parser.parse_batch, then packets are grouped by matched rule so each group is
+        written with a single compression program.
+        Only the fields a rule matches (with an operator other than "ignore") decide the rule of a
+        packet, so packets of the same flow (same values in those fields) are matched once per
+        batch, and the residue of the fields the program writes before the first unmatched one
+        is written once per flow too.
+        Returns the list of (packet, unused_bits) in the order of packets.
+        """
+        packets = list(packets)
+        # Field values stay in the tuples returned by parse_batch, matcher and programs read them by index
+        matcher = self.rule_manager.get_matcher(SCHC_Parser.FIELDS, direction, positional=True)
+        matched_keys = self.rule_manager.matched_keys(direction)
+        matched = [index for index, key in enumerate(SCHC_Parser.FIELDS) if key in matched_keys]
+        flow = itemgetter(*matched) if matched else self.rule_manager.no_values
+        writer = self.writer
+        flows = {}
+        programs = {}
+        groups = {}
+        for position, fields in enumerate(SCHC_Parser.parse_batch(packets, direction)):
+            if fields is None:
+                groups.setdefault(SCHC_RuleManager.RULE_ID_NOT_COMPRESSED, []).append((position, None, None))
+                continue
+            key = flow(fields)
+            rule_id, prefix = flows.get(key, (None, None))
+            if rule_id is None:
+                rule_id = self.rule_manager.find_rule_from_values(fields, direction, matcher)
+                if rule_id != SCHC_RuleManager.RULE_ID_NOT_COMPRESSED:
+                    if rule_id not in programs:
+                        program = self.get_program(rule_id, direction, SCHC_Parser.FIELDS)
+                        split = 0
+                        while split < len(program) and program[split][1] in matched:
+                            split += 1
+                        programs[rule_id] = (program[:split], program[split:])
+                    writer.reset()
+                    writer.write(rule_id, 8)
+                    self.calc_compression_residue(fields, programs[rule_id][0], writer)
+                    prefix = (writer.value, writer.length)
+                flows[key] = (rule_id, prefix)
+            groups.setdefault(rule_id, []).append((position, fields, prefix))
+
+        compressed = [None] * len(packets)
+        for rule_id, members in groups.items():
+            if rule_id == SCHC_RuleManager.RULE_ID_NOT_COMPRESSED:
+                for position, _, _ in members:
+                    compressed[position] = (bytes([rule_id]) + bytes(packets[position]), 0)
+                continue
+            program = programs[rule_id][1]
+            for position, values, prefix in members:
+                writer.reset(*prefix)
+                self.calc_compression_residue(values, program, writer)
+                compressed[position] = writer.to_bytes(memoryview(packets[position])[SCHC_Parser.HEADER_LENGTH:])
+        return compressed
+
+    def calc_compression_residue(self, values, program, writer):
+        """Writes the compression residue of the header values into writer, returns its length in bits"""
+        offset = writer.length
+        for action, key, operands in program:
+            action(writer, values[key], *operands)
+        return writer.length - offset
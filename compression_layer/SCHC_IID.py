@@ -0,0 +1,42 @@
+from collections import OrderedDict
+
+from Crypto.Cipher import AES
+from Crypto.Hash import CMAC
+
+
+class IIDCache:
+    """
+    Derivation of interface identifiers (RFC 9011 section 5.3):
+    IID = aes128_cmac(key, EUI)[0..7], computed once per (EUI, key) and kept in a
+    bounded least recently used cache, so AES only runs the first time a device is seen.
+    """
+
+    def __init__(self, size=1024):
+        self.size = size
+        self.iids = OrderedDict()
+
+    @staticmethod
+    def derive(eui, key):
+        """IID (as integer) of the 8 bytes eui with the 16 bytes AES key"""
+        cmac = CMAC.new(bytes(key), msg=bytes(eui), ciphermod=AES).digest()
+        return int.from_bytes(cmac[:8], "big")
+
+    def get(self, eui, key):
+        """IID of eui with key, derived only if it is not cached"""
+        cache_key = (bytes(eui), bytes(key))
+        iid = self.iids.get(cache_key)
+        if iid is None:
+            iid = self.derive(*cache_key)
+            self.iids[cache_key] = iid
+            if len(self.iids) > self.size:
+                self.iids.popitem(last=False)
+        else:
+            self.iids.move_to_end(cache_key)
+        return iid
+
+    def clear(self):
+        self.iids.clear()
+
+
+# Cache shared by default between compressors and decompressors of the same process
+iid_cache = IIDCache()
@@ -0,0 +1,98 @@
+from schc_base import BitBuffer, TimerWheel
+from schc_machines import SCHCFiniteStateMachine
+from schc_machines.lorawan import AckOnErrorSender, AckOnErrorReceiver
+from schc_protocols import LoRaWAN, SCHCProtocol, get_protocol
+
+from SCHC_Compressor import SCHC_Compressor
+from SCHC_Decompressor import SCHC_Decompressor
+
+
+class SCHC_Pipeline:
+    """
+    Compression followed by fragmentation and reassembly followed by decompression.
+    The SCHC packet written by SCHC_Compressor (Rule ID, compression residue and payload) is
+    handed to an AckOnErrorSender as a BitBuffer over the same bytes with its length in bits, so
+    it is never turned into a string of 0s and 1s and the sender fragments views of it. The packet
+    reassembled by an AckOnErrorReceiver is handed to SCHC_Decompressor as bytes, the bits that do
+    not complete its last byte are padding and are discarded by the decompressor.
+    Needs the fragmentation layer installed (fragmentation_layer/code, see README).
+    """
+
+    def __init__(self, rm, protocol=SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ON_ERROR,
+                 compressor=None, decompressor=None, fec_ratio=None):
+        self.compressor = compressor if compressor is not None else SCHC_Compressor(rm)
+        self.decompressor = decompressor if decompressor is not None else SCHC_Decompressor(rm)
+        # fragmentation profile
+        self.protocol = get_protocol(protocol, rule_id=rule_id, fec_ratio=fec_ratio)
+
+    def compress(self, packet, direction):
+        """Compresses an IPv6 + UDP packet, returns the SCHC packet as a BitBuffer of its exact length"""
+        schc_packet, unused_bits = self.compressor.compress(packet, direction)
+        return BitBuffer(schc_packet, length=len(schc_packet) * 8 - unused_bits)
+
+    def sender(self, packet, direction, dtag=None, wheel=None):
+        """AckOnErrorSender fragmenting the compressed packet"""
+        return AckOnErrorSender(self.protocol, self.compress(packet, direction), dtag=dtag, wheel=wheel)
+
+    def receiver(self, dtag=None, wheel=None):
+        """AckOnErrorReceiver reassembling a compressed packet, see decompress"""
+        return AckOnErrorReceiver(self.protocol, dtag=dtag, wheel=wheel)
+
+    def decompress(self, receiver, direction):
+        """Rebuilds the IPv6 + UDP packet reassembled by receiver"""
+        return self.decompressor.decompress(receiver.payload.as_bytes(), direction)
+
+    def attach(self, handler, direction, listener):
+        """
+        Decompresses every packet received by a SCHCGatewayHandler or SCHCNodeHandler, fragmented
+        (once its receiver ends) or not, and calls listener(packet, device=device) with the IPv6 packet
+        """
+        def on_session_finished(rule_id, dtag, machine, device=None):
+            if isinstance(machine, AckOnErrorReceiver) and \
+                    isinstance(machine.state, SCHCFiniteStateMachine.EndState):
+                listener(self.decompress(machine, direction), device=device)
+
+        def on_packet_received(rule_id, schc_packet, device=None):
+            listener(self.decompressor.decompress(schc_packet, direction), device=device)
+
+        handler.session_listeners.append(on_session_finished)
+        handler.packet_listeners.append(on_packet_received)
+
+    def transfer(self, packet, direction, mtu=50):
+        """
+        Compresses and fragments packet, delivers every SCHC message between a sender and a receiver
+        (without losses, so timers never expire) and decompresses the packet reassembled.
+        Returns the SCHC fragments sent (as bytes) and the IPv6 packet rebuilt.
+        """
+        wheel = TimerWheel()
+        sender = self.sender(packet, direction, wheel=wheel)
+        receiver = self.receiver(wheel=wheel)
+        fragments = []
+        try:
+            while not isinstance(sender.state, SCHCFiniteStateMachine.EndState):
+                if isinstance(sender.state, SCHCFiniteStateMachine.ErrorState) or \
+                        isinstance(receiver.state, SCHCFiniteStateMachine.ErrorState):
+                    raise RuntimeError("Transfer failed: {} / {}".format(sender.__exit_msg__, receiver.__exit_msg__))
+                sent = self.exchange(sender, receiver, mtu, fragments)
+                if self.exchange(receiver, sender, mtu, []) + sent == 0:
+                    raise RuntimeError("Transfer stalled")
+        finally:
+            sender.stop_timers()
+            receiver.stop_timers()
+        return fragments, self.decompress(receiver, direction)
+
+    @staticmethod
+    def exchange(source, destination, mtu, log):
+        """Delivers to destination every message source can generate now, returns how many were sent"""
+        sent = 0
+        while True:
+            try:
+                message = source.generate_message(mtu).as_bytes()
+            except (GeneratorExit, SystemExit):
+                return sent
+            sent += 1
+            log.append(message)
+            try:
+                destination.receive_message(message)
+            except SystemExit:
+                pass  # destination already ended
@@ -1,8 +1,22 @@
+from operator import itemgetter
+
+from SCHC_Checksum import SCHC_Checksum
+
+
 class SCHC_RuleManager:
     RULE_ID_NOT_COMPRESSED = 250
+    DIRECTIONS = ("Up", "Down")
+    COMPUTED_CDAS = ("compute-length", "compute-checksum")
+    # Fields of the IPv6 pseudo-header covered by the UDP checksum, besides the length
+    PSEUDO_HEADER_FIELDS = ("IPv6.devPrefix", "IPv6.devIID", "IPv6.appPrefix", "IPv6.appIID", "IPv6.nextHeader")
 
     def __init__(self):
         self.context = []
+        self.rules_by_id = {}
+        # (direction, header signature) -> compiled candidates, filled on first lookup
+        self.index = {}
+        # ruleid -> direction -> (compression, decompression, computed) programs
+        self.programs = {}
         self.MatchingOperators = {
             "ignore": self.mo_ignore,
             "equal": self.mo_equal,
@@ -34,127 +48,246 @@ class SCHC_RuleManager:
         else:
             return False
 
+    # match-mapping compiled by compile_matcher: tv is the frozenset of mapped values, value_type
+    # the type every value of a list shares (None for dicts, whose values are not type checked)
+    def mo_in_mapping(self, length, fv, tv, cda, value_type):
+        if value_type is not None and type(fv) is not value_type:
+            return False
+        return fv in tv
+
     # Only accepts length in bits
     def mo_msb(self, length, fv, tv, cda, n_bits):
         return (fv>>(length - n_bits) ^ tv) == 0
 
+    @staticmethod
+    def msb_length(mo):
+        """Number of bits of a "MSB(n)" matching operator"""
+        try:
+            return int(mo[4:-1])
+        except ValueError:
+            raise ValueError('Invalid MSB matching operator ', mo)
+
+    @staticmethod
+    def mapping_length(tv):
+        """Number of bits needed to send a mapping index of the target value tv"""
+        if type(tv) is dict:
+            max_index = max(tv.keys(), default=-1)
+        elif type(tv) is list:
+            max_index = len(tv) - 1
+        else:
+            max_index = -1
+        return max(max_index, 0).bit_length()
+
     def get_rule_from_id(self, rule_id):
-        for r in self.context:
-            if r["ruleid"] == rule_id:
-                return r
-        print("Rule not found")
-        return False
+        rule = self.rules_by_id.get(rule_id)
+        if rule is None:
+            print("Rule not found")
+            return False
+        return rule
 
     def add_rule(self, rule):
         """Add a rule to the context, ruleid must be unique """
         added_rule_id = rule["ruleid"]
-        for r in self.context:
-            if r["ruleid"] == added_rule_id:
-                raise ValueError('Rule ID already exists ', added_rule_id)
+        if added_rule_id in self.rules_by_id:
+            raise ValueError('Rule ID already exists ', added_rule_id)
+        for content in rule["content"]:
+            MO = content[5]
+            if MO[:3] == "MSB":
+                self.msb_length(MO)
+            elif MO not in self.MatchingOperators:
+                raise ValueError('Unknown matching operator ', MO)
+            CDA = content[6]
+            if CDA == "not-sent" and MO != "equal":
+                print("Warning: The CDA \"not-send\" SHOULD be used with the \"equal\" MO")
+            elif CDA == "value-sent" and MO != "ignore":
+                print("Warning: The CDA \"value-sent\" SHOULD be used with the \"ignore\" MO")
 
         self.context.append(rule)
+        self.rules_by_id[added_rule_id] = rule
+        self.programs[added_rule_id] = dict(
+            (direction, self.compile_program(rule, direction)) for direction in self.DIRECTIONS)
+        # Compiled candidates depend on the whole context, they are rebuilt on demand
+        self.index.clear()
 
-    def find_rule_from_headers(self, headers, direction):
+    def compile_program(self, rule, direction):
+        """
+        Compiles the content of a rule for one direction into immutable programs, so
+        compression actions (CA) and decompression actions (DA) do not parse the rule again.
+        Each step is a tuple (CDA, field, operands), operands already holding widths,
+        shifts and mapping tables:
 
-        headers_keys = headers.keys()
-        for rule in self.context:
-            # If a header of the current packet is not in the FIDs of the rule, the rule MUST be discarded
-            flag = False
-            for header in headers_keys:
-                coincidence = False
-                for content in rule["content"]:
-                    if header[0] == content[0]:
-                        coincidence = True
-                        break
-                if coincidence is False:
-                    print("Header \"" + header[0] + "\" not found in Rule ID: " + str(rule["ruleid"]))
-                    print("The Rule MUST be disregarded")
-                    flag = True
-                    break
-            if flag:
+        - compression: (CDA, (FID, FP), operands) for every field sending a residue
+        - decompression: (CDA, FID, operands) for every field rebuilt from the residue
+        - computed: (CDA, FID, operands) for fields computed once the payload is known,
+          compute-checksum gets the pseudo-header partial sum when the rule fixes it (or None)
+        """
+        compression = []
+        decompression = []
+        computed = []
+        constants = {}
+        for FID, LENGTH, PO, DI, TV, MO, CDA in rule["content"]:
+            if DI != direction and DI != "Bi":
                 continue
-
-            # If an FID of the rule is not in the set of headers of the current packet, the rule MUST be discarded
-            flag = False
-            for content in rule["content"]:
-                coincidence = False
-                for header in headers_keys:
-                    if header[0] == content[0]:
-                        coincidence = True
-                        break
-                if coincidence is False:
-                    print("Field ID \"" + content[0] + "\" of the Rule " + str(rule["ruleid"]) + "not found in "
-                                                                                                 "Headers List")
-                    print("The Rule MUST be disregarded")
-                    flag = True
-                    break
-            if flag:
+            if CDA == "compute-checksum":
+                computed.append((CDA, FID, (None,)))
                 continue
-
-            # If a pair (header, direction) of the current packet is not in the rule, the rule MUST be discarded
-            flag = False
-            for header in headers_keys:
-                coincidence = False
-                for content in rule["content"]:
-                    DI = content[3]
-                    if header[0] == content[0] and (direction is DI or DI is "Bi"):
-                        coincidence = True
-                        break
-                if coincidence is False:
-                    print("Header \"" + header[0] + "\" does not match with FID and DI in the RuleID " +
-                          str(rule["ruleid"]))
-                    print("The Rule MUST be disregarded")
-                    flag = True
-                    break
-            if flag:
+            if CDA in self.COMPUTED_CDAS:
+                computed.append((CDA, FID, ()))
                 continue
+            if CDA == "value-sent":
+                compression.append((CDA, (FID, PO), (LENGTH,)))
+                decompression.append((CDA, FID, (LENGTH,)))
+            elif CDA == "mapping-sent":
+                width = self.mapping_length(TV)
+                if type(TV) is dict:
+                    indexes = dict((value, index) for index, value in TV.items())
+                else:
+                    # first occurrence of a value wins
+                    indexes = dict((value, index) for index, value in reversed(list(enumerate(TV))))
+                compression.append((CDA, (FID, PO), (indexes, width)))
+                decompression.append((CDA, FID, (TV, width)))
+            elif CDA == "LSB":
+                width = LENGTH - self.msb_length(MO)
+                compression.append((CDA, (FID, PO), (TV << width, width)))
+                decompression.append((CDA, FID, (TV << width, width)))
+            elif CDA == "not-sent":
+                decompression.append((CDA, FID, (TV,)))
+                constants[FID] = TV
+            elif CDA == "appIID":
+                compression.append((CDA, (FID, PO), ()))
+                decompression.append((CDA, FID, ()))
+            else:
+                decompression.append((CDA, FID, ()))
 
-            # If a tuple (header, direction, position) of the current packet is not in the rule, the rule MUST be discarded
-            flag = False
-            for header in headers_keys:
-                coincidence = False
-                for content in rule["content"]:
-                    PO = content[2]
-                    DI = content[3]
-                    if header[0] == content[0] and (direction is DI or DI is "Bi") and (header[1] is PO):
-                        coincidence = True
-                        break
-                if coincidence is False:
-                    print("Header \"" + header[0] + "\" does not match with FID, DI and FP in the RuleID " +
-                          str(rule["ruleid"]))
-                    print("The Rule MUST be disregarded")
-                    flag = True
-                    break
-            if flag:
+        if all(field in constants for field in self.PSEUDO_HEADER_FIELDS):
+            pseudo_sum = SCHC_Checksum.pseudo_header_sum(*(constants[field] for field in self.PSEUDO_HEADER_FIELDS))
+            computed = [(CDA, FID, (pseudo_sum,)) if CDA == "compute-checksum" else (CDA, FID, operands)
+                        for CDA, FID, operands in computed]
+        return tuple(compression), tuple(decompression), tuple(computed)
+
+    def get_program(self, rule_id, direction):
+        """Compiled (compression, decompression, computed) programs of a rule"""
+        return self.programs[rule_id][direction]
+
+    def compile_matcher(self, headers_keys, direction, positional=False):
+        """
+        Builds the lookup structure of the rules that can match a packet with the given
+        header keys ((FID, FP) pairs) and direction.
+
+        Rules are discarded here with the same FID, DI and FP checks applied by the
+        RFC 8724 rule selection, so only matching operators remain to be evaluated.
+        Fields matched with "equal" are hashed into a dispatch table per set of
+        "equal" fields; remaining operators are kept as residual checks.
+        Returns a list of (getter, table) where getter extracts the values of the "equal"
+        fields from a packet (an itemgetter, a bare value when there is a single field) and
+        table maps them to the candidates (context position, rule id, residual checks)
+        in context order.
+        If positional, packets are tuples of values in the order of headers_keys instead of
+        dicts, fields are then read by index.
+        """
+        position = dict((header, index if positional else header) for index, header in enumerate(headers_keys))
+        header_fids = set(header[0] for header in headers_keys)
+        patterns = {}
+        for order, rule in enumerate(self.context):
+            # If an FID of the rule is not in the set of headers of the current packet, the rule MUST be discarded
+            if any(content[0] not in header_fids for content in rule["content"]):
+                continue
+            # Every header needs a (FID, DI, FP) entry in the rule
+            entries = [content for content in rule["content"] if content[3] == direction or content[3] == "Bi"]
+            entries_keys = set((content[0], content[2]) for content in entries)
+            if any(header not in entries_keys for header in headers_keys):
                 continue
 
-            # After associating each header value with a (FID, DI, FP) tuple, the matching operators (MO) are applied
-            # with the target value (TV) and the header value.
-            # If at least one MO returns false, the rule MUST be discarded
-            # Looking MO
-            MO_is_false = False
+            equal_keys = []
+            equal_values = []
+            residual = []
             for header in headers_keys:
-                for content in rule["content"]:
-                    # FID = content[0]
+                for content in entries:
+                    if (content[0], content[2]) != header:
+                        continue
                     LENGTH = content[1]
-                    PO = content[2]
-                    DI = content[3]
-                    if header[0] == content[0] and (direction is DI or DI is "Bi") and (header[1] is PO):
-                        FV = headers.get(header)[0]
-                        TV = content[4]
-                        MO = content[5]
-                        CDA = content[6]
-                        if MO[:3] == "MSB":
-                            if not self.MatchingOperators.get("MSB")(LENGTH, FV, TV, CDA, int(MO[4:-1])):
-                                MO_is_false = True
-                                break
-                        elif not self.MatchingOperators.get(MO)(LENGTH, FV, TV, CDA):
-                            MO_is_false = True
-                            break
-
-            if MO_is_false:
-                continue
-            else:
-                return rule["ruleid"]
+                    TV = content[4]
+                    MO = content[5]
+                    CDA = content[6]
+                    if MO == "equal" and TV.__hash__ is not None:
+                        equal_keys.append(position[header])
+                        equal_values.append(TV)
+                    elif MO[:3] == "MSB":
+                        residual.append((self.MatchingOperators.get("MSB"), position[header], LENGTH, TV, CDA,
+                                         (self.msb_length(MO),)))
+                    elif MO == "match-mapping" and self.hashable_mapping(TV):
+                        values = list(TV.values()) if type(TV) is dict else TV
+                        value_type = None if type(TV) is dict else type(TV[0])
+                        residual.append((self.mo_in_mapping, position[header], LENGTH, frozenset(values), CDA,
+                                         (value_type,)))
+                    elif MO != "ignore":
+                        residual.append((self.MatchingOperators.get(MO), position[header], LENGTH, TV, CDA, ()))
+
+            keys = tuple(equal_keys)
+            table = patterns.setdefault(keys, {})
+            values = equal_values[0] if len(keys) == 1 else tuple(equal_values)
+            table.setdefault(values, []).append((order, rule["ruleid"], tuple(residual)))
+        return [(itemgetter(*keys) if keys else self.no_values, table) for keys, table in patterns.items()]
+
+    @staticmethod
+    def hashable_mapping(tv):
+        """True if match-mapping on tv can be evaluated as a set membership"""
+        if type(tv) is dict:
+            return all(value.__hash__ is not None for value in tv.values())
+        if type(tv) is list and len(tv) > 0:
+            return all(type(value) is type(tv[0]) and value.__hash__ is not None for value in tv)
+        return False
+
+    @staticmethod
+    def no_values(values):
+        return ()
+
+    def get_matcher(self, headers_keys, direction, positional=False):
+        """Compiled matcher of packets with the given header keys, see compile_matcher"""
+        signature = (direction, tuple(headers_keys) if positional else frozenset(headers_keys))
+        matcher = self.index.get(signature)
+        if matcher is None:
+            matcher = self.compile_matcher(tuple(headers_keys), direction, positional)
+            self.index[signature] = matcher
+        return matcher
+
+    def matched_keys(self, direction):
+        """
+        (FID, FP) of the fields some rule of direction matches with an operator other than
+        "ignore": the rule selected for a packet depends only on the values of these fields
+        """
+        return set((content[0], content[2]) for rule in self.context for content in rule["content"]
+                   if (content[3] == direction or content[3] == "Bi") and content[5] != "ignore")
+
+    def find_rule_from_headers(self, headers, direction):
+        return self.find_rule_from_values(dict((key, field[0]) for key, field in headers.items()), direction)
+
+    def find_rule_from_values(self, values, direction, matcher=None):
+        """
+        Same as find_rule_from_headers, values maps each (FID, FP) to the bare field value.
+        Callers matching many packets with the same header keys can pass the matcher
+        returned by get_matcher, values is then a tuple of field values if the matcher is positional.
+        """
+        if matcher is None:
+            matcher = self.get_matcher(values, direction)
 
-        return self.RULE_ID_NOT_COMPRESSED
+        # After associating each header value with a (FID, DI, FP) tuple, the matching operators (MO) are applied
+        # with the target value (TV) and the header value.
+        # If at least one MO returns false, the rule MUST be discarded
+        found_order = len(self.context)
+        found_rule_id = self.RULE_ID_NOT_COMPRESSED
+        for getter, table in matcher:
+            candidates = table.get(getter(values))
+            if candidates is None:
+                continue
+            for order, rule_id, residual in candidates:
+                if order >= found_order:
+                    break
+                for MO, key, LENGTH, TV, CDA, extra in residual:
+                    if not MO(LENGTH, values[key], TV, CDA, *extra):
+                        break
+                else:
+                    found_order = order
+                    found_rule_id = rule_id
+                    break
+        return found_rule_id
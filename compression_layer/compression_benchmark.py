@@ -0,0 +1,224 @@
+import argparse
+import contextlib
+import copy
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from PacketGenerator import PacketGenerator
+from SCHC_Checksum import SCHC_Checksum
+from SCHC_Compressor import SCHC_Compressor
+from SCHC_Decompressor import SCHC_Decompressor
+from SCHC_IID import iid_cache
+from SCHC_Parser import SCHC_Parser
+from SCHC_RuleManager import SCHC_RuleManager
+import common
+
+
+def set_field(rule, fid, tv, mo, cda):
+    for content in rule["content"]:
+        if content[0] == fid:
+            content[4], content[5], content[6] = tv, mo, cda
+    return rule
+
+
+# Application the appIID of the appIID case is derived from
+APP_EUI = bytes([0x70, 0xB3, 0xD5, 0x7E, 0xD0, 0x00, 0x00, 0x01])
+
+
+def with_iid(packet, fid, iid):
+    """Uplink packet with the IID field fid replaced by iid, and its UDP checksum updated"""
+    headers = dict((key[0], value) for key, value in zip(SCHC_Parser.FIELDS, SCHC_Parser.fields(
+        SCHC_Parser.HEADER.unpack_from(packet), "Up")))
+    headers[fid] = iid
+    headers["UDP.checksum"] = SCHC_Checksum.udp_checksum(
+        SCHC_Checksum.pseudo_header_sum(headers["IPv6.devPrefix"], headers["IPv6.devIID"], headers["IPv6.appPrefix"],
+                                        headers["IPv6.appIID"], headers["IPv6.nextHeader"]),
+        headers["UDP.length"], headers["UDP.devPort"], headers["UDP.appPort"], packet[SCHC_Parser.HEADER_LENGTH:])
+    return SCHC_Parser.build(headers, packet[SCHC_Parser.HEADER_LENGTH:], "Up")
+
+
+def cda_cases(packet):
+    """
+    (name, rules, packet, keys) exercising each compression/decompression action on the generated
+    packet, keys are the EUI and key arguments of the compressor and decompressor of the case
+    """
+    base = common.rule_64
+    cases = [("not-sent", [copy.deepcopy(base)], packet, {})]
+
+    rule = copy.deepcopy(base)
+    set_field(rule, "UDP.devPort", None, "ignore", "value-sent")
+    set_field(rule, "UDP.appPort", None, "ignore", "value-sent")
+    cases.append(("value-sent", [rule], packet, {}))
+
+    rule = copy.deepcopy(base)
+    set_field(rule, "IPv6.devIID", [0x0000000051834383, 0x0000000000000094], "match-mapping", "mapping-sent")
+    set_field(rule, "IPv6.appIID", [0x0000000000000008, 0x0000000051834383], "match-mapping", "mapping-sent")
+    cases.append(("mapping-sent", [rule], packet, {}))
+
+    rule = copy.deepcopy(base)
+    set_field(rule, "UDP.devPort", 32513 >> 4, "MSB(12)", "LSB")
+    set_field(rule, "UDP.appPort", 32640 >> 4, "MSB(12)", "LSB")
+    cases.append(("LSB", [rule], packet, {}))
+
+    # the devIID of the packet is the one derived from the default device
+    rule = copy.deepcopy(base)
+    set_field(rule, "IPv6.devIID", None, "ignore", "devIID")
+    cases.append(("devIID", [rule], with_iid(packet, "IPv6.devIID", iid_cache.get(
+        SCHC_Decompressor.DEV_EUI, SCHC_Decompressor.KEY)), {}))
+
+    # the appIID of the packet is the one derived from APP_EUI, the compressor checks it on every packet
+    rule = copy.deepcopy(base)
+    set_field(rule, "IPv6.appIID", None, "ignore", "appIID")
+    cases.append(("appIID", [rule], with_iid(packet, "IPv6.appIID", iid_cache.get(APP_EUI, SCHC_Decompressor.KEY)),
+                  {"app_eui": APP_EUI, "key": SCHC_Decompressor.KEY}))
+
+    # addresses are sent, so the pseudo-header of the checksum is summed on every packet
+    rule = copy.deepcopy(base)
+    set_field(rule, "IPv6.devPrefix", None, "ignore", "value-sent")
+    cases.append(("compute-checksum", [rule], packet, {}))
+    return cases
+
+
+def synthetic_rules(size):
+    """
+    size rules where only the last one matches the generated packet. Every other rule differs
+    from the packet in the value of an "equal" field (devIID), as rules of different devices do,
+    and half of them also match a match-mapping list. The equal-field index tells them apart, so
+    the residual matching operators are only evaluated for candidates with the packet values.
+    """
+    rules = []
+    for i in range(size - 1):
+        rule = copy.deepcopy(common.rule_64)
+        rule["ruleid"] = i
+        set_field(rule, "IPv6.devIID", 0x1000 + i, "equal", "not-sent")
+        if i % 2 == 0:
+            set_field(rule, "UDP.devPort", [i, i + 1], "match-mapping", "mapping-sent")
+        rules.append(rule)
+    rule = copy.deepcopy(common.rule_64)
+    rule["ruleid"] = size
+    rules.append(rule)
+    return rules
+
+
+def rule_manager(rules):
+    rm = SCHC_RuleManager()
+    for rule in rules:
+        rm.add_rule(rule)
+    return rm
+
+
+def measure(name, case, operation, packets, alloc_packets, batch_size=1):
+    """
+    Runs operation packets times, returns throughput, latency percentiles and allocated bytes per packet.
+    Operations handling batch_size packets at once report latencies per batch.
+    """
+    latencies = []
+    clock = time.perf_counter_ns
+    start = clock()
+    for _ in range(packets):
+        begin = clock()
+        operation()
+        latencies.append(clock() - begin)
+    elapsed = clock() - start
+    latencies.sort()
+
+    # peak of traced memory during each operation, averaged
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(alloc_packets):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        operation()
+        allocated += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))]
+
+    return {
+        "benchmark": name,
+        "case": case,
+        "packets": packets * batch_size,
+        "batch_size": batch_size,
+        "packets_per_s": packets * batch_size * 1e9 / elapsed,
+        "latency_ns": {"p50": percentile(50), "p90": percentile(90), "p99": percentile(99), "max": latencies[-1]},
+        "alloc_bytes_per_packet": allocated / (alloc_packets * batch_size)
+    }
+
+
+def run(packets, alloc_packets):
+    results = []
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        generated = PacketGenerator.generate()[0]
+        for case, rules, packet, keys in cda_cases(generated):
+            rm = rule_manager(rules)
+            compressor = SCHC_Compressor(rm, **keys)
+            decompressor = SCHC_Decompressor(rm, **keys)
+            schc_packet = compressor.compress(packet, "Up")[0]
+            results.append(measure("compress", case, lambda: compressor.compress(packet, "Up"),
+                                   packets, alloc_packets))
+            results.append(measure("decompress", case, lambda: decompressor.decompress(schc_packet, "Up"),
+                                   packets, alloc_packets))
+            results[-1]["roundtrip"] = bytes(decompressor.decompress(schc_packet, "Up")) == bytes(packet)
+            results.append(measure("compress_batch", case, lambda: compressor.compress_batch([packet] * 100, "Up"),
+                                   max(1, packets // 100), max(1, alloc_packets // 100), 100))
+
+        parser = SCHC_Parser()
+        parser.parser(generated, "Up")
+        for size in (10, 100, 1000):
+            rm = rule_manager(synthetic_rules(size))
+            assert rm.find_rule_from_headers(parser.header_fields, "Up") == size
+            results.append(measure("find_rule_from_headers", "%d rules" % size,
+                                   lambda: rm.find_rule_from_headers(parser.header_fields, "Up"),
+                                   packets, alloc_packets))
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """Results whose throughput dropped more than tolerance (a fraction) from the baseline ones"""
+    previous = dict(((r["benchmark"], r["case"]), r["packets_per_s"]) for r in baseline["results"])
+    slower = []
+    for result in results:
+        before = previous.get((result["benchmark"], result["case"]))
+        if before and result["packets_per_s"] < before * (1 - tolerance):
+            slower.append("%s %s: %.0f -> %.0f packets/s" % (result["benchmark"], result["case"],
+                                                               before, result["packets_per_s"]))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks SCHC compression, decompression and rule lookup")
+    parser.add_argument("--packets", type=int, default=10000, help="packets per benchmark")
+    parser.add_argument("--alloc-packets", type=int, default=200, help="packets traced to count allocations")
+    parser.add_argument("--output", help="JSON file with the results (default: standard output)")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop against the baseline")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": run(args.packets, args.alloc_packets)
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            slower = regressions(report["results"], json.load(baseline), args.tolerance)
+        for line in slower:
+            print("Regression: " + line, file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import time
+
+from SCHC_Capture import CaptureReader, CaptureWriter, CompressionStats
+from SCHC_Compressor import SCHC_Compressor
+from SCHC_Decompressor import SCHC_Decompressor
+from SCHC_RuleManager import SCHC_RuleManager
+import common
+
+
+def chunks(packets, size):
+    """Groups an iterable of packets into lists of at most size elements"""
+    chunk = []
+    for packet in packets:
+        chunk.append(packet)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def compress_stream(compressor, packets, direction, batch_size=1024):
+    """
+    Compresses an iterable of (timestamp, packet), batch_size packets at a time, so memory
+    stays bounded whatever the length of the stream.
+    Yields (timestamp, packet, schc_packet, unused_bits).
+    """
+    for chunk in chunks(packets, batch_size):
+        compressed = compressor.compress_batch([packet for _, packet in chunk], direction)
+        for (timestamp, packet), (schc_packet, unused_bits) in zip(chunk, compressed):
+            yield timestamp, packet, schc_packet, unused_bits
+
+
+def decompress_stream(decompressor, schc_packets, direction, batch_size=1024):
+    """Decompresses an iterable of (timestamp, schc_packet), yields (timestamp, packet)"""
+    for chunk in chunks(schc_packets, batch_size):
+        decompressed = decompressor.decompress_batch([schc_packet for _, schc_packet in chunk], direction)
+        for (timestamp, _), packet in zip(chunk, decompressed):
+            yield timestamp, packet
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays a pcap, pcapng or raw IPv6 capture through SCHC compression")
+    parser.add_argument("capture", help="input capture")
+    parser.add_argument("output", help="pcap file with the SCHC packets")
+    parser.add_argument("--direction", default="Up", choices=["Up", "Down"])
+    parser.add_argument("--rules", default="rule_97,rule_98,rule_99", help="rules of common.py to load, in order")
+    parser.add_argument("--decompressed", help="pcap file with the packets decompressed back, to validate the rules")
+    parser.add_argument("--batch", type=int, default=1024, help="packets compressed at a time")
+    args = parser.parse_args()
+
+    rm = SCHC_RuleManager()
+    for name in args.rules.split(","):
+        rm.add_rule(getattr(common, name))
+    compressor = SCHC_Compressor(rm)
+    decompressor = SCHC_Decompressor(rm)
+    stats = CompressionStats()
+    mismatches = 0
+
+    start = time.perf_counter()
+    with CaptureWriter(args.output, CaptureWriter.LINKTYPE_USER0) as output:
+        validation = CaptureWriter(args.decompressed) if args.decompressed else None
+        compressed = compress_stream(compressor, CaptureReader(args.capture), args.direction, args.batch)
+        for chunk in chunks(compressed, args.batch):
+            for timestamp, packet, schc_packet, unused_bits in chunk:
+                output.write(schc_packet, timestamp)
+                stats.add(schc_packet[0], len(packet), len(schc_packet), unused_bits)
+            if validation is not None:
+                decompressed = decompress_stream(decompressor, [(timestamp, schc_packet)
+                                                                for timestamp, _, schc_packet, _ in chunk],
+                                                 args.direction, args.batch)
+                for (_, original, _, _), (timestamp, packet) in zip(chunk, decompressed):
+                    packet = bytes(packet)
+                    validation.write(packet, timestamp)
+                    mismatches += packet != bytes(original)
+        if validation is not None:
+            validation.close()
+    elapsed = time.perf_counter() - start
+
+    print(stats.report())
+    packets = sum(rule[0] for rule in stats.rules.values())
+    print("%d packets in %.2f s (%.0f packets/s)" % (packets, elapsed, packets / elapsed if elapsed else 0))
+    if args.decompressed:
+        print("Decompressed packets different from the capture: %d" % mismatches)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+""" test_bits: Unit test of SCHC_Bits """
+
+from unittest import TestCase, main
+from SCHC_Bits import BitReader, BitWriter
+
+
+class TestBitWriter(TestCase):
+
+    def test_write(self):
+        writer = BitWriter()
+        writer.write(0b101, 3)
+        # only the length least significant bits are written
+        writer.write(0xFF0F, 4)
+        writer.write(0, 0)
+        self.assertEqual((0b1011111, 7), (writer.value, writer.length), "Wrong bits written")
+
+    def test_to_bytes(self):
+        writer = BitWriter()
+        self.assertEqual((b'', 0), writer.to_bytes(), "Wrong empty bytes")
+        writer.write(0b101, 3)
+        self.assertEqual((b'\xa0', 5), writer.to_bytes(), "Wrong padding")
+        # payload is spliced right after the bits written
+        self.assertEqual((b'\xbf\xe0\x20', 5), writer.to_bytes(b'\xff\x01'), "Wrong payload")
+        self.assertEqual((b'\xbf\xe0\x20', 5), writer.to_bytes(memoryview(b'\x00\xff\x01')[1:]), "Wrong payload")
+        writer.write(0x1F, 5)
+        self.assertEqual((b'\xbf\xff\x01', 0), writer.to_bytes(b'\xff\x01'), "Wrong aligned payload")
+
+    def test_reset(self):
+        writer = BitWriter()
+        writer.write(0x3FF, 10)
+        writer.reset()
+        self.assertEqual((b'', 0), writer.to_bytes(), "Writer not reset")
+        writer.reset(0b11, 2)
+        writer.write(0, 6)
+        self.assertEqual((b'\xc0', 0), writer.to_bytes(), "Writer not reset to the bits given")
+
+
+class TestBitReader(TestCase):
+
+    def test_read(self):
+        reader = BitReader(b'\xbf\xe0\x20')
+        self.assertEqual(0b101, reader.read(3), "Wrong bits read")
+        self.assertEqual(0, reader.read(0), "Wrong empty read")
+        # across a byte boundary
+        self.assertEqual(0x1FE, reader.read(9), "Wrong bits read")
+        self.assertEqual(12, reader.offset, "Wrong offset")
+        self.assertEqual(0x020, reader.read(12), "Wrong bits read")
+        # past the end of the data
+        self.assertRaises(ValueError, reader.read, 1)
+        self.assertEqual(24, reader.offset, "Offset moved by a truncated read")
+        reader = BitReader(b'\xbf\xe0', 12)
+        self.assertRaises(ValueError, reader.read, 5)
+
+    def test_offset(self):
+        reader = BitReader(bytearray(b'\x01\x80'), 7)
+        self.assertEqual(0b11, reader.read(2), "Wrong bits read from offset")
+
+    def test_remaining(self):
+        data = b'\xbf\xe0\x20'
+        reader = BitReader(data, 8)
+        remaining = reader.remaining()
+        # aligned: a view of the data
+        self.assertIsInstance(remaining, memoryview, "Aligned remaining bytes copied")
+        self.assertEqual(b'\xe0\x20', bytes(remaining), "Wrong aligned remaining bytes")
+        # unaligned: the bits that do not complete the last byte are padding
+        reader = BitReader(data, 3)
+        self.assertEqual(b'\xff\x01', bytes(reader.remaining()), "Wrong unaligned remaining bytes")
+        reader = BitReader(data, 20)
+        self.assertEqual(b'', bytes(reader.remaining()), "Padding returned")
+        reader = BitReader(data, 24)
+        self.assertEqual(b'', bytes(reader.remaining()), "Bytes returned at the end")
+
+    def test_round_trip(self):
+        writer = BitWriter()
+        fields = [(0b1, 1), (0x2A, 6), (0x1234, 16), (0, 3), (0x7FFFF, 19)]
+        for value, length in fields:
+            writer.write(value, length)
+        data, padding = writer.to_bytes(b'payload')
+        reader = BitReader(data)
+        self.assertEqual(fields, [(reader.read(length), length) for _, length in fields], "Wrong fields read")
+        self.assertEqual(b'payload', bytes(reader.remaining()), "Wrong payload read")
+
+
+if __name__ == '__main__':
+    main()
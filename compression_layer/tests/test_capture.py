@@ -0,0 +1,92 @@
+""" test_capture: Unit test of SCHC_Capture """
+
+import binascii
+import os
+import struct
+import tempfile
+from unittest import TestCase, main
+from SCHC_Capture import CaptureReader, CaptureWriter
+
+PACKETS = os.path.join(os.path.dirname(__file__), os.pardir, "packets")
+
+
+class TestCapture(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.packets = []
+        for name in ("demo.txt", "demo2.txt"):
+            with open(os.path.join(PACKETS, name)) as packet_file:
+                self.packets.append(binascii.unhexlify(packet_file.read().strip()))
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def path(self, name, data=None):
+        path = os.path.join(self.directory.name, name)
+        if data is not None:
+            with open(path, "wb") as capture:
+                capture.write(data)
+        return path
+
+    @staticmethod
+    def block(block_type, body):
+        length = 12 + len(body)
+        return struct.pack("<II", block_type, length) + body + struct.pack("<I", length)
+
+    def pcapng(self, options, *packets):
+        """pcapng of one Ethernet interface with options and enhanced packet blocks (interface, timestamp, frame)"""
+        data = self.block(0x0A0D0D0A, struct.pack("<IHHq", 0x1A2B3C4D, 1, 0, -1))
+        data += self.block(1, struct.pack("<HHI", 1, 0, 65535) + options)
+        for interface, timestamp, frame in packets:
+            frame += bytes(-len(frame) % 4)
+            data += self.block(6, struct.pack("<IIIII", interface, timestamp >> 32, timestamp & 0xFFFFFFFF,
+                                              len(frame), len(frame)) + frame)
+        return data
+
+    def test_pcap(self):
+        path = self.path("capture.pcap")
+        with CaptureWriter(path) as writer:
+            writer.write(self.packets[0], 1.5)
+            writer.write(self.packets[1], 2.25)
+        self.assertEqual([(1.5, self.packets[0]), (2.25, self.packets[1])],
+                         [(timestamp, bytes(packet)) for timestamp, packet in CaptureReader(path)],
+                         "Wrong packets read")
+
+    def test_raw(self):
+        path = self.path("capture.raw", self.packets[0] + self.packets[1] + self.packets[0][:20])
+        self.assertEqual(self.packets, [bytes(packet) for _, packet in CaptureReader(path)],
+                         "Wrong packets read")
+
+    def test_pcapng(self):
+        ethernet = bytes(12) + b'\x86\xdd'
+        not_ipv6 = bytes(12) + b'\x08\x00' + bytes(20)
+        # if_tsresol 9: nanoseconds
+        options = struct.pack("<HHB3x", 9, 1, 9) + struct.pack("<HH", 0, 0)
+        path = self.path("capture.pcapng", self.pcapng(options, (0, 1500000000, ethernet + self.packets[0]),
+                                                       (0, 0, not_ipv6)))
+        self.assertEqual([(1.5, self.packets[0])],
+                         [(timestamp, bytes(packet)) for timestamp, packet in CaptureReader(path)],
+                         "Wrong packets read")
+        # if_tsresol 0x83: 2^-3 seconds
+        options = struct.pack("<HHB3x", 9, 1, 0x83)
+        path = self.path("binary.pcapng", self.pcapng(options, (0, 12, ethernet + self.packets[1])))
+        self.assertEqual([1.5], [timestamp for timestamp, _ in CaptureReader(path)], "Wrong timestamp")
+        # default resolution: microseconds
+        path = self.path("default.pcapng", self.pcapng(b'', (0, 2500000, ethernet + self.packets[1])))
+        self.assertEqual([2.5], [timestamp for timestamp, _ in CaptureReader(path)], "Wrong timestamp")
+
+    def test_unknown_interface(self):
+        path = self.path("capture.pcapng", self.pcapng(b'', (1, 0, bytes(12) + b'\x86\xdd' + self.packets[0])))
+        self.assertRaises(ValueError, list, CaptureReader(path))
+
+
+if __name__ == '__main__':
+    main()
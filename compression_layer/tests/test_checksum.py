@@ -0,0 +1,85 @@
+""" test_checksum: Unit test of SCHC_Checksum """
+
+import binascii
+import os
+import struct
+from unittest import TestCase, main
+from SCHC_Checksum import SCHC_Checksum
+from SCHC_Parser import SCHC_Parser
+
+PACKETS = os.path.join(os.path.dirname(__file__), os.pardir, "packets")
+
+
+def old_checksum(src_ip, dest_ip, next_header, udp_length, udp_source_port, udp_destination_port, udp_data):
+    """UDP checksum as computed by SCHC_Decompressor on hexadecimal strings before SCHC_Checksum"""
+    sum_phdr = next_header + udp_length
+    for address in (src_ip, dest_ip):
+        for i in range(0, len(address) // 4):
+            sum_phdr += int(address[i * 4:i * 4 + 4], 16)
+    udp_data = udp_data + '0' * (-len(udp_data) % 4)
+    udp_data_sum = 0
+    for i in range(0, len(udp_data) // 4):
+        udp_data_sum += int(udp_data[i * 4:i * 4 + 4], 16)
+    sum_total = sum_phdr + udp_source_port + udp_destination_port + udp_length + udp_data_sum
+    sum_final = (sum_total >> 16) + (sum_total & 0xFFFF)
+    return sum_final ^ 0xFFFF
+
+
+class TestChecksum(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.packets = []
+        for name in ("demo.txt", "demo2.txt"):
+            with open(os.path.join(PACKETS, name)) as packet_file:
+                self.packets.append(binascii.unhexlify(packet_file.read().strip()))
+
+    def test_rfc1071(self):
+        # RFC 1071 section 3 numerical example
+        data = bytes([0x00, 0x01, 0xf2, 0x03, 0xf4, 0xf5, 0xf6, 0xf7])
+        self.assertEqual(0x2ddf0, SCHC_Checksum.words_sum(data), "Wrong sum")
+        self.assertEqual(0xddf2, SCHC_Checksum.fold(SCHC_Checksum.words_sum(data)), "Wrong folded sum")
+        # odd length is padded with a zero byte, views are summed without copies
+        self.assertEqual(0x2ddf0 + 0xab00, SCHC_Checksum.words_sum(data + b'\xab'), "Wrong odd sum")
+        self.assertEqual(0xf203 + 0xf4f5, SCHC_Checksum.words_sum(memoryview(data)[2:6]), "Wrong view sum")
+        self.assertEqual(0, SCHC_Checksum.words_sum(b''), "Wrong empty sum")
+        # carries folded more than once
+        self.assertEqual(0x0001, SCHC_Checksum.fold(0xFFFF + 0xFFFF * 0xFFFF + 1), "Wrong fold")
+
+    def test_packets(self):
+        for packet in self.packets:
+            for length in (len(packet), len(packet) - 1):
+                data = packet[:length]
+                fields = SCHC_Parser.parse_batch([data], "Up")[0]
+                payload = data[SCHC_Parser.HEADER_LENGTH:]
+                udp_length = len(payload) + 8
+                pseudo_sum = SCHC_Checksum.pseudo_header_sum(fields[6], fields[7], fields[8], fields[9], fields[4])
+                checksum = SCHC_Checksum.udp_checksum(pseudo_sum, udp_length, fields[10], fields[11], payload)
+                # the checksum of the pseudo-header and UDP segment with its checksum is all ones
+                segment = struct.pack(">HHHH", fields[10], fields[11], udp_length, checksum) + payload
+                pseudo_header = data[8:40] + struct.pack(">IxxxB", udp_length, fields[4])
+                self.assertEqual(0xFFFF, SCHC_Checksum.fold(SCHC_Checksum.words_sum(pseudo_header + segment)),
+                                 "Wrong checksum")
+                src = "%x" % (fields[6] << 64 | fields[7])
+                dst = "%x" % (fields[8] << 64 | fields[9])
+                self.assertEqual(old_checksum(src, dst, fields[4], udp_length, fields[10], fields[11],
+                                              binascii.hexlify(payload).decode()),
+                                 checksum, "Checksum differs from the previous computation")
+                # the pseudo-header sum does not depend on the direction
+                self.assertEqual(pseudo_sum, SCHC_Checksum.pseudo_header_sum(fields[8], fields[9], fields[6],
+                                                                             fields[7], fields[4]),
+                                 "Pseudo-header sum depends on the direction")
+
+    def test_zero(self):
+        # a computed checksum of zero is sent as all ones
+        self.assertEqual(0xFFFF, SCHC_Checksum.udp_checksum(0xFFFF - 8 - 8, 8, 0, 0, b''), "Zero checksum sent")
+
+
+if __name__ == '__main__':
+    main()
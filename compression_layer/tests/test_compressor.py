@@ -0,0 +1,59 @@
+""" test_compressor: Unit test of SCHC_Compressor """
+
+import binascii
+import os
+from unittest import TestCase, main
+from SCHC_Compressor import SCHC_Compressor
+from SCHC_Parser import SCHC_Parser
+from SCHC_RuleManager import SCHC_RuleManager
+import common
+
+PACKETS = os.path.join(os.path.dirname(__file__), os.pardir, "packets")
+
+
+class TestCompressor(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.packets = []
+        for name in ("demo.txt", "demo2.txt"):
+            with open(os.path.join(PACKETS, name)) as packet_file:
+                self.packets.append(binascii.unhexlify(packet_file.read().strip()))
+        self.rule_manager = SCHC_RuleManager()
+        for rule in (common.rule_97, common.rule_98, common.rule_99, common.rule_64):
+            self.rule_manager.add_rule(rule)
+        self.compressor = SCHC_Compressor(self.rule_manager)
+
+    def test_compress_batch(self):
+        # same flow as the first packet with other value-sent fields (UDP ports, length and checksum)
+        other_ports = self.packets[0][:40] + bytes([1, 2, 3, 4]) + self.packets[0][44:46] + b'\xab\xcd' + \
+            self.packets[0][48:]
+        not_udp = self.packets[0][:6] + b'\x3b' + self.packets[0][7:]
+        packets = [self.packets[0], other_ports, not_udp, self.packets[1], other_ports]
+        for direction in ("Up", "Down"):
+            compressed = self.compressor.compress_batch(packets, direction)
+            self.assertEqual(SCHC_RuleManager.RULE_ID_NOT_COMPRESSED, compressed[2][0][0], "Wrong rule")
+            self.assertEqual((bytes([SCHC_RuleManager.RULE_ID_NOT_COMPRESSED]) + not_udp, 0), compressed[2],
+                             "Wrong uncompressed packet")
+            for packet, schc_packet in zip(packets, compressed):
+                if packet is not not_udp:
+                    self.assertEqual(self.compressor.compress(packet, direction), schc_packet,
+                                     "Batch and single packet compression differ")
+            self.assertNotEqual(compressed[0], compressed[1], "Value-sent fields not written")
+
+    def test_positional_matcher(self):
+        fields = SCHC_Parser.parse_batch(self.packets, "Up")
+        matcher = self.rule_manager.get_matcher(SCHC_Parser.FIELDS, "Up", positional=True)
+        for values in fields:
+            self.assertEqual(self.rule_manager.find_rule_from_values(dict(zip(SCHC_Parser.FIELDS, values)), "Up"),
+                             self.rule_manager.find_rule_from_values(values, "Up", matcher), "Rules differ")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+""" test_decompressor: Unit test of compression and decompression round trips """
+
+import binascii
+import os
+import struct
+from unittest import TestCase, main
+from SCHC_Checksum import SCHC_Checksum
+from SCHC_Compressor import SCHC_Compressor
+from SCHC_Decompressor import SCHC_Decompressor
+from SCHC_Parser import SCHC_Parser
+from SCHC_RuleManager import SCHC_RuleManager
+from tests.test_rule_manager import equal_rule
+import common
+
+PACKETS = os.path.join(os.path.dirname(__file__), os.pardir, "packets")
+
+
+def udp_packet(packet):
+    """packet with the IPv6 payload length, UDP length and checksum of its payload"""
+    fields = list(SCHC_Parser.parse_batch([packet], "Up")[0])
+    payload = packet[SCHC_Parser.HEADER_LENGTH:]
+    length = len(payload) + 8
+    pseudo_sum = SCHC_Checksum.pseudo_header_sum(fields[6], fields[7], fields[8], fields[9], fields[4])
+    checksum = SCHC_Checksum.udp_checksum(pseudo_sum, length, fields[10], fields[11], payload)
+    return packet[:4] + struct.pack(">HBB", length, packet[6], packet[7]) + packet[8:40] + \
+        struct.pack(">HHHH", fields[10], fields[11], length, checksum) + payload
+
+
+class TestDecompressor(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.packets = []
+        for name in ("demo.txt", "demo2.txt"):
+            with open(os.path.join(PACKETS, name)) as packet_file:
+                self.packets.append(binascii.unhexlify(packet_file.read().strip()))
+
+    @staticmethod
+    def rule_manager(*rules):
+        rule_manager = SCHC_RuleManager()
+        for rule in rules:
+            rule_manager.add_rule(rule)
+        return rule_manager
+
+    def test_round_trip(self):
+        rule_manager = self.rule_manager(common.rule_97, common.rule_98, common.rule_99)
+        compressor = SCHC_Compressor(rule_manager)
+        decompressor = SCHC_Decompressor(rule_manager)
+        for direction in SCHC_RuleManager.DIRECTIONS:
+            for packet in self.packets:
+                if direction == "Down":
+                    # rule_99 does not send the hop limit of downlinks, it is always rebuilt as 1
+                    packet = packet[:7] + b'\x01' + packet[8:]
+                schc_packet, _ = compressor.compress(packet, direction)
+                self.assertNotEqual(SCHC_RuleManager.RULE_ID_NOT_COMPRESSED, schc_packet[0], "Packet not compressed")
+                self.assertLess(len(schc_packet), len(packet), "Packet not compressed")
+                self.assertEqual(packet, bytes(decompressor.decompress(schc_packet, direction)),
+                                 "Packet not rebuilt")
+
+    def test_computed(self):
+        # length and checksum are not sent, the decompressor computes them
+        self.packets = [udp_packet(packet) for packet in self.packets]
+        fields = SCHC_Parser.parse_batch(self.packets, "Up")[0]
+        # constant addresses (precompiled pseudo-header sum) or an address sent
+        for sent, residue in (((), 0), (("IPv6.devIID",), 8)):
+            rule_manager = self.rule_manager(equal_rule(10, fields, sent=sent))
+            compressor = SCHC_Compressor(rule_manager)
+            decompressor = SCHC_Decompressor(rule_manager)
+            for packet in self.packets:
+                schc_packet, _ = compressor.compress(packet, "Up")
+                self.assertEqual(len(packet) - SCHC_Parser.HEADER_LENGTH + 1 + residue, len(schc_packet),
+                                 "Wrong residue")
+                self.assertEqual(packet, bytes(decompressor.decompress(schc_packet, "Up")), "Packet not rebuilt")
+
+    def test_batch_round_trip(self):
+        rule_manager = self.rule_manager(common.rule_97, common.rule_98, common.rule_99)
+        compressor = SCHC_Compressor(rule_manager)
+        decompressor = SCHC_Decompressor(rule_manager)
+        not_udp = self.packets[0][:6] + b'\x3b' + self.packets[0][7:]
+        for direction in SCHC_RuleManager.DIRECTIONS:
+            packets = [self.packets[0], not_udp, self.packets[1], self.packets[0]]
+            if direction == "Down":
+                # hop limit rebuilt by rule_99 for downlinks
+                packets = [packet[:7] + b'\x01' + packet[8:] for packet in packets]
+            compressed = compressor.compress_batch(packets, direction)
+            self.assertEqual(SCHC_RuleManager.RULE_ID_NOT_COMPRESSED, compressed[1][0][0], "Packet compressed")
+            self.assertNotIn(SCHC_RuleManager.RULE_ID_NOT_COMPRESSED, [compressed[0][0][0], compressed[2][0][0]],
+                             "Packet not compressed")
+            decompressed = decompressor.decompress_batch([schc_packet for schc_packet, _ in compressed], direction)
+            self.assertEqual(packets, [bytes(packet) for packet in decompressed], "Packets not rebuilt")
+            # same packets one at a time
+            self.assertEqual([decompressor.decompress(schc_packet, direction) for schc_packet, _ in compressed],
+                             decompressed, "Batch and single packet decompression differ")
+
+
+if __name__ == '__main__':
+    main()
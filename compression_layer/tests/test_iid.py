@@ -0,0 +1,78 @@
+""" test_iid: Unit test of SCHC_IID """
+
+import binascii
+from unittest import TestCase, main
+from Crypto.Cipher import AES
+from SCHC_Decompressor import SCHC_Decompressor
+from SCHC_IID import IIDCache
+
+# RFC 4493 section 4 key
+RFC_KEY = binascii.unhexlify("2b7e151628aed2a6abf7158809cf4f3c")
+
+
+def old_dev_iid(eui, key):
+    """
+    devIID as derived by da_dev_iid before IIDCache: one padded block xored with K2, subkeys
+    generated for a key whose L has its most significant bit set and K1 has not (as KEY)
+    """
+    cipher = AES.new(key, AES.MODE_ECB)
+
+    def shift(block):
+        return [((block[i] << 1) & 0xFF) + (block[i + 1] >> 7) for i in range(len(block) - 1)]
+
+    k1 = shift(list(cipher.encrypt(bytes(16))) + [0])
+    k1[15] = k1[15] ^ 0x87
+    k2 = shift(k1 + [0])
+    m = list(eui + bytes([0x80, 0, 0, 0, 0, 0, 0, 0]))
+    for i in range(16):
+        m[i] = m[i] ^ k2[i]
+    return int.from_bytes(cipher.encrypt(bytes(m))[:8], "big")
+
+
+class CountingCache(IIDCache):
+    """IIDCache counting the derivations"""
+
+    def __init__(self, size=1024):
+        super().__init__(size)
+        self.derived = 0
+
+    def derive(self, eui, key):
+        self.derived += 1
+        return super().derive(eui, key)
+
+
+class TestIID(TestCase):
+
+    def test_rfc4493(self):
+        self.assertEqual(0xbb1d6929e9593728, IIDCache.derive(b'', RFC_KEY), "Wrong CMAC of the empty message")
+        message = binascii.unhexlify("6bc1bee22e409f96e93d7e117393172a")
+        self.assertEqual(0x070a16b46b4d4144, IIDCache.derive(message, RFC_KEY), "Wrong CMAC of one block")
+
+    def test_old_derivation(self):
+        self.assertEqual(old_dev_iid(SCHC_Decompressor.DEV_EUI, SCHC_Decompressor.KEY),
+                         IIDCache.derive(SCHC_Decompressor.DEV_EUI, SCHC_Decompressor.KEY),
+                         "devIID differs from the previous derivation")
+
+    def test_cache(self):
+        cache = CountingCache(size=2)
+        euis = [bytes([device]) * 8 for device in range(3)]
+        iids = [cache.get(eui, RFC_KEY) for eui in euis[:2]]
+        self.assertEqual([IIDCache.derive(eui, RFC_KEY) for eui in euis[:2]], iids, "Wrong IIDs")
+        self.assertEqual(iids[0], cache.get(bytearray(euis[0]), RFC_KEY), "Wrong cached IID")
+        self.assertEqual(2, cache.derived, "Cached IID derived again")
+        # euis[1] is the least recently used
+        cache.get(euis[2], RFC_KEY)
+        cache.get(euis[0], RFC_KEY)
+        self.assertEqual(3, cache.derived, "Recently used IID evicted")
+        cache.get(euis[1], RFC_KEY)
+        self.assertEqual(4, cache.derived, "Least recently used IID not evicted")
+        # same EUI, other key
+        cache.get(euis[1], bytes(16))
+        self.assertEqual(5, cache.derived, "IID of another key cached")
+        cache.clear()
+        cache.get(euis[1], bytes(16))
+        self.assertEqual(6, cache.derived, "Cache not cleared")
+
+
+if __name__ == '__main__':
+    main()
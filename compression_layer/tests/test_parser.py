@@ -0,0 +1,55 @@
+""" test_parser: Unit test of SCHC_Parser """
+
+import binascii
+import os
+from unittest import TestCase, main
+from SCHC_Parser import SCHC_Parser
+
+PACKETS = os.path.join(os.path.dirname(__file__), os.pardir, "packets")
+
+
+class TestParser(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        with open(os.path.join(PACKETS, "demo.txt")) as packet_file:
+            self.packet = binascii.unhexlify(packet_file.read().strip())
+
+    def test_parser(self):
+        parser = SCHC_Parser()
+        self.assertTrue(parser.parser(self.packet, "Up"), "IPv6 + UDP packet not parsed")
+        self.assertEqual(6, parser.header_fields["IPv6.version", 1][0], "Wrong version")
+        self.assertEqual(17, parser.header_fields["IPv6.nextHeader", 1][0], "Wrong next header")
+        self.assertEqual(list(self.packet[SCHC_Parser.HEADER_LENGTH:]), parser.udp_data[0], "Wrong UDP data")
+
+    def test_truncated(self):
+        parser = SCHC_Parser()
+        self.assertRaises(ValueError, parser.parser, self.packet[:39], "Up")
+        self.assertRaises(ValueError, parser.parser, self.packet[:SCHC_Parser.HEADER_LENGTH - 1], "Up")
+        # IPv6 header is enough for other L4 protocols
+        other = self.packet[:6] + b'\x3b' + self.packet[7:SCHC_Parser.IPV6_HEADER_LENGTH]
+        self.assertTrue(parser.parser(other, "Up"), "IPv6 header not parsed")
+
+    def test_parse_batch(self):
+        fields = SCHC_Parser.parse_batch([self.packet, self.packet[:47], b'\x45' + self.packet[1:]], "Down")
+        parser = SCHC_Parser()
+        parser.parser(self.packet, "Down")
+        expected = tuple(parser.header_fields[key][0] for key in SCHC_Parser.FIELDS)
+        self.assertEqual([expected, None, None], fields, "Wrong fields of batch")
+
+    def test_build(self):
+        parser = SCHC_Parser()
+        parser.parser(self.packet, "Up")
+        headers = dict((key[0], field[0]) for key, field in parser.header_fields.items())
+        payload = memoryview(self.packet)[SCHC_Parser.HEADER_LENGTH:]
+        self.assertEqual(self.packet, SCHC_Parser.build(headers, payload, "Up"), "Packet not rebuilt")
+
+
+if __name__ == '__main__':
+    main()
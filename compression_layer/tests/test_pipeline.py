@@ -0,0 +1,85 @@
+""" test_pipeline: Unit test of SCHC_Pipeline """
+
+import binascii
+import os
+import sys
+from unittest import TestCase, main
+
+# SCHC_Pipeline needs the fragmentation layer (see README)
+FRAGMENTATION = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "fragmentation_layer", "code")
+if os.path.abspath(FRAGMENTATION) not in sys.path:
+    sys.path.append(os.path.abspath(FRAGMENTATION))
+
+from schc_base import TimerWheel
+from schc_handlers import SCHCGatewayHandler, SCHCNodeHandler
+from schc_protocols import LoRaWAN, SCHCProtocol
+from SCHC_Pipeline import SCHC_Pipeline
+from SCHC_RuleManager import SCHC_RuleManager
+import common
+
+PACKETS = os.path.join(os.path.dirname(__file__), os.pardir, "packets")
+
+
+class TestPipeline(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.packets = []
+        for name in ("demo.txt", "demo2.txt"):
+            with open(os.path.join(PACKETS, name)) as packet_file:
+                self.packets.append(binascii.unhexlify(packet_file.read().strip()))
+        rule_manager = SCHC_RuleManager()
+        for rule in (common.rule_97, common.rule_98, common.rule_99):
+            rule_manager.add_rule(rule)
+        self.pipeline = SCHC_Pipeline(rule_manager)
+
+    def test_transfer(self):
+        for packet in self.packets:
+            fragments, rebuilt = self.pipeline.transfer(packet, "Up", mtu=20)
+            self.assertEqual(packet, bytes(rebuilt), "Packet not rebuilt")
+            self.assertGreater(len(fragments), 1, "Packet not fragmented")
+            self.assertTrue(all(len(fragment) <= 20 for fragment in fragments), "Fragment larger than the MTU")
+
+    def test_compress(self):
+        schc_packet = self.pipeline.compress(self.packets[0], "Up")
+        compressed, unused_bits = self.pipeline.compressor.compress(self.packets[0], "Up")
+        self.assertEqual(len(compressed) * 8 - unused_bits, len(schc_packet), "Wrong SCHC packet length")
+
+    def test_attach_fragmented(self):
+        wheel = TimerWheel()
+        gateway = SCHCGatewayHandler(SCHCProtocol.LoRaWAN, wheel=wheel)
+        node = SCHCNodeHandler(SCHCProtocol.LoRaWAN, wheel=wheel)
+        received = list()
+        self.pipeline.attach(gateway, "Up", lambda packet, device=None: received.append((device, bytes(packet))))
+        node.send_package(LoRaWAN.ACK_ON_ERROR, self.pipeline.compress(self.packets[0], "Up"))
+        for _ in range(100):
+            if len(node.__sessions__) == 0:
+                break
+            while True:
+                message = node.generate_message(LoRaWAN.ACK_ON_ERROR, None, mtu=20)
+                if message == b'':
+                    break
+                gateway.receive(LoRaWAN.ACK_ON_ERROR, None, message, device=b'device01')
+            ack = gateway.generate_message(LoRaWAN.ACK_ON_ERROR, None, mtu=20, device=b'device01')
+            if ack != b'':
+                node.receive(LoRaWAN.ACK_ON_ERROR, None, ack)
+        self.assertEqual([(b'device01', self.packets[0])], received, "Packet not decompressed once")
+
+    def test_attach_unfragmented(self):
+        gateway = SCHCGatewayHandler(SCHCProtocol.LoRaWAN, wheel=TimerWheel())
+        received = list()
+        self.pipeline.attach(gateway, "Up", lambda packet, device=None: received.append((device, bytes(packet))))
+        schc_packet, _ = self.pipeline.compressor.compress(self.packets[1], "Up")
+        # the Rule ID of a SCHC packet not fragmented is a compression one
+        gateway.receive(schc_packet[0], None, schc_packet, device=b'device02')
+        self.assertEqual([(b'device02', self.packets[1])], received, "Packet not decompressed")
+
+
+if __name__ == '__main__':
+    main()
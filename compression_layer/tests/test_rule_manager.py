@@ -0,0 +1,147 @@
+""" test_rule_manager: Unit test of SCHC_RuleManager rule selection """
+
+import binascii
+import os
+from unittest import TestCase, main
+from SCHC_Checksum import SCHC_Checksum
+from SCHC_Parser import SCHC_Parser
+from SCHC_RuleManager import SCHC_RuleManager
+import common
+
+PACKETS = os.path.join(os.path.dirname(__file__), os.pardir, "packets")
+WIDTHS = (4, 8, 20, 16, 8, 8, 64, 64, 64, 64, 16, 16, 16, 16)
+
+
+def equal_rule(rule_id, values, sent=()):
+    """Rule matching the field values (in SCHC_Parser.FIELDS order) with "equal", except the FIDs in sent"""
+    content = []
+    for (fid, fp), width, value in zip(SCHC_Parser.FIELDS, WIDTHS, values):
+        if fid in ("IPv6.payloadLength", "UDP.length"):
+            content.append([fid, width, fp, "Bi", None, "ignore", "compute-length"])
+        elif fid == "UDP.checksum":
+            content.append([fid, width, fp, "Bi", None, "ignore", "compute-checksum"])
+        elif fid in sent:
+            content.append([fid, width, fp, "Bi", None, "ignore", "value-sent"])
+        else:
+            content.append([fid, width, fp, "Bi", value, "equal", "not-sent"])
+    return {"ruleid": rule_id, "devid": None, "content": content}
+
+
+def linear_rule(rule_manager, values, direction):
+    """Rule selected by evaluating the matching operators of every rule in context order"""
+    for rule in rule_manager.context:
+        entries = [content for content in rule["content"] if content[3] == direction or content[3] == "Bi"]
+        # every header field needs an entry in the direction
+        if set(values) - set((content[0], content[2]) for content in entries):
+            continue
+        for fid, length, fp, di, tv, mo, cda in entries:
+            value = values[fid, fp]
+            if mo[:3] == "MSB":
+                matched = rule_manager.mo_msb(length, value, tv, cda, rule_manager.msb_length(mo))
+            else:
+                matched = rule_manager.MatchingOperators[mo](length, value, tv, cda)
+            if not matched:
+                break
+        else:
+            return rule["ruleid"]
+    return SCHC_RuleManager.RULE_ID_NOT_COMPRESSED
+
+
+class TestRuleManager(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        with open(os.path.join(PACKETS, "demo.txt")) as packet_file:
+            self.packet = binascii.unhexlify(packet_file.read().strip())
+        self.fields = SCHC_Parser.parse_batch([self.packet], "Up")[0]
+        self.values = dict(zip(SCHC_Parser.FIELDS, self.fields))
+
+    @staticmethod
+    def rule_manager(*rules):
+        rule_manager = SCHC_RuleManager()
+        for rule in rules:
+            rule_manager.add_rule(rule)
+        return rule_manager
+
+    def test_first_match(self):
+        # equal fields (dispatch table) and MSB / match-mapping (residual checks) rules both match
+        equal = equal_rule(10, self.fields)
+        self.assertEqual(10, self.rule_manager(equal, common.rule_98).find_rule_from_values(self.values, "Up"),
+                         "Rule added first not selected")
+        self.assertEqual(97, self.rule_manager(common.rule_98, equal).find_rule_from_values(self.values, "Up"),
+                         "Rule added first not selected")
+        # same equal fields and values
+        self.assertEqual(11, self.rule_manager(equal_rule(11, self.fields), equal).find_rule_from_values(
+            self.values, "Up"), "Rule added first not selected")
+        # other equal fields
+        ports = equal_rule(12, self.fields, sent=("UDP.devPort", "UDP.appPort"))
+        self.assertEqual(12, self.rule_manager(ports, equal).find_rule_from_values(self.values, "Up"),
+                         "Rule added first not selected")
+        self.assertEqual(10, self.rule_manager(equal, ports).find_rule_from_values(self.values, "Up"),
+                         "Rule added first not selected")
+
+    def test_discarded(self):
+        other_port = self.fields[:10] + (self.fields[10] + 1,) + self.fields[11:]
+        rule_manager = self.rule_manager(equal_rule(10, other_port), common.rule_97, common.rule_98)
+        self.assertEqual(97, rule_manager.find_rule_from_values(self.values, "Up"), "Wrong rule")
+        self.assertEqual(SCHC_RuleManager.RULE_ID_NOT_COMPRESSED,
+                         self.rule_manager(equal_rule(10, other_port)).find_rule_from_values(self.values, "Up"),
+                         "Packet compressed")
+        # rules whose direction does not match
+        self.assertEqual(SCHC_RuleManager.RULE_ID_NOT_COMPRESSED,
+                         self.rule_manager(common.rule_98).find_rule_from_values(self.values, "Down"),
+                         "Packet compressed")
+
+    def test_add_rule(self):
+        rule_manager = self.rule_manager(common.rule_97)
+        self.assertEqual(SCHC_RuleManager.RULE_ID_NOT_COMPRESSED,
+                         rule_manager.find_rule_from_values(self.values, "Up"), "Packet compressed")
+        # compiled matchers are rebuilt after a rule is added
+        rule_manager.add_rule(common.rule_98)
+        self.assertEqual(97, rule_manager.find_rule_from_values(self.values, "Up"), "Rule added not selected")
+
+    def test_linear(self):
+        rule_manager = self.rule_manager(equal_rule(10, self.fields[:2] + (0,) + self.fields[3:]),
+                                         common.rule_97, common.rule_98, equal_rule(11, self.fields))
+        for position in range(len(self.fields)):
+            for delta in (0, 1, 1 << 16):
+                fields = self.fields[:position] + (self.fields[position] ^ delta,) + self.fields[position + 1:]
+                values = dict(zip(SCHC_Parser.FIELDS, fields))
+                for direction in SCHC_RuleManager.DIRECTIONS:
+                    self.assertEqual(linear_rule(rule_manager, values, direction),
+                                     rule_manager.find_rule_from_values(values, direction),
+                                     "Rule differs from a linear search")
+
+    def test_program(self):
+        rule_manager = self.rule_manager(common.rule_98, equal_rule(10, self.fields),
+                                         equal_rule(11, self.fields, sent=("IPv6.devIID",)))
+        compression, decompression, computed = rule_manager.get_program(97, "Up")
+        flow_labels = [0x00000, 0x15a3c, 0x440e8]
+        self.assertEqual(("LSB", ("IPv6.trafficClass", 1), (0, 2)), compression[0], "Wrong LSB step")
+        self.assertEqual(("mapping-sent", ("IPv6.flowLabel", 1), ({0: 0, 0x15a3c: 1, 0x440e8: 2}, 2)),
+                         compression[1], "Wrong mapping-sent step")
+        self.assertEqual(("LSB", ("IPv6.devPrefix", 1), (0x800 << 50, 50)), compression[2], "Wrong LSB step")
+        self.assertEqual(("value-sent", ("UDP.checksum", 1), (16,)), compression[-1], "Wrong value-sent step")
+        self.assertEqual(10, len(compression), "Wrong compression steps")
+        self.assertIn(("mapping-sent", "IPv6.flowLabel", (flow_labels, 2)), decompression, "Wrong mapping-sent step")
+        self.assertIn(("not-sent", "IPv6.hopLimit", (128,)), decompression, "Wrong not-sent step")
+        self.assertNotIn(("not-sent", "IPv6.hopLimit", (128,)), rule_manager.get_program(97, "Down")[1],
+                         "Step of the other direction")
+        self.assertEqual((("compute-length", "IPv6.payloadLength", ()),), computed, "Wrong computed steps")
+        # an address is sent, the pseudo-header sum is computed per packet
+        _, _, computed = rule_manager.get_program(11, "Up")
+        self.assertIn(("compute-checksum", "UDP.checksum", (None,)), computed, "Wrong compute-checksum step")
+        _, _, computed = rule_manager.get_program(10, "Up")
+        pseudo_sum = SCHC_Checksum.pseudo_header_sum(*(self.values[field, 1]
+                                                       for field in SCHC_RuleManager.PSEUDO_HEADER_FIELDS))
+        self.assertIn(("compute-checksum", "UDP.checksum", (pseudo_sum,)), computed, "Pseudo-header sum not compiled")
+
+
+if __name__ == '__main__':
+    main()
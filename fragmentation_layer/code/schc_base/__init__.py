@@ -1,7 +1,10 @@
 """schc_base: SCHC package with base classes"""
 
+from schc_base.bit_buffer import BitBuffer
 from schc_base.schc_object import SCHCObject
 from schc_base.tile import Tile
 from schc_base.attempts_counter import AttemptsCounter
+from schc_base.timer_wheel import TimerWheel
 from schc_base.timer import SCHCTimer
 from schc_base.bitmap import Bitmap
+from schc_base.reassembly_buffer import ReassemblyBuffer
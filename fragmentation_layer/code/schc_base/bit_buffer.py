@@ -0,0 +1,292 @@
+"""bit_buffer: BitBuffer class, a bit sequence stored as bytes"""
+
+
+class BitBuffer:
+    """
+    Sequence of bits stored as bytes plus a length in bits (and an offset
+    in bits on those bytes), so bit arithmetic is done on integers instead
+    of strings of 0s and 1s. Slicing returns views sharing the same bytes,
+    without copying them
+
+    Attributes
+    ----------
+    __content__ : bytes or bytearray or memoryview
+        Bytes holding the sequence, bits are stored left aligned
+    __offset__ : int
+        First bit of the sequence on content
+    __length__ : int
+        Length of the sequence in bits
+    __growable__ : bool
+        Whether content is a bytearray owned by this buffer, which can be
+        extended in place
+    """
+
+    def __init__(self, content=b'', length=None, offset=0):
+        """
+        Constructor
+
+        Parameters
+        ----------
+        content : bytes or memoryview, optional
+            Bytes to hold, empty by default. A memoryview is not copied
+            (e.g. to hold part of a message received)
+        length : int, optional
+            Number of bits of content (from offset) to hold,
+            all the bits of content by default
+        offset : int, optional
+            First bit of content to hold, default 0
+        """
+        if not isinstance(content, (bytes, memoryview)):
+            content = bytes(content)
+        if offset < 0 or offset > len(content) * 8:
+            raise ValueError("offset must be between 0 and {} bits".format(len(content) * 8))
+        if length is None:
+            length = len(content) * 8 - offset
+        if length < 0 or offset + length > len(content) * 8:
+            raise ValueError("length must be between 0 and {} bits".format(len(content) * 8 - offset))
+        self.__content__ = content
+        self.__offset__ = offset
+        self.__length__ = length
+        self.__growable__ = False
+        return
+
+    @staticmethod
+    def __view__(content, offset, length):
+        """
+        Buffer of length bits starting at offset of content, content is not copied
+
+        Returns
+        -------
+        BitBuffer :
+            A new instance sharing content
+        """
+        view = BitBuffer.__new__(BitBuffer)
+        view.__content__ = content
+        view.__offset__ = offset
+        view.__length__ = length
+        view.__growable__ = False
+        return view
+
+    @staticmethod
+    def from_int(value, length):
+        """
+        Creates a BitBuffer with value encoded in length bits (big endian)
+
+        Parameters
+        ----------
+        value : int
+            Non negative integer, it must fit in length bits
+        length : int
+            Length in bits
+
+        Returns
+        -------
+        BitBuffer :
+            A new instance
+        """
+        if value < 0 or value >> length:
+            raise ValueError("{} cannot be represented in {} bits".format(value, length))
+        size = (length + 7) // 8
+        return BitBuffer.__view__((value << (size * 8 - length)).to_bytes(size, "big"), 0, length)
+
+    @staticmethod
+    def from_bits(bits):
+        """
+        Creates a BitBuffer from a string of 0s and 1s
+
+        Parameters
+        ----------
+        bits : str
+            Bit sequence as a string
+
+        Returns
+        -------
+        BitBuffer :
+            A new instance
+
+        Raises
+        ------
+        ValueError
+            bits contains characters other than 0 and 1
+        """
+        if bits.strip("01") != "":
+            raise ValueError("bits must be a string of 0s and 1s")
+        if len(bits) == 0:
+            return BitBuffer()
+        return BitBuffer.from_int(int(bits, 2), len(bits))
+
+    @staticmethod
+    def join(buffers):
+        """
+        Concatenates several buffers at once
+
+        Parameters
+        ----------
+        buffers : Iterable[BitBuffer or str]
+            Buffers (or bit strings) to concatenate, in order
+
+        Returns
+        -------
+        BitBuffer :
+            A new instance
+        """
+        value = 0
+        length = 0
+        for buffer in buffers:
+            buffer = BitBuffer.__as_buffer__(buffer)
+            value = (value << len(buffer)) | buffer.to_int()
+            length += len(buffer)
+        return BitBuffer.from_int(value, length)
+
+    @staticmethod
+    def __as_buffer__(other):
+        """
+        Turns a bit string or bytes into a BitBuffer, a BitBuffer is returned as it is
+        """
+        if isinstance(other, BitBuffer):
+            return other
+        elif isinstance(other, str):
+            return BitBuffer.from_bits(other)
+        elif isinstance(other, (bytes, bytearray)):
+            return BitBuffer(other)
+        raise TypeError("Cannot use {} as a bit sequence".format(type(other).__name__))
+
+    def to_int(self):
+        """
+        Value of the sequence as an unsigned integer (big endian)
+
+        Returns
+        -------
+        int :
+            0 for an empty sequence
+        """
+        if self.__length__ == 0:
+            return 0
+        first = self.__offset__ // 8
+        end = self.__offset__ + self.__length__
+        last = (end + 7) // 8
+        value = int.from_bytes(self.__content__[first:last], "big")
+        return (value >> (last * 8 - end)) & ((1 << self.__length__) - 1)
+
+    def as_bits(self):
+        """
+        Representation of bits sequence, materialized on demand
+
+        Returns
+        -------
+        str :
+            Bits sequence as text
+        """
+        if self.__length__ == 0:
+            return ""
+        return "{:0{}b}".format(self.to_int(), self.__length__)
+
+    def as_bytes(self):
+        """
+        Bytes of the sequence, a last incomplete byte is padded with zeroes to the right
+
+        Returns
+        -------
+        bytes :
+            Content in bytes
+        """
+        if self.__offset__ % 8 == 0:
+            first = self.__offset__ // 8
+            content = bytes(self.__content__[first:first + (self.__length__ + 7) // 8])
+            if self.__length__ % 8 == 0 or content[-1] & (0xFF >> (self.__length__ % 8)) == 0:
+                return content
+        size = (self.__length__ + 7) // 8
+        return (self.to_int() << (size * 8 - self.__length__)).to_bytes(size, "big")
+
+    def append(self, other):
+        """
+        Adds bits at the end of the sequence. An empty sequence shares the
+        content of the first sequence appended, content is copied on the
+        next append and later ones extend it in place
+
+        Parameters
+        ----------
+        other : BitBuffer or str or bytes
+            Bits to add
+
+        Returns
+        -------
+        int :
+            Length of the sequence
+        """
+        other = BitBuffer.__as_buffer__(other)
+        if self.__length__ == 0 and not other.__growable__:
+            self.__content__ = other.__content__
+            self.__offset__ = other.__offset__
+            self.__length__ = other.__length__
+            self.__growable__ = False
+            return self.__length__
+        if not self.__growable__:
+            self.__content__ = bytearray(self.as_bytes())
+            self.__offset__ = 0
+            self.__growable__ = True
+        used = self.__length__ % 8
+        if used == 0:
+            self.__content__ += other.as_bytes()
+        elif len(other) != 0:
+            last = self.__content__.pop() >> (8 - used)
+            self.__content__ += BitBuffer.from_int((last << len(other)) | other.to_int(),
+                                                   used + len(other)).as_bytes()
+        self.__length__ += len(other)
+        return self.__length__
+
+    def extend(self, others):
+        """
+        Adds several sequences at the end, in order
+
+        Parameters
+        ----------
+        others : Iterable[BitBuffer or str or bytes]
+            Bits to add
+
+        Returns
+        -------
+        int :
+            Length of the sequence
+        """
+        return self.append(BitBuffer.join(others))
+
+    def __len__(self):
+        return self.__length__
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.__length__)
+            if step != 1:
+                raise ValueError("BitBuffer slices do not support steps")
+            return BitBuffer.__view__(self.__content__, self.__offset__ + start, max(0, stop - start))
+        if item < 0:
+            item += self.__length__
+        if item < 0 or item >= self.__length__:
+            raise IndexError("BitBuffer index out of range")
+        position = self.__offset__ + item
+        return (self.__content__[position // 8] >> (7 - position % 8)) & 1
+
+    def __iter__(self):
+        value = self.to_int()
+        for i in range(self.__length__ - 1, -1, -1):
+            yield (value >> i) & 1
+
+    def __add__(self, other):
+        return BitBuffer.join([self, other])
+
+    def __radd__(self, other):
+        return BitBuffer.join([other, self])
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            return self.as_bits() == other
+        if not isinstance(other, BitBuffer):
+            return NotImplemented
+        return self.__length__ == other.__length__ and self.to_int() == other.to_int()
+
+    def __hash__(self):
+        return hash((self.__length__, self.to_int()))
+
+    def __repr__(self):
+        return "BitBuffer('{}')".format(self.as_bits())
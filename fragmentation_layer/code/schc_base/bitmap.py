@@ -5,15 +5,23 @@ from schc_protocols import SCHCProtocol
 
 class Bitmap:
     """
-    Bitmap class to register tiles received on windows
+    Bitmap class to register tiles received on windows. Bits are kept
+    on an integer, the bit of the tile with FCN fcn is the bit fcn of
+    the integer (so the first tile of the window is the most significant
+    bit, as it is sent on a compressed bitmap), then counting received
+    tiles, finding the first missing one and compressing the bitmap are
+    bit operations instead of walks over a list
 
     Attributes
     ----------
     protocol : SCHCProtocol
         Protocol to use on Bitmap
-    __bitmap__ : List
-        List of bits with WINDOW_SIZE length
+    __mask__ : int
+        Bits of the bitmap, bit fcn is 1 if tile fcn was received
+    __size__ : int
+        Number of bits of the bitmap
     """
+
     def __init__(self, protocol, short_size=None):
         """
         Constructor
@@ -26,12 +34,13 @@ class Bitmap:
             In case is the bitmap of the last window, number of tiles of last window
         """
         self.protocol = protocol
-        if short_size is not None:
-            self.__bitmap__ = [False] * short_size
-        else:
-            self.__bitmap__ = [False] * protocol.WINDOW_SIZE
+        self.__size__ = short_size if short_size is not None else protocol.WINDOW_SIZE
+        self.__mask__ = 0
         return
 
+    def __full__(self):
+        return (1 << self.__size__) - 1
+
     def generate_compress(self):
         """
         Compress Bitmap of ACK Message
@@ -41,19 +50,14 @@ class Bitmap:
         List[bool]:
             Generate Compressed Bitmap field
         """
-        if len(self.__bitmap__) == 1:
-            return self.__bitmap__.copy()
-        else:
-            header_length = sum([
-                self.protocol.RULE_SIZE, self.protocol.T,
-                self.protocol.M, 1
-            ])
-            scissor = len(self.__bitmap__)
-            while self.__bitmap__[scissor - 1] and scissor > 0:
-                scissor -= 1
-            while (scissor + header_length) % self.protocol.L2_WORD != 0 and scissor > -1:
-                scissor += 1
-            return self.__bitmap__[0:scissor].copy()
+        if self.__size__ == 1:
+            return list(self)
+        # trailing ones (received tiles at the end of the window) are not sent
+        received_at_end = ((self.__mask__ ^ (self.__mask__ + 1)).bit_length() - 1)
+        scissor = self.__size__ - min(received_at_end, self.__size__)
+        scissor = min(self.protocol.COMPRESSED_BITMAP_SIZES[scissor], self.__size__)
+        head = self.__mask__ >> (self.__size__ - scissor)
+        return [(head >> i) & 1 == 1 for i in range(scissor - 1, -1, -1)]
 
     def tile_received(self, fcn):
         """
@@ -68,7 +72,7 @@ class Bitmap:
         -------
         None, alter self
         """
-        self.__bitmap__[-fcn - 1] = True
+        self.__mask__ |= 1 << fcn
         return
 
     @staticmethod
@@ -90,8 +94,12 @@ class Bitmap:
             A Bitmap object
         """
         calculated_bitmap = Bitmap(protocol)
-        calculated_bitmap.__bitmap__ = bitmap
-        calculated_bitmap.__bitmap__ += [True] * (protocol.WINDOW_SIZE - len(bitmap))
+        mask = 0
+        for bit in bitmap:
+            mask = (mask << 1) | (1 if bit else 0)
+        # tiles after the compressed bitmap were received
+        padding = protocol.WINDOW_SIZE - len(bitmap)
+        calculated_bitmap.__mask__ = (mask << padding) | ((1 << padding) - 1)
         return calculated_bitmap
 
     def is_missing(self):
@@ -103,7 +111,18 @@ class Bitmap:
         bool :
             True if there are missing tiles
         """
-        return len(self.__bitmap__) > sum(self.__bitmap__)
+        return self.__mask__ != self.__full__()
+
+    def received(self):
+        """
+        Number of tiles received
+
+        Returns
+        -------
+        int :
+            Number of bits set
+        """
+        return bin(self.__mask__).count("1")
 
     def get_missing(self, fcn=False):
         """
@@ -119,19 +138,42 @@ class Bitmap:
         -------
         int :
             First index with missing tile
+
+        Raises
+        ------
+        ValueError :
+            There is no missing tile
         """
-        i = self.__bitmap__.index(False)
+        missing = self.__mask__ ^ self.__full__()
+        if missing == 0:
+            raise ValueError("There is no missing tile")
+        i = self.__size__ - missing.bit_length()
         if fcn:
             return self.protocol.WINDOW_SIZE - 1 - i
         else:
             return i
 
+    def missing(self):
+        """
+        FCNs of missing tiles, in order of tiles on window (decreasing FCN)
+
+        Returns
+        -------
+        Iterator[int] :
+            FCN of each missing tile
+        """
+        missing = self.__mask__ ^ self.__full__()
+        while missing != 0:
+            fcn = missing.bit_length() - 1
+            yield fcn
+            missing ^= 1 << fcn
+
     def __repr__(self):
-        return "".join(["1" if i else "0" for i in self.__bitmap__])
+        return format(self.__mask__, "0{}b".format(self.__size__)) if self.__size__ != 0 else ""
 
     def __len__(self):
-        return len(self.__bitmap__)
+        return self.__size__
 
     def __iter__(self):
-        for bit in self.__bitmap__:
-            yield bit
+        for i in range(self.__size__ - 1, -1, -1):
+            yield (self.__mask__ >> i) & 1 == 1
@@ -0,0 +1,290 @@
+""" reassembly_buffer: ReassemblyBuffer class """
+
+from schc_base import BitBuffer
+
+
+class ReassemblyBuffer:
+    """
+    Buffer where a receiver reassembles a SCHC Packet. When tiles have a
+    fixed size, slots for the tiles of a window are reserved the first
+    time the window is used and each tile is written in place, on the
+    slot given by (W, FCN), so tiles can arrive in any order and
+    duplicates are detected in O(1). When tiles have no fixed size
+    (TILE_SIZE = 0, one tile per window), tiles are appended in order
+    and a tile of the window just written is a duplicate. The tile of
+    the All-1 fragment is kept apart and written after the last slot
+    used when the packet is requested. The RCS of the packet is
+    calculated as tiles arrive: every tile contiguous to the ones
+    already checked is folded into a running RCS, so checking the
+    integrity only requires to fold the All-1 tile
+
+    Attributes
+    ----------
+    protocol : SCHCProtocol
+        Protocol of the session
+    size : int
+        Size of the packet reassembled (in bits)
+    __content__ : bytearray
+        Slots of tiles, WINDOW_TILES per window (parity tiles are not
+        part of packet)
+    __received__ : bytearray
+        Whether each slot was written (1) or not (0)
+    __end__ : int
+        End (in bytes) of the last slot written
+    __last__ : bytes
+        Tile of the All-1 fragment, None if it was not received
+    __last_window__ : int
+        Window of the last tile appended, when tiles have no fixed size
+    __rcs__ : int
+        Running RCS of the first __checked__ bytes of content
+    __checked__ : int
+        Number of bytes of content folded into __rcs__
+    """
+
+    def __init__(self, protocol):
+        """
+        Constructor
+
+        Parameters
+        ----------
+        protocol : SCHCProtocol
+            Protocol of the session, with its Rule ID set
+        """
+        self.protocol = protocol
+        self.size = 0
+        self.__tile_size__ = protocol.TILE_BYTES
+        self.__content__ = bytearray()
+        self.__received__ = bytearray()
+        self.__end__ = 0
+        self.__last__ = None
+        self.__last_window__ = None
+        self.__rcs__ = 0
+        self.__checked__ = 0
+        return
+
+    def __slot__(self, w, fcn):
+        """
+        Index of the slot of tile with FCN fcn on window w (FCN counts down on a window)
+        """
+        return w * self.protocol.WINDOW_TILES + self.protocol.WINDOW_TILES - 1 - fcn
+
+    def __reserve__(self, w):
+        """
+        Reserves the slots of every window up to w
+        """
+        slots = (w + 1) * self.protocol.WINDOW_TILES
+        if len(self.__received__) < slots:
+            self.__content__.extend(bytes((slots - len(self.__received__)) * self.__tile_size__))
+            self.__received__.extend(bytes(slots - len(self.__received__)))
+        return
+
+    def has_tile(self, w, fcn):
+        """
+        Whether a tile was received
+
+        Parameters
+        ----------
+        w : int
+            Window of tile
+        fcn : int
+            FCN of tile
+
+        Returns
+        -------
+        bool :
+            True if tile was already written
+        """
+        if self.__tile_size__ == 0:
+            return w == self.__last_window__
+        slot = self.__slot__(w, fcn)
+        return slot < len(self.__received__) and self.__received__[slot] == 1
+
+    def get_tile(self, w, fcn):
+        """
+        Content of a tile received
+
+        Parameters
+        ----------
+        w : int
+            Window of tile
+        fcn : int
+            FCN of tile
+
+        Returns
+        -------
+        bytes :
+            Content of tile, None if it was not received
+        """
+        if self.__tile_size__ == 0 or not self.has_tile(w, fcn):
+            return None
+        start = self.__slot__(w, fcn) * self.__tile_size__
+        return bytes(self.__content__[start:start + self.__tile_size__])
+
+    def add_tile(self, w, fcn, tile):
+        """
+        Writes a tile of a regular fragment on its slot
+
+        Parameters
+        ----------
+        w : int
+            Window of tile
+        fcn : int
+            FCN of tile
+        tile : BitBuffer or bytes
+            Content of tile, TILE_SIZE bits (or the whole payload
+            of the fragment when tiles have no fixed size)
+
+        Returns
+        -------
+        bool :
+            False if tile was a duplicate (and it was not written)
+        """
+        if self.has_tile(w, fcn):
+            return False
+        if isinstance(tile, BitBuffer):
+            tile = tile.as_bytes()
+        if self.__tile_size__ == 0:
+            self.__content__.extend(tile)
+            self.__end__ = len(self.__content__)
+            self.__last_window__ = w
+        else:
+            self.__reserve__(w)
+            slot = self.__slot__(w, fcn)
+            start = slot * self.__tile_size__
+            self.__content__[start:start + self.__tile_size__] = tile[0:self.__tile_size__]
+            self.__received__[slot] = 1
+            self.__end__ = max(self.__end__, start + self.__tile_size__)
+        self.__fold__()
+        self.size = self.__packet_size__() * 8
+        return True
+
+    def __fold__(self):
+        """
+        Folds into the running RCS every tile contiguous to the bytes already checked
+        """
+        if self.__tile_size__ == 0:
+            end = self.__end__
+        else:
+            slot = self.__checked__ // self.__tile_size__
+            while slot < len(self.__received__) and self.__received__[slot] == 1:
+                slot += 1
+            end = slot * self.__tile_size__
+        if end > self.__checked__:
+            self.__rcs__ = self.protocol.update_rcs(self.__rcs__, self.__content__[self.__checked__:end])
+            self.__checked__ = end
+        return
+
+    def rcs(self):
+        """
+        RCS of the packet reassembled, as calculate_rcs of protocol would
+        return for as_bytes (just the All-1 tile is folded when every other
+        tile was received)
+
+        Returns
+        -------
+        str :
+            Reassembly Check Sequence of the packet
+        """
+        if self.__checked__ != self.__end__:
+            return self.protocol.calculate_rcs(self.as_buffer())  # missing tiles
+        rcs = self.__rcs__
+        if self.__last__ is not None:
+            rcs = self.protocol.update_rcs(rcs, self.__last__)
+        return hex(rcs)
+
+    def rcs_with(self, tiles, w, count):
+        """
+        RCS the packet would have with some tiles written, without writing
+        them, when window w is the last one and has count tiles (before
+        the All-1 tile). Used to check tiles reconstructed from parity
+
+        Parameters
+        ----------
+        tiles : Dict[int, bytes]
+            Content of tiles not received, by FCN, on window w
+        w : int
+            Last window
+        count : int
+            Number of tiles of window w
+
+        Returns
+        -------
+        str :
+            Reassembly Check Sequence of the packet, None if tiles were
+            received after the count tiles of window w
+        """
+        end = (w * self.protocol.WINDOW_TILES + count) * self.__tile_size__
+        if end < self.__end__:
+            return None  # tiles received after end
+        content = bytearray(self.__content__[self.__checked__:end])
+        content.extend(bytes(end - self.__checked__ - len(content)))
+        for fcn, tile in tiles.items():
+            start = self.__slot__(w, fcn) * self.__tile_size__ - self.__checked__
+            content[start:start + self.__tile_size__] = tile
+        rcs = self.protocol.update_rcs(self.__rcs__, content)
+        if self.__last__ is not None:
+            rcs = self.protocol.update_rcs(rcs, self.__last__)
+        return hex(rcs)
+
+    def add_last_tile(self, tile):
+        """
+        Sets the tile of the All-1 fragment, placed after every other tile
+
+        Parameters
+        ----------
+        tile : BitBuffer or bytes
+            Content of tile
+
+        Returns
+        -------
+        bool :
+            False if it was already received (it is replaced anyway)
+        """
+        duplicate = self.__last__ is not None
+        self.__last__ = tile.as_bytes() if isinstance(tile, BitBuffer) else bytes(tile)
+        self.size = self.__packet_size__() * 8
+        return not duplicate
+
+    def __packet_size__(self):
+        if self.__last__ is None:
+            return self.__end__
+        return self.__end__ + len(self.__last__)
+
+    def as_bytes(self):
+        """
+        Packet reassembled (with tiles received so far), as one contiguous sequence
+
+        Returns
+        -------
+        bytes :
+            Tiles in order of slots followed by the All-1 tile
+        """
+        if self.__last__ is not None:
+            end = self.__end__ + len(self.__last__)
+            if len(self.__content__) < end:
+                self.__content__.extend(bytes(end - len(self.__content__)))
+            self.__content__[self.__end__:end] = self.__last__
+            return bytes(memoryview(self.__content__)[0:end])
+        return bytes(memoryview(self.__content__)[0:self.__end__])
+
+    def as_buffer(self):
+        """
+        Packet reassembled as a bit sequence
+
+        Returns
+        -------
+        BitBuffer :
+            See as_bytes
+        """
+        return BitBuffer(self.as_bytes())
+
+    def as_bits(self):
+        """
+        Packet reassembled as a string of 0s and 1s
+
+        Returns
+        -------
+        str :
+            See as_bytes
+        """
+        return self.as_buffer().as_bits()
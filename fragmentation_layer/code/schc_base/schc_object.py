@@ -1,5 +1,7 @@
 """schc_object: SCHC object abstract class (works as an Interface)"""
 
+from schc_base.bit_buffer import BitBuffer
+
 
 class SCHCObject:
     """
@@ -23,6 +25,17 @@ class SCHCObject:
         self.size = 0
         return
 
+    def as_buffer(self):
+        """
+        Represent the SCHCObject content as a bit sequence
+
+        Returns
+        -------
+        BitBuffer :
+            Bit sequence
+        """
+        return BitBuffer()
+
     def as_bits(self):
         """
         Represent the SCHCObject content in a string
@@ -33,7 +46,7 @@ class SCHCObject:
         str :
             Bit sequence as a string
         """
-        return ''
+        return self.as_buffer().as_bits()
 
     def as_bytes(self):
         """
@@ -61,11 +74,7 @@ class SCHCObject:
         str :
             Bit sequence as a string
         """
-        direct = "{:0b}".format(int.from_bytes(content, "big"))
-        zeros_missing = (len(content) * 8) - len(direct)
-        if zeros_missing > 0:
-            return ("0" * zeros_missing) + direct
-        return direct
+        return BitBuffer(content).as_bits()
 
     @staticmethod
     def bits_2_bytes(content: str):
@@ -82,16 +91,12 @@ class SCHCObject:
         str :
             Content in bytes
         """
-        byte = 0
-        list_bytes = list()
-        for i, bit in enumerate(content):
-            byte = (byte << 1) | int(bit)
-            if (i + 1) % 8 == 0:
-                list_bytes.append(byte)
-                byte = 0
-        if len(content) % 8 != 0:
-            list_bytes.append(byte)
-        return bytes(list_bytes)
+        full = len(content) - len(content) % 8
+        result = BitBuffer.from_bits(content[:full]).as_bytes()
+        if full != len(content):
+            # last incomplete byte is kept right aligned
+            result += bytes([int(content[full:], 2)])
+        return result
 
     @staticmethod
     def zfill(bits, length):
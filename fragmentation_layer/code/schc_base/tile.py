@@ -1,6 +1,6 @@
 """tile: Tile class representation"""
 
-from schc_base import SCHCObject
+from schc_base import SCHCObject, BitBuffer
 
 
 class Tile(SCHCObject):
@@ -9,10 +9,8 @@ class Tile(SCHCObject):
 
     Attributes
     ----------
-    content : bytes
+    content : BitBuffer
         Content of tile
-    encoded_content : bits
-        Content as a string of 0s and 1s
     size : int
         Size in bit
     """
@@ -22,22 +20,22 @@ class Tile(SCHCObject):
 
         Parameters
         ----------
-        content : bytes or str
-            Tile must contain bytes or be a binary string
+        content : bytes or str or BitBuffer
+            Tile must contain bytes, a binary string or a bit sequence
         """
         super().__init__()
-        if isinstance(content, bytes):
+        if isinstance(content, BitBuffer):
             self.content = content
-            self.encoded_content = SCHCObject.bytes_2_bits(content)
+        elif isinstance(content, bytes):
+            self.content = BitBuffer(content)
         elif isinstance(content, str):
-            unique_chars = list(set(content))
-            if len(unique_chars) != 2 or not ("0" in unique_chars and "1" in unique_chars):
+            try:
+                self.content = BitBuffer.from_bits(content)
+            except ValueError:
                 raise TypeError("content must be a binary string (just 0s and 1s are allowed)")
-            self.encoded_content = content
-            self.content = SCHCObject.bits_2_bytes(content)
         else:
             raise TypeError("content must be bytes or a string of 0s and 1s")
-        self.size = len(self.encoded_content)
+        self.size = len(self.content)
         return
 
     def as_bytes(self):
@@ -49,15 +47,15 @@ class Tile(SCHCObject):
         Tuple[bytes]:
             A tuple (of length 0) containing the content of Tile
         """
-        return self.content,
+        return self.content.as_bytes(),
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Representation of bits sequence
 
         Returns
         -------
-        str :
-            Bits sequence as text
+        BitBuffer :
+            Content of tile
         """
-        return self.encoded_content
+        return self.content
@@ -1,6 +1,6 @@
 """ timer: Timer class """
 
-from machine import Timer
+from schc_base.timer_wheel import TimerWheel
 
 
 class SCHCTimer:
@@ -9,25 +9,33 @@ class SCHCTimer:
 
     Attributes
     ----------
-    __alarm__ : Timer.Alarm
-        Alarm that execute on expire
+    __wheel__ : TimerWheel
+        Wheel that expires the timer
     __handler__ : Callable
-        Function to call on expiration
+        Function to call on expiration, it receives the timer
     __max_time__ : int
         Time on expiration
+    __bucket__ : int
+        Bucket of wheel where timer is scheduled, None if it is stopped
     """
-    def __init__(self, handler, max_time):
+    def __init__(self, handler, max_time, wheel=None):
         """
-        Constructor
+        Constructor, timer starts running
 
         Parameters
         ----------
+        handler : Callable
+            Function to call on expiration
         max_time : int
             Maximum time in seconds
+        wheel : TimerWheel, optional
+            Wheel to use, default TimerWheel.default() (driven by a background thread)
         """
-        self.__alarm__ = Timer.Alarm(handler, max_time)
+        self.__wheel__ = wheel if wheel is not None else TimerWheel.default()
         self.__handler__ = handler
         self.__max_time__ = max_time
+        self.__bucket__ = None
+        self.__wheel__.schedule(self, max_time)
         return
 
     def reset(self):
@@ -38,8 +46,7 @@ class SCHCTimer:
         -------
         None, alter self
         """
-        self.__alarm__.cancel()
-        self.__alarm__ = Timer.Alarm(self.__handler__, self.__max_time__)
+        self.__wheel__.schedule(self, self.__max_time__)
         return
 
     def stop(self):
@@ -50,5 +57,20 @@ class SCHCTimer:
         -------
         None, alter self
         """
-        self.__alarm__.cancel()
+        self.__wheel__.cancel(self)
+        return
+
+    def is_running(self):
+        """
+        Whether timer is waiting for its expiration
+
+        Returns
+        -------
+        bool :
+            True if timer was started and it has not expired nor stopped
+        """
+        return self.__bucket__ is not None
+
+    def __expire__(self):
+        self.__handler__(self)
         return
@@ -0,0 +1,246 @@
+""" timer_wheel: TimerWheel class, scheduler of SCHC timers """
+
+import threading
+from time import monotonic
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel: timers are kept in buckets by their expiration
+    tick (modulo the number of buckets), so scheduling and cancelling a
+    timer cost O(1) and advancing the wheel only visits the buckets of
+    elapsed ticks. Timers do not own threads, the wheel is advanced by a
+    single driver: a background thread (start), an asyncio loop (attach)
+    or explicit calls to advance (e.g. with a virtual clock)
+
+    Attributes
+    ----------
+    clock : Callable[[], float]
+        Current time in seconds
+    resolution : float
+        Duration of a tick in seconds
+    __buckets__ : List[Dict[SCHCTimer, int]]
+        Timers of each bucket with their expiration tick
+    __tick__ : int
+        Last tick processed
+    __lock__ : threading.RLock
+        Protects buckets when timers are used from several threads
+    """
+    __default__ = None
+
+    def __init__(self, clock=monotonic, resolution=0.1, buckets=512):
+        """
+        Constructor
+
+        Parameters
+        ----------
+        clock : Callable[[], float], optional
+            Current time in seconds, default time.monotonic
+        resolution : float, optional
+            Duration of a tick in seconds, default 0.1
+        buckets : int, optional
+            Number of buckets of the wheel, default 512
+        """
+        self.clock = clock
+        self.resolution = resolution
+        self.__buckets__ = [dict() for _ in range(buckets)]
+        self.__tick__ = self.__to_tick__(clock())
+        self.__timers__ = 0
+        self.__lock__ = threading.RLock()
+        self.__thread__ = None
+        self.__running__ = False
+        self.__handle__ = None
+        return
+
+    @staticmethod
+    def default():
+        """
+        Wheel used by timers when none is specified, driven by a background thread
+
+        Returns
+        -------
+        TimerWheel :
+            Shared instance, started on first use
+        """
+        if TimerWheel.__default__ is None:
+            TimerWheel.__default__ = TimerWheel()
+            TimerWheel.__default__.start()
+        return TimerWheel.__default__
+
+    def __to_tick__(self, time):
+        return int(time // self.resolution)
+
+    def schedule(self, timer, delay):
+        """
+        Schedules timer to expire after delay seconds, rescheduling it if it was scheduled
+
+        Parameters
+        ----------
+        timer : SCHCTimer
+            Timer to schedule
+        delay : float
+            Seconds until expiration
+
+        Returns
+        -------
+        None, alter timer
+        """
+        with self.__lock__:
+            self.cancel(timer)
+            # expires once the whole delay has elapsed, even if clock is in the middle of a tick
+            deadline = max(self.__to_tick__(self.clock() + delay) + 1, self.__tick__ + 1)
+            bucket = deadline % len(self.__buckets__)
+            self.__buckets__[bucket][timer] = deadline
+            timer.__bucket__ = bucket
+            self.__timers__ += 1
+        return
+
+    def cancel(self, timer):
+        """
+        Cancels timer, nothing is done if it was not scheduled
+
+        Parameters
+        ----------
+        timer : SCHCTimer
+            Timer to cancel
+
+        Returns
+        -------
+        None, alter timer
+        """
+        with self.__lock__:
+            if timer.__bucket__ is not None:
+                del self.__buckets__[timer.__bucket__][timer]
+                timer.__bucket__ = None
+                self.__timers__ -= 1
+        return
+
+    def next_expiration(self):
+        """
+        Time of the next timer to expire
+
+        Returns
+        -------
+        float :
+            Time according to clock, None if there is no timer scheduled
+        """
+        with self.__lock__:
+            if self.__timers__ == 0:
+                return None
+            size = len(self.__buckets__)
+            for tick in range(self.__tick__ + 1, self.__tick__ + size + 1):
+                bucket = self.__buckets__[tick % size]
+                if len(bucket) != 0 and tick in bucket.values():
+                    return tick * self.resolution
+            deadline = min(min(bucket.values()) for bucket in self.__buckets__ if len(bucket) != 0)
+            return deadline * self.resolution
+
+    def advance(self, now=None):
+        """
+        Expires timers up to now, calling their handlers in order of expiration
+
+        Parameters
+        ----------
+        now : float, optional
+            Current time, default given by clock
+
+        Returns
+        -------
+        int :
+            Number of timers expired
+        """
+        if now is None:
+            now = self.clock()
+        target = self.__to_tick__(now)
+        expired = 0
+        while True:
+            with self.__lock__:
+                if self.__tick__ >= target:
+                    break
+                if self.__timers__ == 0:
+                    self.__tick__ = target
+                    break
+                if target - self.__tick__ > len(self.__buckets__):
+                    # long jump (e.g. a virtual clock), skip ticks without timers
+                    self.__tick__ = min(target, self.__to_tick__(self.next_expiration() + self.resolution / 2)) - 1
+                self.__tick__ += 1
+                bucket = self.__buckets__[self.__tick__ % len(self.__buckets__)]
+                timers = [timer for timer, deadline in bucket.items() if deadline <= self.__tick__]
+                for timer in timers:
+                    self.cancel(timer)
+            # handlers can schedule timers again, they run without the lock
+            for timer in timers:
+                timer.__expire__()
+            expired += len(timers)
+        return expired
+
+    def start(self):
+        """
+        Advances the wheel every tick from a background thread
+
+        Returns
+        -------
+        None
+        """
+        if self.__thread__ is not None:
+            return
+        self.__running__ = True
+        self.__thread__ = threading.Thread(target=self.__run__, name="SCHCTimerWheel", daemon=True)
+        self.__thread__.start()
+        return
+
+    def stop(self):
+        """
+        Stops the background thread, if it was started
+
+        Returns
+        -------
+        None
+        """
+        self.__running__ = False
+        self.__thread__ = None
+        return
+
+    def __run__(self):
+        from time import sleep
+        while self.__running__:
+            sleep(self.resolution)
+            self.advance()
+        return
+
+    def attach(self, loop):
+        """
+        Advances the wheel every tick on an asyncio loop. Clock of wheel
+        should be the loop one (loop.time)
+
+        Parameters
+        ----------
+        loop : asyncio.AbstractEventLoop
+            Loop running the wheel
+
+        Returns
+        -------
+        asyncio.TimerHandle :
+            Handle of the next tick
+        """
+        def tick():
+            self.advance()
+            self.__handle__ = loop.call_later(self.resolution, tick)
+        self.__handle__ = loop.call_later(self.resolution, tick)
+        return self.__handle__
+
+    def detach(self):
+        """
+        Stops advancing the wheel on the asyncio loop it was attached to
+
+        Returns
+        -------
+        None
+        """
+        if self.__handle__ is not None:
+            self.__handle__.cancel()
+            self.__handle__ = None
+        return
+
+    def __len__(self):
+        return self.__timers__
@@ -1,5 +1,6 @@
 """ schc_handlers: Package of handlers classes"""
 
+from schc_handlers.schc_session_table import SCHCSessionTable
 from schc_handlers.schc_handler import SCHCHandler
-from schc_handlers.schc_handler_node import SCHCHandlerNode
-from schc_handlers.schc_handler_gateway import SCHCHandlerGateway
+from schc_handlers.schc_node_handler import SCHCNodeHandler
+from schc_handlers.schc_gateway_handler import SCHCGatewayHandler
@@ -1,40 +1,104 @@
 """ schc_handler: SCHC Handler (Super) Class """
 
-from schc_base import SCHCObject
+from schc_base import BitBuffer, TimerWheel
+from schc_handlers import SCHCSessionTable
 from schc_protocols import SCHCProtocol, get_protocol
 
 
 class SCHCHandler:
 
-    def __init__(self, protocol):
+    def __init__(self, protocol, max_sessions=65536, wheel=None, fec_ratio=None):
         self.__protocol__ = get_protocol(protocol)
-        self.__sessions__ = dict()
+        self.__fec_ratio__ = fec_ratio
+        self.__wheel__ = wheel if wheel is not None else TimerWheel.default()
+        self.__sessions__ = SCHCSessionTable(max_sessions=max_sessions, clock=self.__wheel__.clock,
+                                             on_evicted=self.__on_evicted__)
+        self.session_listeners = list()
+        self.packet_listeners = list()
 
     def identify_session_from_message(self, message, f_port=None):
         if self.__protocol__.id == SCHCProtocol.LoRaWAN:
             rule_id = int.from_bytes(f_port, "big")
         else:
             raise NotImplementedError("Just LoRaWAN implemented")
-        protocol = get_protocol(self.__protocol__.id)
-        protocol.set_rule_id(rule_id)
-        dtag = SCHCObject.bytes_2_bits(message)[:protocol.T]
+        try:
+            protocol = get_protocol(self.__protocol__.id, rule_id=rule_id)
+        except ValueError:
+            return rule_id, None  # compression Rule ID, SCHC Packet is not fragmented
+        dtag = BitBuffer(message)[:protocol.T]
         if len(dtag) == 0:
             dtag = None
         else:
-            dtag = int(dtag, 2)
+            dtag = dtag.to_int()
         return rule_id, dtag
 
-    def send_package(self, rule_id, packet, dtag=None):
+    def get_profile(self, rule_id):
+        """
+        Profile of the machines of rule_id, with fec_ratio of handler when
+        its windows have fixed size tiles (Ack-on-Error)
+        """
+        protocol = get_protocol(self.__protocol__.id, rule_id=rule_id)
+        if self.__fec_ratio__ is None or protocol.TILE_SIZE == 0 or protocol.WINDOW_SIZE < 2:
+            return protocol
+        return get_protocol(self.__protocol__.id, rule_id=rule_id, fec_ratio=self.__fec_ratio__)
+
+    def send_package(self, rule_id, packet, dtag=None, device=None):
         return
 
-    def receive(self, rule_id, dtag, message, f_port=None):
+    def receive(self, rule_id, dtag, message, f_port=None, device=None):
         return
 
-    def generate_message(self, rule_id, dtag, mtu=512):
+    def generate_message(self, rule_id, dtag, mtu=512, device=None):
         raise GeneratorExit("Abstract class cannot generate message")
 
-    def assign_session(self, rule_id, dtag, machine):
-        if rule_id not in self.__sessions__.keys():
-            self.__sessions__[rule_id] = dict()
-        if dtag not in self.__sessions__[rule_id].keys():
-            self.__sessions__[rule_id][dtag] = machine
+    def assign_session(self, rule_id, dtag, machine, device=None):
+        return self.__sessions__.add(device, rule_id, dtag, machine)
+
+    def get_session(self, rule_id, dtag, device=None):
+        machine = self.__sessions__.get(device, rule_id, dtag)
+        if machine is None:
+            raise KeyError("No session for device {}, rule id {} and dtag {}".format(device, rule_id, dtag))
+        return machine
+
+    def on_session_finished(self, rule_id, dtag, machine, device=None):
+        """
+        Called when a machine reaches end or error state, once it is
+        removed from sessions (e.g. to read payload of a receiver), or
+        when its session is evicted unfinished (idle or table full).
+        By default calls session_listeners with the same arguments
+        """
+        for listener in self.session_listeners:
+            listener(rule_id, dtag, machine, device=device)
+
+    def on_packet_received(self, rule_id, packet, device=None):
+        """
+        Called when a SCHC Packet arrives without fragmentation (its Rule
+        ID is a compression one), to be decompressed by the upper layer.
+        By default calls packet_listeners with the same arguments
+        """
+        for listener in self.packet_listeners:
+            listener(rule_id, packet, device=device)
+
+    def receive_on_session(self, rule_id, dtag, message, machine, device=None):
+        try:
+            machine.receive_message(message)
+        finally:
+            self.__release_if_finished__(rule_id, dtag, device)
+
+    def generate_on_session(self, rule_id, dtag, mtu=512, device=None):
+        machine = self.get_session(rule_id, dtag, device=device)
+        try:
+            return machine.generate_message(mtu).as_bytes()
+        except GeneratorExit:
+            return b''
+        finally:
+            self.__release_if_finished__(rule_id, dtag, device)
+
+    def __on_evicted__(self, key, machine):
+        device, rule_id, dtag = key
+        self.on_session_finished(rule_id, dtag, machine, device=device)
+
+    def __release_if_finished__(self, rule_id, dtag, device):
+        machine = self.__sessions__.remove_if_finished(device, rule_id, dtag)
+        if machine is not None:
+            self.on_session_finished(rule_id, dtag, machine, device=device)
@@ -1,43 +1,48 @@
 """ schc_handler_node: SCHC Handler Node Class """
 
 from schc_handlers import SCHCHandler
-from schc_protocols import LoRaWAN, SCHCProtocol, get_protocol
+from schc_protocols import LoRaWAN, SCHCProtocol
 
 
 class SCHCNodeHandler(SCHCHandler):
 
-    def __init__(self, protocol):
-        super().__init__(protocol)
+    def __init__(self, protocol, max_sessions=65536, wheel=None, fec_ratio=None):
+        super().__init__(protocol, max_sessions=max_sessions, wheel=wheel, fec_ratio=fec_ratio)
 
-    def send_package(self, rule_id, packet, dtag=None):
+    def send_package(self, rule_id, packet, dtag=None, device=None):
         if self.__protocol__.id == SCHCProtocol.LoRaWAN:
             if rule_id == LoRaWAN.ACK_ON_ERROR:
                 from schc_machines.lorawan import AckOnErrorSender
-                self.assign_session(rule_id, dtag, AckOnErrorSender(LoRaWAN(LoRaWAN.ACK_ON_ERROR), packet))
+                machine = AckOnErrorSender(self.get_profile(rule_id), packet, wheel=self.__wheel__)
+                self.assign_session(rule_id, dtag, machine, device=device)
+            elif rule_id == LoRaWAN.NO_ACK:
+                from schc_machines.lorawan import NoAckSender
+                machine = NoAckSender(self.get_profile(rule_id), packet, wheel=self.__wheel__)
+                self.assign_session(rule_id, dtag, machine, device=device)
             else:
                 raise ValueError("Rule ID not allowed for sending a message from a end device")
         else:
             raise NotImplementedError("Just LoRaWAN implemented")
-        self.__sessions__[rule_id][dtag].receive_message(message)
 
-    def receive(self, rule_id, dtag, message, f_port=None):
+    def receive(self, rule_id, dtag, message, f_port=None, device=None):
         if self.__protocol__.id == SCHCProtocol.LoRaWAN:
             if rule_id == LoRaWAN.ACK_ALWAYS:
                 # message received
-                from schc_machines.lorawan import AckAlwaysReceiver
-                self.assign_session(rule_id, dtag, AckAlwaysReceiver(LoRaWAN(LoRaWAN.ACK_ALWAYS)))
-                self.__sessions__[rule_id][dtag].receive_message(message)
+                machine = self.__sessions__.get(device, rule_id, dtag)
+                if machine is None:
+                    from schc_machines.lorawan import AckAlwaysReceiver
+                    machine = AckAlwaysReceiver(self.get_profile(rule_id), wheel=self.__wheel__)
+                    self.assign_session(rule_id, dtag, machine, device=device)
+                self.receive_on_session(rule_id, dtag, message, machine, device=device)
             elif rule_id == LoRaWAN.ACK_ON_ERROR:
                 # response received
-                self.__sessions__[rule_id][dtag].receive_message(message)
+                machine = self.get_session(rule_id, dtag, device=device)
+                self.receive_on_session(rule_id, dtag, message, machine, device=device)
             else:
-                pass
-                # TODO compression
+                # SCHC Packet not fragmented, message is Rule ID followed by compression residue and payload
+                self.on_packet_received(rule_id, message, device=device)
         else:
             raise NotImplementedError("Just LoRaWAN implemented")
 
-    def generate_message(self, rule_id, dtag, mtu=512):
-        try:
-            return self.__sessions__[rule_id][dtag].generate_message(mtu).as_bytes()
-        except GeneratorExit:
-            return b''
+    def generate_message(self, rule_id, dtag, mtu=512, device=None):
+        return self.generate_on_session(rule_id, dtag, mtu=mtu, device=device)
@@ -0,0 +1,279 @@
+""" schc_session_table: Table of SCHC sessions of a handler """
+
+from collections import OrderedDict
+from time import monotonic
+from schc_machines import SCHCFiniteStateMachine
+
+
+class SCHCSessionTable:
+    """
+    Sessions (state machines) of a handler identified by (device, rule_id, dtag).
+    Sessions are grouped by their INACTIVITY_TIMER, each group ordered from the
+    least to the most recently used one, so idle sessions are found at the front
+    of their group and lookup, insertion and eviction cost O(1) whatever the
+    number of devices
+
+    Attributes
+    ----------
+    max_sessions : int
+        Hard limit of sessions kept, least recently used session is evicted
+        when a new one exceeds it
+    clock : Callable[[], float]
+        Current time in seconds
+    on_evicted : Callable[[Tuple, SCHCFiniteStateMachine], None]
+        Called with key and machine of each session evicted (idle or
+        least recently used one), unless it was a tombstone
+    __sessions__ : Dict[Tuple, Tuple[SCHCFiniteStateMachine, OrderedDict]]
+        Machine and group of each session
+    __groups__ : Dict[float, OrderedDict]
+        Last activity time of each session, by INACTIVITY_TIMER (or by
+        linger time of finished sessions)
+    __tombstones__ : Set[Tuple]
+        Finished sessions kept to answer their peer again, see
+        remove_if_finished
+    """
+
+    def __init__(self, max_sessions=65536, clock=monotonic, on_evicted=None):
+        """
+        Constructor
+
+        Parameters
+        ----------
+        max_sessions : int, optional
+            Hard limit of sessions kept, default 65536
+        clock : Callable[[], float], optional
+            Current time in seconds, default time.monotonic
+        on_evicted : Callable[[Tuple, SCHCFiniteStateMachine], None], optional
+            Called for each session evicted, default none
+        """
+        assert max_sessions > 0, "At least one session must be allowed"
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self.on_evicted = on_evicted
+        self.__sessions__ = dict()
+        self.__groups__ = dict()
+        self.__tombstones__ = set()
+        return
+
+    @staticmethod
+    def is_finished(machine):
+        """
+        Whether a machine reached its end or error state
+
+        Parameters
+        ----------
+        machine : SCHCFiniteStateMachine
+            Machine to check
+
+        Returns
+        -------
+        bool :
+            True if machine cannot send nor receive anymore
+        """
+        return isinstance(machine.state, (SCHCFiniteStateMachine.EndState, SCHCFiniteStateMachine.ErrorState))
+
+    def get(self, device, rule_id, dtag):
+        """
+        Gets a session, marking it as active
+
+        Parameters
+        ----------
+        device : object
+            Device identifier (DevEUI on LoRaWAN), None if handler serves a single device
+        rule_id : int
+            Rule ID of session
+        dtag : int
+            DTag of session, None if it is not used
+
+        Returns
+        -------
+        SCHCFiniteStateMachine :
+            Machine of session, None if there is not such a session
+        """
+        key = (device, rule_id, dtag)
+        session = self.__sessions__.get(key)
+        if session is None:
+            return None
+        machine, group = session
+        group[key] = self.clock()
+        group.move_to_end(key)
+        return machine
+
+    def add(self, device, rule_id, dtag, machine):
+        """
+        Adds a session, unless it already exists. Idle sessions are evicted
+        first and, if the table is full, least recently used sessions
+
+        Parameters
+        ----------
+        device : object
+            Device identifier (DevEUI on LoRaWAN)
+        rule_id : int
+            Rule ID of session
+        dtag : int
+            DTag of session
+        machine : SCHCFiniteStateMachine
+            Machine of session
+
+        Returns
+        -------
+        SCHCFiniteStateMachine :
+            Machine of session (the previous one if it already existed)
+        """
+        current = self.get(device, rule_id, dtag)
+        if current is not None:
+            return current
+        self.evict_idle()
+        while len(self.__sessions__) >= self.max_sessions:
+            self.__evict_least_recent__()
+        key = (device, rule_id, dtag)
+        group = self.__groups__.setdefault(machine.protocol.INACTIVITY_TIMER, OrderedDict())
+        group[key] = self.clock()
+        self.__sessions__[key] = (machine, group)
+        return machine
+
+    def remove(self, device, rule_id, dtag):
+        """
+        Removes a session, stopping its timers
+
+        Parameters
+        ----------
+        device : object
+            Device identifier (DevEUI on LoRaWAN)
+        rule_id : int
+            Rule ID of session
+        dtag : int
+            DTag of session
+
+        Returns
+        -------
+        SCHCFiniteStateMachine :
+            Machine removed, None if there was not such a session
+        """
+        return self.__remove__((device, rule_id, dtag))
+
+    def is_tombstone(self, device, rule_id, dtag):
+        """
+        Whether a session is finished but kept to answer its peer again
+
+        Parameters
+        ----------
+        device : object
+            Device identifier (DevEUI on LoRaWAN)
+        rule_id : int
+            Rule ID of session
+        dtag : int
+            DTag of session
+
+        Returns
+        -------
+        bool :
+            True if session finished and is kept as a tombstone
+        """
+        return (device, rule_id, dtag) in self.__tombstones__
+
+    def remove_if_finished(self, device, rule_id, dtag):
+        """
+        Removes a session if its machine reached end or error state. A
+        machine whose end state still answers its peer (e.g. a receiver
+        sending the last Ack again) is kept as a tombstone instead, until
+        it is idle for the linger time of that state
+
+        Parameters
+        ----------
+        device : object
+            Device identifier (DevEUI on LoRaWAN)
+        rule_id : int
+            Rule ID of session
+        dtag : int
+            DTag of session
+
+        Returns
+        -------
+        SCHCFiniteStateMachine :
+            Machine finished (removed or kept as a tombstone), None if it
+            was not finished or it was already a tombstone
+        """
+        key = (device, rule_id, dtag)
+        session = self.__sessions__.get(key)
+        if session is None or key in self.__tombstones__ or not self.is_finished(session[0]):
+            return None
+        machine, group = session
+        linger = machine.state.linger() if isinstance(machine.state, SCHCFiniteStateMachine.EndState) else 0
+        if linger <= 0:
+            return self.__remove__(key)
+        del group[key]
+        machine.stop_timers()
+        group = self.__groups__.setdefault(linger, OrderedDict())
+        group[key] = self.clock()
+        self.__sessions__[key] = (machine, group)
+        self.__tombstones__.add(key)
+        return machine
+
+    def evict_idle(self, now=None):
+        """
+        Removes sessions inactive for longer than the INACTIVITY_TIMER of their protocol
+
+        Parameters
+        ----------
+        now : float, optional
+            Current time, default given by clock
+
+        Returns
+        -------
+        List[SCHCFiniteStateMachine] :
+            Machines removed
+        """
+        if now is None:
+            now = self.clock()
+        evicted = list()
+        for timeout, group in self.__groups__.items():
+            while len(group) != 0:
+                key, last_activity = next(iter(group.items()))
+                if now - last_activity < timeout:
+                    break
+                evicted.append(self.__evict__(key))
+        return evicted
+
+    def __evict_least_recent__(self):
+        """
+        Removes the least recently used session of all groups
+
+        Returns
+        -------
+        SCHCFiniteStateMachine :
+            Machine removed
+        """
+        oldest = None
+        for group in self.__groups__.values():
+            if len(group) != 0:
+                key, last_activity = next(iter(group.items()))
+                if oldest is None or last_activity < oldest[1]:
+                    oldest = (key, last_activity)
+        return self.__evict__(oldest[0])
+
+    def __evict__(self, key):
+        reported = key in self.__tombstones__
+        machine = self.__remove__(key)
+        if self.on_evicted is not None and not reported:
+            self.on_evicted(key, machine)
+        return machine
+
+    def __remove__(self, key):
+        session = self.__sessions__.pop(key, None)
+        if session is None:
+            return None
+        machine, group = session
+        del group[key]
+        self.__tombstones__.discard(key)
+        machine.stop_timers()
+        return machine
+
+    def __len__(self):
+        return len(self.__sessions__)
+
+    def __contains__(self, key):
+        return key in self.__sessions__
+
+    def __iter__(self):
+        return iter(self.__sessions__)
@@ -5,3 +5,5 @@ from schc_machines.lorawan.ack_on_error_receiver import AckOnErrorReceiver
 from schc_machines.lorawan.ack_on_error_sender import AckOnErrorSender
 from schc_machines.lorawan.ack_always_receiver import AckAlwaysReceiver
 from schc_machines.lorawan.ack_always_sender import AckAlwaysSender
+from schc_machines.lorawan.no_ack_receiver import NoAckReceiver
+from schc_machines.lorawan.no_ack_sender import NoAckSender
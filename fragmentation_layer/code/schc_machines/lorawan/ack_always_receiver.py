@@ -62,9 +62,9 @@ class AckAlwaysReceiver(SCHCReceiver):
             None, alter state
             """
             if self.state_machine.__current_window__ == schc_message.header.w:
-                self._logger_.debug("Window received: {}\tTiles from: 0 to 0".format(
-                    schc_message.header.w.w))
-                self.state_machine.payload.add_content(schc_message.payload.as_bytes())
+                self._logger_.debug("Window received: {}\tTiles from: 0 to 0", schc_message.header.w.w)
+                self.state_machine.payload.add_tile(schc_message.header.w.w, schc_message.header.fcn.fcn,
+                                                    schc_message.payload.as_buffer())
                 self.state_machine.bitmap.tile_received(schc_message.header.fcn.fcn)
                 ack = SCHCAck(self.state_machine.__rule_id__,
                               self.state_machine.protocol.id, c=False,
@@ -96,22 +96,17 @@ class AckAlwaysReceiver(SCHCReceiver):
             """
             if self.state_machine.__current_window__ == schc_message.header.w:
                 self.state_machine.__last_window__ = True
-                last_payload = schc_message.payload.as_bytes()
-                self.state_machine.payload.add_content(last_payload)
+                self.state_machine.payload.add_last_tile(schc_message.payload.as_buffer())
                 # TODO check what happens with padding
-                rcs = self.state_machine.protocol.calculate_rcs(
-                    self.state_machine.payload.as_bits()
-                )
+                rcs = self.state_machine.payload.rcs()
                 integrity = rcs == schc_message.header.rcs.rcs
                 if integrity:
                     self._logger_.debug("Integrity check successful")
                     compressed_bitmap = None
                     next_state = self.state_machine.states["cleanup_phase"]
                 else:
-                    self._logger_.error("Integrity check failed:\tSender: {}\tReceiver:{}".format(
-                        schc_message.header.rcs.rcs,
-                        rcs
-                    ))
+                    self._logger_.error("Integrity check failed:\tSender: {}\tReceiver:{}",
+                                        schc_message.header.rcs.rcs, rcs)
                     compressed_bitmap = self.state_machine.bitmap.generate_compress()
                     next_state = self.state_machine.states["waiting_phase"]
                 ack = SCHCAck(self.state_machine.__rule_id__,
@@ -187,9 +182,8 @@ class AckAlwaysReceiver(SCHCReceiver):
                 if (message.size // 8) > mtu:
                     self.state_machine.message_to_send.insert(0, message)
                     self._logger_.warning(
-                        "Cannot send message, no bandwidth available. MTU = {} < Message size = {}".format(
-                            mtu, message.size // 8
-                        )
+                        "Cannot send message, no bandwidth available. MTU = {} < Message size = {}",
+                        mtu, message.size // 8
                     )
                 self._logger_.schc_message(message)
                 return message
@@ -211,8 +205,7 @@ class AckAlwaysReceiver(SCHCReceiver):
             """
             if schc_message.header.w != self.state_machine.__current_window__:
                 self.state_machine.__current_window__ = schc_message.header.w.w
-                self._logger_.debug("Starting reception of window {}".format(
-                    self.state_machine.__current_window__))
+                self._logger_.debug("Starting reception of window {}", self.state_machine.__current_window__)
                 self.state_machine.bitmap = Bitmap(self.state_machine.protocol)
                 self.state_machine.state = self.state_machine.states["receiving_phase"]
                 self.enter_state()
@@ -238,8 +231,7 @@ class AckAlwaysReceiver(SCHCReceiver):
             # TODO if window is last window
             if schc_message.header.w != self.state_machine.__current_window__:
                 self.state_machine.__current_window__ = schc_message.header.w.w
-                self._logger_.debug("Starting reception of window {}".format(
-                    self.state_machine.__current_window__))
+                self._logger_.debug("Starting reception of window {}", self.state_machine.__current_window__)
                 self.state_machine.bitmap = Bitmap(self.state_machine.protocol)
                 self.state_machine.state = self.state_machine.states["receiving_phase"]
                 self.enter_state()
@@ -363,8 +355,8 @@ class AckAlwaysReceiver(SCHCReceiver):
             """
             return
 
-    def __init__(self, protocol, dtag = None):
-        super().__init__(protocol, dtag=dtag)
+    def __init__(self, protocol, dtag = None, wheel = None):
+        super().__init__(protocol, dtag=dtag, wheel=wheel)
         AckAlways.__init__(self)
         self.states["name_your_state"] = AckAlwaysReceiver.TemplatePhase(self)
         # self.states["other_state"] = AckAlwaysReceiver.OtherPhase(self)
@@ -98,7 +98,7 @@ class AckAlwaysSender(SCHCSender):
             else:
                 self.state_machine.bitmap = Bitmap.from_compress_bitmap(
                     schc_message.header.compressed_bitmap.bitmap, self.state_machine.protocol)
-                self._logger_.debug("Received bitmap: {}".format(self.state_machine.bitmap))
+                self._logger_.debug("Received bitmap: {}", self.state_machine.bitmap)
                 if sum(self.state_machine.bitmap) == len(self.state_machine.bitmap):
                     self.state_machine.state = self.state_machine.states["sending_phase"]
                     self.state_machine.retransmission_timer.stop()
@@ -141,8 +141,8 @@ class AckAlwaysSender(SCHCSender):
             """
             pass
 
-    def __init__(self, protocol, payload, residue = "", dtag = None):
-        super().__init__(protocol, payload, residue=residue, dtag=dtag)
+    def __init__(self, protocol, payload, residue = "", dtag = None, wheel = None):
+        super().__init__(protocol, payload, residue=residue, dtag=dtag, wheel=wheel)
         AckAlways.__init__(self)
         self.states["name_your_phase"] = AckAlwaysSender.TemplatePhase(self)
         # Could be harcoded... probably not a good idea
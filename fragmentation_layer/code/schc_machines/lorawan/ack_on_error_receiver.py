@@ -2,8 +2,9 @@
 
 from machine import Timer
 from schc_base import Bitmap
-from schc_machines import SCHCReceiver
+from schc_machines import SCHCFiniteStateMachine, SCHCReceiver
 from schc_messages import RegularSCHCFragment, SCHCAck, All1SCHCFragment, SCHCAckReq
+from schc_parsers import SCHCParser
 
 
 class AckOnErrorReceiver(SCHCReceiver):
@@ -67,10 +68,11 @@ class AckOnErrorReceiver(SCHCReceiver):
             GeneratorExit
                 No message to be send
             """
-            if self.sm.__last_window__ and self.__success__:
-                self.sm.state = self.sm.states["end"]
-                self.sm.state.enter_state()
+            if len(self.sm.message_to_send) != 0:
                 message = self.sm.message_to_send.pop(0)
+                if self.sm.__last_window__ and self.__success__ and len(self.sm.message_to_send) == 0:
+                    self.sm.state = self.sm.states["end"]
+                    self.sm.state.enter_state()
                 self._logger_.schc_message(message)
                 return message
             raise GeneratorExit("No message to send, keep receiving")
@@ -90,35 +92,25 @@ class AckOnErrorReceiver(SCHCReceiver):
             if self.sm.__cw__ == schc_message.header.w:
                 fcn = schc_message.header.fcn.fcn
                 self.sm.__fcn__ = fcn
-                tiles_received = schc_message.payload.size // self.sm.protocol.TILE_SIZE
-                tiles = schc_message.payload.as_bytes()
-                self._logger_.debug("Window received: {}\tTiles from: {} to {}".format(
-                    schc_message.header.w.w, fcn, fcn - tiles_received + 1))
+                tile_size = self.sm.protocol.TILE_SIZE
+                tiles_received = schc_message.payload.size // tile_size
+                tiles = schc_message.payload.as_buffer()
+                self._logger_.debug("Window received: {}\tTiles from: {} to {}",
+                                    schc_message.header.w.w, fcn, fcn - tiles_received + 1)
                 for tile in range(tiles_received):
-                    self.sm.payload.add_content(tiles[0:self.sm.protocol.TILE_SIZE // 8])
-                    tiles = tiles[self.sm.protocol.TILE_SIZE // 8:]
-                    self.sm.bitmaps[
-                        self.sm.__cw__
-                    ].tile_received(fcn - tile)
+                    if not self.sm.receive_tile(self.sm.__cw__, fcn - tile,
+                                                tiles[tile * tile_size:(tile + 1) * tile_size]):
+                        self._logger_.debug("Duplicated tile w={} fcn={}", self.sm.__cw__, fcn - tile)
                     self.sm.__fcn__ -= 1
-                    if self.sm.__fcn__ == -1:
-                        ack = SCHCAck(self.sm.__rule_id__,
-                                      self.sm.protocol.id, c=False,
-                                      dtag=self.sm.__dtag__,
-                                      w=self.sm.__cw__,
-                                      compressed_bitmap=self.sm.bitmaps[
-                                          self.sm.__cw__
-                                      ].generate_compress())
-                        ack.add_padding()
-                        self.sm.message_to_send.append(ack)
+                    # on last window tiles are retransmissions, All-1 is sent again after them
+                    if self.sm.__fcn__ == -1 and not self.sm.__last_window__:
+                        self.sm.recover(self.sm.__cw__)
+                        self.sm.message_to_send.append(self.sm.generate_ack(self.sm.__cw__))
                         self.sm.state = self.sm.states["waiting_phase"]
                         self.sm.state.enter_state()
                         return
-                self._logger_.debug("Current bitmap: {}. Waiting for w={} fcn={} tile".format(
-                    self.sm.bitmaps[
-                        self.sm.__cw__
-                    ], self.sm.__cw__, self.sm.__fcn__)
-                )
+                self._logger_.debug("Current bitmap: {}. Waiting for w={} fcn={} tile",
+                                    self.sm.bitmaps[self.sm.__cw__], self.sm.__cw__, self.sm.__fcn__)
             else:
                 self._logger_.debug("Different window received")
             return
@@ -138,32 +130,19 @@ class AckOnErrorReceiver(SCHCReceiver):
             """
             if self.sm.__cw__ == schc_message.header.w:
                 self.sm.__last_window__ = True
-                last_payload = schc_message.payload.as_bytes()
-                self.sm.payload.add_content(last_payload)
-                rcs = self.sm.protocol.calculate_rcs(
-                    self.sm.payload.as_bits()
-                )
+                self.sm.payload.add_last_tile(schc_message.payload.as_buffer())
+                rcs = self.sm.payload.rcs()
                 integrity = rcs == schc_message.header.rcs.rcs
+                if not integrity and self.sm.protocol.FEC_TILES != 0:
+                    integrity = self.sm.recover_last(schc_message.header.rcs.rcs)
                 if integrity:
                     self._logger_.debug("Integrity check successful")
                     compressed_bitmap = None
                     self.__success__ = True
                 else:
-                    self._logger_.error("Integrity check failed:\tSender: {}\tReceiver:{}".format(
-                        schc_message.header.rcs.rcs,
-                        rcs
-                    ))
-                    compressed_bitmap = self.sm.bitmaps[
-                        self.sm.__cw__
-                    ].generate_compress()
-                ack = SCHCAck(self.sm.__rule_id__,
-                              self.sm.protocol.id,
-                              c=integrity,
-                              dtag=self.sm.__dtag__,
-                              w=self.sm.__cw__,
-                              compressed_bitmap=compressed_bitmap)
-                ack.add_padding()
-                self.sm.message_to_send.append(ack)
+                    self._logger_.error("Integrity check failed:\tSender: {}\tReceiver:{}",
+                                        schc_message.header.rcs.rcs, rcs)
+                self.sm.message_to_send.append(self.sm.generate_ack(self.sm.__cw__, c=integrity))
                 return
             else:
                 # TODO
@@ -182,20 +161,14 @@ class AckOnErrorReceiver(SCHCReceiver):
             -------
             None, alter state
             """
-            for w in sorted(self.sm.bitmaps.keys()):
-                bitmap = self.sm.bitmaps[w]
-                if bitmap.is_missing():
-                    self._logger_.debug("Window {} has missing tiles".format(w))
-                    self.sm.message_to_send.append(
-                        SCHCAck(self.sm.__rule_id__, self.sm.protocol.id,
-                                False, w=w, compressed_bitmap=bitmap.generate_compress())
-                    )
-                    return
-            bitmap = self.sm.bitmaps[self.sm.__cw__]
-            self.sm.message_to_send.append(
-                SCHCAck(self.sm.__rule_id__, self.sm.protocol.id,
-                        False, w=self.sm.__cw__, compressed_bitmap=bitmap.generate_compress())
-            )
+            w = schc_message.header.w.w
+            if w not in self.sm.bitmaps.keys():
+                w = self.sm.__cw__
+            self.sm.recover(w)
+            self.sm.message_to_send.append(self.sm.generate_ack(w))
+            # sender finished window, tiles received from now on are retransmissions
+            self.sm.state = self.sm.states["waiting_phase"]
+            self.sm.state.enter_state()
             return
 
     class WaitingPhase(SCHCReceiver.ReceiverState):
@@ -204,6 +177,24 @@ class AckOnErrorReceiver(SCHCReceiver):
         """
         __name__ = "Waiting Phase"
 
+        def on_expiration_time(self, alarm):
+            """
+            Executed on expiration time, sender stopped asking for Acks
+
+            Parameters
+            ----------
+            alarm : Timer
+                Timer that triggers expiration
+
+            Returns
+            -------
+            None, alter state to error
+            """
+            self.sm.__exit_msg__ = "Connection timeout"
+            self.sm.state = self.sm.states["error"]
+            self.sm.state.enter_state()
+            return
+
         def generate_message(self, mtu):
             """
             Send an SCHCAcK
@@ -222,9 +213,8 @@ class AckOnErrorReceiver(SCHCReceiver):
                 if (message.size // 8) > mtu:
                     self.sm.message_to_send.insert(0, message)
                     self._logger_.warning(
-                        "Cannot send message, no bandwidth available. MTU = {} < Message size = {}".format(
-                            mtu, message.size // 8
-                        )
+                        "Cannot send message, no bandwidth available. MTU = {} < Message size = {}",
+                        mtu, message.size // 8
                     )
                 self._logger_.schc_message(message)
                 return message
@@ -244,29 +234,57 @@ class AckOnErrorReceiver(SCHCReceiver):
             -------
             None, alter state
             """
-            if schc_message.header.w != self.sm.__cw__:
-                self.sm.__cw__ = schc_message.header.w.w
-                self._logger_.debug("Starting reception of window {}".format(
-                    self.sm.__cw__))
-                self.sm.bitmaps[self.sm.__cw__] = Bitmap(self.sm.protocol)
-                self.sm.state = self.sm.states["receiving_phase"]
-                self.enter_state()
+            if self.__is_next_window__(schc_message):
+                self.__start_window__(schc_message)
                 self.sm.state.receive_regular_schc_fragment(schc_message)
-            else:
+            elif schc_message.header.w == self.sm.__cw__:
                 self._logger_.debug("Receiving failed ones")
                 fcn = schc_message.header.fcn.fcn
-                tiles_received = schc_message.payload.size // self.sm.protocol.TILE_SIZE
-                tiles = schc_message.payload.as_bytes()
+                tile_size = self.sm.protocol.TILE_SIZE
+                tiles_received = schc_message.payload.size // tile_size
+                tiles = schc_message.payload.as_buffer()
                 for tile in range(tiles_received):
-                    self._logger_.debug("Window received: {}\tTile {}".format(
-                        schc_message.header.w.w, fcn))
-                    self.sm.payload.add_content(tiles[0:self.sm.protocol.TILE_SIZE // 8])
-                    tiles = tiles[self.sm.protocol.TILE_SIZE // 8:]
-                    self.sm.bitmaps[self.sm.__cw__].tile_received(fcn)
-                    if self.sm.bitmaps[self.sm.__cw__].is_missing():
-                        fcn = self.sm.bitmaps[self.sm.__cw__].get_missing(fcn=True)
-                    else:
-                        break
+                    self._logger_.debug("Window received: {}\tTile {}", schc_message.header.w.w, fcn - tile)
+                    self.sm.receive_tile(self.sm.__cw__, fcn - tile, tiles[tile * tile_size:(tile + 1) * tile_size])
+            else:
+                self._logger_.debug("Fragment of window {} discarded", schc_message.header.w.w)
+            return
+
+        def receive_all1_schc_fragment(self, schc_message):
+            """
+            Receiving All-1 SCHC Fragment, after retransmissions of last
+            window or as the only fragment of a new window
+
+            Parameters
+            ----------
+            schc_message : All1SCHCFragment
+                Last fragment
+
+            Returns
+            -------
+            None, alter state
+            """
+            if self.__is_next_window__(schc_message):
+                self.__start_window__(schc_message)
+            elif schc_message.header.w == self.sm.__cw__:
+                self.sm.state = self.sm.states["receiving_phase"]
+                self.sm.state.enter_state()
+            else:
+                self._logger_.debug("All-1 of window {} discarded", schc_message.header.w.w)
+                return
+            self.sm.state.receive_all1_schc_fragment(schc_message)
+            return
+
+        def __is_next_window__(self, schc_message):
+            return not self.sm.__last_window__ and \
+                schc_message.header.w.w == (self.sm.__cw__ + 1) % (1 << self.sm.protocol.M)
+
+        def __start_window__(self, schc_message):
+            self.sm.__cw__ = schc_message.header.w.w
+            self._logger_.debug("Starting reception of window {}", self.sm.__cw__)
+            self.sm.bitmaps[self.sm.__cw__] = Bitmap(self.sm.protocol)
+            self.sm.state = self.sm.states["receiving_phase"]
+            self.sm.state.enter_state()
             return
 
         def receive_schc_ack_req(self, schc_message):
@@ -283,22 +301,263 @@ class AckOnErrorReceiver(SCHCReceiver):
             None, alter state
             """
             w = schc_message.header.w.w
+            if self.__is_next_window__(schc_message):
+                # every fragment of next window was lost, an empty bitmap requests all of them
+                self.__start_window__(schc_message)
+                self.sm.message_to_send.append(self.sm.generate_ack(w))
+                self.sm.state = self.sm.states["waiting_phase"]
+                self.sm.state.enter_state()
+                return
             if w not in self.sm.bitmaps.keys():
                 return
-            if not self.sm.__last_window__:
-                self.sm.message_to_send.append(
-                    SCHCAck(self.sm.__rule_id__, self.sm.protocol.id,
-                            c=False, w=w, compressed_bitmap=self.sm.bitmaps[w])
-                )
-            else:
-                pass
+            self.sm.recover(w)
+            self.sm.message_to_send.append(self.sm.generate_ack(w))
             return
 
-    def __init__(self, protocol, dtag=None):
-        super().__init__(protocol, dtag=dtag)
+    class EndPhase(SCHCFiniteStateMachine.EndState):
+        """
+        End of Ack on Error. The Ack of the last window may be lost, so
+        SCHC ACK REQ and All-1 fragments of that window are still
+        answered with an Ack with C = 1
+        """
+        def receive_message(self, message):
+            """
+            Answers the sender while it keeps asking for the last Ack
+
+            Parameters
+            ----------
+            message : bytes
+                Any message
+
+            Returns
+            -------
+            None, alter message_to_send
+
+            Raises
+            ------
+            SystemExit :
+                Message is not a request of last Ack
+            """
+            schc_message = SCHCParser.from_bytes(self.sm.protocol, message)
+            if isinstance(schc_message, (SCHCAckReq, All1SCHCFragment)) and schc_message.header.w == self.sm.__cw__:
+                self._logger_.debug("Last Ack requested again")
+                self.sm.message_to_send.append(self.sm.generate_ack(self.sm.__cw__, c=True))
+                return
+            raise SystemExit(self.sm.__end_msg__)
+
+        def generate_message(self, mtu):
+            """
+            Sends Ack requested again, if any
+
+            Parameters
+            ----------
+            mtu : int
+                Size of MTU available (in bytes)
+
+            Returns
+            -------
+            SCHCMessage:
+                Ack with C = 1
+
+            Raises
+            ------
+            SystemExit :
+                No Ack to send
+            """
+            if len(self.sm.message_to_send) != 0:
+                message = self.sm.message_to_send.pop(0)
+                self._logger_.schc_message(message)
+                return message
+            raise SystemExit(self.sm.__end_msg__)
+
+        def linger(self):
+            """
+            Sender asks for the last Ack up to MAX_ACK_REQUEST times, once
+            every RETRANSMISSION_TIMER
+
+            Returns
+            -------
+            float :
+                Seconds the sender may keep asking for the last Ack
+            """
+            return self.sm.protocol.RETRANSMISSION_TIMER * (self.sm.protocol.MAX_ACK_REQUEST + 1)
+
+    def __init__(self, protocol, dtag=None, wheel=None):
+        super().__init__(protocol, dtag=dtag, wheel=wheel)
+        self.states["end"] = AckOnErrorReceiver.EndPhase(self)
+        self.parity = dict()
         self.states["receiving_phase"] = AckOnErrorReceiver.ReceivingPhase(self)
         self.states["waiting_phase"] = AckOnErrorReceiver.WaitingPhase(self)
         self.state = self.states["receiving_phase"]
+        # armed by the first message received, see receive_message
         self.inactivity_timer.stop()
         self.state.enter_state()
         return
+
+    def receive_message(self, message):
+        """
+        Receives a message, inactivity timer restarts on every message
+        until the machine ends (e.g. when a Sender-Abort is lost, the
+        receiver fails once INACTIVITY_TIMER expires)
+
+        Parameters
+        ----------
+        message : bytes
+            A message as bytes
+
+        Returns
+        -------
+        None, alter state
+        """
+        try:
+            self.state.receive_message(message)
+        finally:
+            if isinstance(self.state, (SCHCFiniteStateMachine.EndState, SCHCFiniteStateMachine.ErrorState)):
+                self.inactivity_timer.stop()
+            else:
+                self.inactivity_timer.reset()
+        return
+
+    def receive_tile(self, w, fcn, tile):
+        """
+        Registers a tile received, on payload or as a parity tile (FCN
+        from WINDOW_TILES on, see FEC_RATIO of protocol)
+
+        Parameters
+        ----------
+        w : int
+            Window of tile
+        fcn : int
+            FCN of tile
+        tile : BitBuffer
+            Content of tile
+
+        Returns
+        -------
+        bool :
+            False if tile was a duplicate
+        """
+        self.bitmaps[w].tile_received(fcn)
+        if fcn < self.protocol.WINDOW_TILES:
+            return self.payload.add_tile(w, fcn, tile)
+        duplicate = (w, fcn) in self.parity
+        self.parity[(w, fcn)] = tile.as_bytes()
+        return not duplicate
+
+    def __rebuild__(self, w, count):
+        """
+        Tiles of window w that can be rebuilt from parity tiles, if
+        window has count tiles. Parity tile i is the XOR of tiles i,
+        i + FEC_TILES... of window, so one tile missing on each of those
+        groups can be rebuilt
+
+        Returns
+        -------
+        Dict[int, bytes] :
+            Content of tiles rebuilt by FCN (not registered)
+        bool :
+            Whether every tile missing can be rebuilt
+        """
+        tiles = dict()
+        complete = True
+        for i in range(min(self.protocol.FEC_TILES, count)):
+            group = [self.protocol.WINDOW_TILES - 1 - index for index in range(i, count, self.protocol.FEC_TILES)]
+            missing = [fcn for fcn in group if not self.payload.has_tile(w, fcn)]
+            if len(missing) == 0:
+                continue
+            parity = self.parity.get((w, self.protocol.WINDOW_SIZE - 1 - i))
+            if len(missing) > 1 or parity is None:
+                complete = False
+                continue
+            value = int.from_bytes(parity, "big")
+            for fcn in group:
+                if fcn != missing[0]:
+                    value ^= int.from_bytes(self.payload.get_tile(w, fcn), "big")
+            tiles[missing[0]] = value.to_bytes(self.protocol.TILE_BYTES, "big")
+        return tiles, complete
+
+    def recover(self, w):
+        """
+        Rebuilds tiles missing on window w (known to be full, as its
+        tile with FCN 0 was received) from parity tiles, before an Ack is
+        sent. Once every tile of window is there, parity tiles are not
+        needed anymore and are marked as received
+
+        Parameters
+        ----------
+        w : int
+            Window
+
+        Returns
+        -------
+        None, alter payload and bitmap of window
+        """
+        if self.protocol.FEC_TILES == 0 or not self.payload.has_tile(w, 0):
+            return
+        tiles, complete = self.__rebuild__(w, self.protocol.WINDOW_TILES)
+        for fcn, tile in tiles.items():
+            self.state._logger_.debug("Tile w={} fcn={} rebuilt from parity", w, fcn)
+            self.receive_tile(w, fcn, tile)
+        if complete:
+            for fcn in range(self.protocol.WINDOW_TILES, self.protocol.WINDOW_SIZE):
+                self.bitmaps[w].tile_received(fcn)
+        return
+
+    def recover_last(self, rcs):
+        """
+        Rebuilds tiles missing on the last window from parity tiles. The
+        number of tiles of last window is unknown (tiles at its end may be
+        lost), so each possible one is checked against the RCS of sender
+
+        Parameters
+        ----------
+        rcs : str
+            RCS received on All-1 fragment
+
+        Returns
+        -------
+        bool :
+            True if packet was completed with integrity
+        """
+        w = self.__cw__
+        # window has at least the tiles up to the last one received, one per parity tile received
+        count = 0
+        for index in range(self.protocol.WINDOW_TILES):
+            if self.payload.has_tile(w, self.protocol.WINDOW_TILES - 1 - index):
+                count = index + 1
+        for i in range(self.protocol.FEC_TILES):
+            if (w, self.protocol.WINDOW_SIZE - 1 - i) in self.parity:
+                count = max(count, i + 1)
+        for count in range(max(count, 1), min(self.protocol.WINDOW_TILES, count + self.protocol.FEC_TILES) + 1):
+            tiles, complete = self.__rebuild__(w, count)
+            if complete and len(tiles) != 0 and self.payload.rcs_with(tiles, w, count) == rcs:
+                for fcn, tile in tiles.items():
+                    self.state._logger_.debug("Tile w={} fcn={} rebuilt from parity", w, fcn)
+                    self.receive_tile(w, fcn, tile)
+                return True
+        return False
+
+    def generate_ack(self, w, c=False):
+        """
+        SCHC ACK of a window, with its compressed bitmap unless C = 1
+
+        Parameters
+        ----------
+        w : int
+            Window acknowledged
+        c : bool, optional
+            Integrity check successful (on last window), default False
+
+        Returns
+        -------
+        SCHCAck :
+            Ack ready to send
+        """
+        ack = SCHCAck(self.__rule_id__,
+                      self.protocol.id,
+                      c=c,
+                      dtag=self.__dtag__,
+                      w=w,
+                      compressed_bitmap=None if c else self.bitmaps[w].generate_compress())
+        ack.add_padding()
+        return ack
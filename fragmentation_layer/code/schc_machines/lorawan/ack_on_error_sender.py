@@ -1,8 +1,8 @@
 """ ack_on_error_sender: AckOnError sender state machine """
 
-from schc_base import Tile, Bitmap
+from schc_base import BitBuffer, Tile, Bitmap
 from schc_machines import SCHCSender
-from schc_messages import RegularSCHCFragment, All1SCHCFragment, SCHCAck
+from schc_messages import RegularSCHCFragment, All1SCHCFragment, SCHCAck, SCHCAckReq, SCHCSenderAbort
 
 
 class AckOnErrorSender(SCHCSender):
@@ -14,6 +14,13 @@ class AckOnErrorSender(SCHCSender):
     protocol
     state
     residue
+    sent_tiles : Dict[Tuple[int, int], Tile]
+        Tiles sent by (W, FCN), the tile of All-1 fragment has FCN ALL1_FCN
+    __missing__ : List[int]
+        FCNs of tiles of current window to send again
+    __parity__ : List[int]
+        FCNs of parity tiles of current window to send (see FEC_RATIO
+        of protocol)
     """
     class InitialPhase(SCHCSender.SenderState):
         """
@@ -23,23 +30,10 @@ class AckOnErrorSender(SCHCSender):
 
         def __generate_tiles__(self):
             sm = self.sm
-            last_tile_length = len(sm.remaining_packet) % sm.protocol.TILE_SIZE
-            last_tile = sm.remaining_packet[-last_tile_length:]
-            sm.remaining_packet = sm.remaining_packet[0:-last_tile_length]
-            penultimate_tile = sm.remaining_packet[-sm.protocol.penultimate_tile():]
-            sm.remaining_packet = sm.remaining_packet[0:-sm.protocol.penultimate_tile()]
-            sm.tiles = [
-                sm.remaining_packet[i*sm.protocol.TILE_SIZE:(i + 1)*sm.protocol.TILE_SIZE]
-                for i in range(int(
-                    len(sm.remaining_packet) // sm.protocol.TILE_SIZE
-                ))
-            ]
-            assert "".join(sm.tiles) == sm.remaining_packet, "Error occur during Tile generation"
-            sm.remaining_packet = list()
-            sm.tiles.append(penultimate_tile)
-            sm.tiles.append(last_tile)
-            sm.tiles = [Tile(i) for i in sm.tiles]
-            self._logger_.debug("{} tiles generated".format(len(sm.tiles)))
+            # tiles are not materialized, just counted: see AckOnErrorSender.tile
+            sm.tiles_number = max(1, -(-len(sm.remaining_packet) // sm.protocol.TILE_SIZE))
+            sm.__tile_cursor__ = 0
+            self._logger_.debug("{} tiles generated", sm.tiles_number)
             self.sm.state = self.sm.states["sending_phase"]
             self.sm.state.enter_state()
             return
@@ -60,26 +54,32 @@ class AckOnErrorSender(SCHCSender):
             Returns
             -------
             SCHCMessage :
-                RegularSCHCFragment until all tiles are sent, then
-                All1SCHCFragment
+                RegularSCHCFragment until all tiles are sent (parity tiles
+                first on each window if FEC is used), then All1SCHCFragment
             """
+            if self.sm.__fcn__ == self.sm.protocol.WINDOW_SIZE - 1 and self.sm.protocol.FEC_TILES != 0:
+                self.sm.__add_parity_tiles__()
+            if len(self.sm.__parity__) != 0:
+                regular_message = self.sm.__pack__(self.sm.__parity__, mtu)
+                self._logger_.debug("Parity tiles from fcn {} for windows {}",
+                                    regular_message.header.fcn.fcn, self.sm.__cw__)
+                self._logger_.schc_message(regular_message)
+                return regular_message
             regular_message = RegularSCHCFragment(self.sm.__rule_id__,
                                                   self.sm.__fcn__,
                                                   self.sm.protocol.id,
                                                   self.sm.__dtag__,
                                                   self.sm.__cw__)
             mtu_available = (mtu - (regular_message.size // 8)) * 8
-            if len(self.sm.tiles) > 1:
-                candid = self.sm.tiles[0]
-                while mtu_available >= candid.size and len(self.sm.tiles) > 1:
+            if self.sm.remaining_tiles() > 1:
+                candid = self.sm.tile(self.sm.__tile_cursor__)
+                while mtu_available >= candid.size and self.sm.remaining_tiles() > 1:
                     regular_message.add_tile(candid)
-                    self.sm.sent_tiles.append(
-                        self.sm.tiles.pop(0)
-                    )
+                    self.sm.sent_tiles[(self.sm.__cw__, self.sm.__fcn__)] = candid
+                    self.sm.__tile_cursor__ += 1
                     mtu_available -= candid.size
-                    candid = self.sm.tiles[0]
-                    self._logger_.debug("Add tile with fcn {} for windows {}".format(
-                        self.sm.__fcn__, self.sm.__cw__))
+                    candid = self.sm.tile(self.sm.__tile_cursor__)
+                    self._logger_.debug("Add tile with fcn {} for windows {}", self.sm.__fcn__, self.sm.__cw__)
                     self.sm.__fcn__ -= 1
                     if self.sm.__fcn__ < 0:
                         self.sm.state = self.sm.states["waiting_phase"]
@@ -87,8 +87,9 @@ class AckOnErrorSender(SCHCSender):
                         self.sm.state.enter_state()
                         break
             else:
-                last_tile = self.sm.tiles.pop(0)
-                self.sm.sent_tiles.append(last_tile)
+                last_tile = self.sm.tile(self.sm.__tile_cursor__)
+                self.sm.sent_tiles[(self.sm.__cw__, self.sm.protocol.ALL1_FCN)] = last_tile
+                self.sm.__tile_cursor__ += 1
                 self.sm.__last_window__ = True
                 all1 = All1SCHCFragment(
                     self.sm.__rule_id__,
@@ -108,6 +109,20 @@ class AckOnErrorSender(SCHCSender):
             self._logger_.schc_message(regular_message)
             return regular_message
 
+        def receive_schc_ack(self, schc_message):
+            """
+            Acks received while sending are late (or duplicated) ones of previous windows
+            Parameters
+            ----------
+            schc_message : SCHCAck
+                SCHCAck received
+            Returns
+            -------
+            None
+            """
+            self._logger_.debug("Ack of window {} discarded while sending", schc_message.header.w.w)
+            return
+
     class WaitingPhase(SCHCSender.SenderState):
         """
         Waiting Phase of Ack on Error
@@ -116,7 +131,8 @@ class AckOnErrorSender(SCHCSender):
 
         def generate_message(self, mtu):
             """
-            Wait for ACK
+            Wait for ACK, sending SCHC ACK REQ (or Sender-Abort) queued
+            on expiration of retransmission timer
             Parameters
             ----------
             mtu : int
@@ -124,14 +140,57 @@ class AckOnErrorSender(SCHCSender):
             Returns
             -------
             SCHCMessage :
-                None
+                Message queued
             Raises
             ------
             GeneratorExit
                 Awaits for Ack
             """
+            if len(self.sm.message_to_send) != 0:
+                message = self.sm.message_to_send.pop(0)
+                self._logger_.schc_message(message)
+                if isinstance(message, SCHCSenderAbort):
+                    self.sm.state = self.sm.states["error"]
+                    self.sm.state.enter_state()
+                return message
             raise GeneratorExit("Awaits for Ack after a windows was sent")
 
+        def on_expiration_time(self, alarm):
+            """
+            Requests an Ack again, or aborts when MAX_ACK_REQUEST is reached
+            Parameters
+            ----------
+            alarm : Timer
+                Retransmission timer
+            Returns
+            -------
+            None, alter state
+            """
+            self.sm.attempts.increment()
+            if self.sm.attempts.exceeds_max():
+                self._logger_.warning("No Ack after {} attempts, aborting", self.sm.protocol.MAX_ACK_REQUEST)
+                self.abort()
+                return
+            ack_req = SCHCAckReq(self.sm.__rule_id__, self.sm.protocol.id, self.sm.__dtag__, self.sm.__cw__)
+            ack_req.add_padding()
+            self.sm.message_to_send.append(ack_req)
+            self.sm.retransmission_timer.reset()
+            return
+
+        def abort(self):
+            """
+            Queues a Sender-Abort, error state is entered once it is sent
+
+            Returns
+            -------
+            None, alter state
+            """
+            self.sm.__exit_msg__ = "MAX_ACK_REQUEST reached"
+            abort = SCHCSenderAbort(self.sm.__rule_id__, self.sm.protocol.id, self.sm.__dtag__, self.sm.__cw__)
+            abort.add_padding()
+            self.sm.message_to_send.append(abort)
+            return
+
         def receive_schc_ack(self, schc_message):
             """
             Receive an Ack after a windows is fully sent
@@ -144,43 +203,207 @@ class AckOnErrorSender(SCHCSender):
             None, alter state
             """
             if self.sm.__cw__ != schc_message.header.w:
-                # TODO
+                self._logger_.debug("Ack of window {} discarded, current window is {}",
+                                    schc_message.header.w.w, self.sm.__cw__)
                 return
-            else:
-                if schc_message.header.c.c:
-                    if self.sm.__last_window__:
-                        self.sm.state = self.sm.states["end"]
-                        self.sm.state.enter_state()
-                        return
-                    else:
-                        # TODO
-                        return
+            if schc_message.header.c.c:
+                if self.sm.__last_window__:
+                    self.sm.retransmission_timer.stop()
+                    self.sm.state = self.sm.states["end"]
+                    self.sm.state.enter_state()
                 else:
-                    self.sm.bitmap = Bitmap.from_compress_bitmap(
-                        schc_message.header.compressed_bitmap.bitmap, self.sm.protocol)
-                    self._logger_.debug("Received bitmap: {}".format(self.sm.bitmap))
-                    if sum(self.sm.bitmap) == len(self.sm.bitmap):
-                        self.sm.state = self.sm.states["sending_phase"]
-                        self.sm.retransmission_timer.stop()
-                        self.sm.__cw__ += 1
-                        self.sm.__fcn__ = self.sm.protocol.WINDOW_SIZE - 1
-                        self.sm.state.enter_state()
-                        return
-                    else:
-                        # TODO
-                        return
+                    self._logger_.debug("Ack with C = 1 discarded, window {} is not the last one", self.sm.__cw__)
+                return
+            self.sm.retransmission_timer.stop()
+            self.sm.message_to_send.clear()  # a pending ACK REQ is answered already
+            self.sm.bitmap = Bitmap.from_compress_bitmap(
+                schc_message.header.compressed_bitmap.bitmap, self.sm.protocol)
+            self._logger_.debug("Received bitmap: {}", self.sm.bitmap)
+            # bits of tiles never sent (after the last tile of last window) are ignored,
+            # as parity tiles, useless once missing tiles are sent again
+            missing = [fcn for fcn in self.sm.bitmap.missing()
+                       if fcn < self.sm.protocol.WINDOW_TILES and (self.sm.__cw__, fcn) in self.sm.sent_tiles]
+            if len(missing) == 0 and not self.sm.__last_window__:
+                self.sm.attempts.reset()
+                self.sm.state = self.sm.states["sending_phase"]
+                self.sm.__cw__ += 1
+                self.sm.__fcn__ = self.sm.protocol.WINDOW_SIZE - 1
+                self.sm.state.enter_state()
+                return
+            if self.sm.attempts.exceeds_max():
+                self._logger_.warning("Tiles {} of window {} still missing after {} attempts, aborting",
+                                      missing, self.sm.__cw__, self.sm.protocol.MAX_ACK_REQUEST)
+                self.abort()
+                return
+            self._logger_.debug("Tiles missing on window {}: {}", self.sm.__cw__, missing)
+            self.sm.__missing__ = missing
+            self.sm.state = self.sm.states["retransmission_phase"]
+            self.sm.state.enter_state()
+            return
+
+    class RetransmissionPhase(SCHCSender.SenderState):
+        """
+        Retransmission Phase of Ack on Error, tiles reported missing on
+        the bitmap of current window are sent again, then an Ack is
+        requested (All-1 is sent again on the last window)
+        """
+        __name__ = "Retransmission Phase"
+
+        def generate_message(self, mtu):
+            """
+            Generate regular fragments with missing tiles, a run of
+            consecutive missing tiles goes on the same fragment
+            Parameters
+            ----------
+            mtu : int
+                MTU in bytes
+            Returns
+            -------
+            SCHCMessage :
+                RegularSCHCFragment until all missing tiles are sent, then
+                SCHCAckReq (or All1SCHCFragment on last window)
+            """
+            if len(self.sm.__missing__) != 0:
+                regular_message = self.sm.__pack__(self.sm.__missing__, mtu)
+                self._logger_.debug("Tiles from fcn {} for windows {} sent again",
+                                    regular_message.header.fcn.fcn, self.sm.__cw__)
+                self._logger_.schc_message(regular_message)
+                return regular_message
+            self.sm.attempts.increment()
+            if self.sm.__last_window__:
+                message = All1SCHCFragment(
+                    self.sm.__rule_id__,
+                    self.sm.protocol.id,
+                    self.sm.__dtag__,
+                    self.sm.__cw__,
+                    self.sm.rcs
+                )
+                message.add_tile(self.sm.sent_tiles[(self.sm.__cw__, self.sm.protocol.ALL1_FCN)])
+            else:
+                message = SCHCAckReq(self.sm.__rule_id__, self.sm.protocol.id, self.sm.__dtag__, self.sm.__cw__)
+            message.add_padding()
+            self._logger_.schc_message(message)
+            self.sm.state = self.sm.states["waiting_phase"]
+            self.sm.state.enter_state()
+            self.sm.retransmission_timer.reset()
+            return message
+
+        def receive_schc_ack(self, schc_message):
+            """
+            Acks received while retransmitting are late (or duplicated) ones
+            Parameters
+            ----------
+            schc_message : SCHCAck
+                SCHCAck received
+            Returns
+            -------
+            None
+            """
+            self._logger_.debug("Ack of window {} discarded while retransmitting", schc_message.header.w.w)
+            return
 
-    def __init__(self, protocol, payload, residue="", dtag=None):
-        super().__init__(protocol, payload, residue=residue, dtag=dtag)
+    def __init__(self, protocol, payload, residue="", dtag=None, wheel=None):
+        super().__init__(protocol, payload, residue=residue, dtag=dtag, wheel=wheel)
+        # W counts up to 2^M windows, parity tiles (FEC_RATIO) take room of each one
+        capacity = (1 << protocol.M) * protocol.WINDOW_TILES * protocol.TILE_SIZE
+        if len(self.remaining_packet) > capacity:
+            raise ValueError("Packet of {} bits does not fit in {} windows of {} tiles".format(
+                len(self.remaining_packet), 1 << protocol.M, protocol.WINDOW_TILES))
         self.states["initial_phase"] = AckOnErrorSender.InitialPhase(self)
         self.states["sending_phase"] = AckOnErrorSender.SendingPhase(self)
         self.states["waiting_phase"] = AckOnErrorSender.WaitingPhase(self)
+        self.states["retransmission_phase"] = AckOnErrorSender.RetransmissionPhase(self)
         self.state = self.states["initial_phase"]
         self.state.enter_state()
-        if len(self.remaining_packet) % self.protocol.L2_WORD != 0:
-            padding = "0" * (self.protocol.L2_WORD - (len(self.remaining_packet) % self.protocol.L2_WORD))
-            self.rcs = self.protocol.calculate_rcs(self.remaining_packet + padding)
-        self.tiles = list()
-        self.sent_tiles = list()
+        self.tiles_number = 0
+        self.__tile_cursor__ = 0
+        self.sent_tiles = dict()
+        self.__missing__ = list()
+        self.__parity__ = list()
         self.state.__generate_tiles__()
         return
+
+    def tile(self, index):
+        """
+        Tile of the packet, computed on demand as a view over remaining_packet.
+        Every tile has TILE_SIZE bits but the last one, which has the bits left
+
+        Parameters
+        ----------
+        index : int
+            Index of tile, from 0 to tiles_number - 1
+
+        Returns
+        -------
+        Tile :
+            Tile at index, sharing the bytes of the packet
+        """
+        return Tile(self.remaining_packet[index * self.protocol.TILE_SIZE:(index + 1) * self.protocol.TILE_SIZE])
+
+    def __add_parity_tiles__(self):
+        """
+        Calculates parity tiles of current window and queues them. Parity
+        tile i is the XOR of tiles i, i + FEC_TILES, i + 2 FEC_TILES... of
+        window, so the receiver can rebuild one tile of each of those
+        groups (FEC_TILES consecutive tiles, as the ones of a fragment).
+        Parity tiles take the first FCNs of window, tiles of packet go
+        from FCN WINDOW_TILES - 1
+
+        Returns
+        -------
+        None, alter self
+        """
+        # the last tile is not protected, it goes on the All-1 fragment
+        count = min(self.protocol.WINDOW_TILES, self.remaining_tiles() - 1)
+        for i in range(min(self.protocol.FEC_TILES, count)):
+            parity = 0
+            for index in range(i, count, self.protocol.FEC_TILES):
+                parity ^= self.tile(self.__tile_cursor__ + index).content.to_int()
+            fcn = self.protocol.WINDOW_SIZE - 1 - i
+            self.sent_tiles[(self.__cw__, fcn)] = Tile(BitBuffer.from_int(parity, self.protocol.TILE_SIZE))
+            self.__parity__.append(fcn)
+        self.__fcn__ = self.protocol.WINDOW_TILES - 1
+        return
+
+    def __pack__(self, fcns, mtu):
+        """
+        Regular fragment with tiles of current window already calculated,
+        the first run of consecutive FCNs of fcns that fits on MTU
+
+        Parameters
+        ----------
+        fcns : List[int]
+            FCNs of tiles to send, in decreasing order (the ones packed
+            are removed)
+        mtu : int
+            MTU in bytes
+
+        Returns
+        -------
+        RegularSCHCFragment :
+            Fragment with tiles
+        """
+        fcn = fcns[0]
+        fragment = RegularSCHCFragment(self.__rule_id__, fcn, self.protocol.id, self.__dtag__, self.__cw__)
+        mtu_available = (mtu - (fragment.size // 8)) * 8
+        while len(fcns) != 0 and fcns[0] == fcn:
+            tile = self.sent_tiles[(self.__cw__, fcn)]
+            if mtu_available < tile.size:
+                break
+            fragment.add_tile(tile)
+            mtu_available -= tile.size
+            fcns.pop(0)
+            fcn -= 1
+        fragment.add_padding()
+        return fragment
+
+    def remaining_tiles(self):
+        """
+        Number of tiles not sent yet
+
+        Returns
+        -------
+        int :
+            Tiles after the cursor
+        """
+        return self.tiles_number - self.__tile_cursor__
@@ -0,0 +1,112 @@
+""" no_ack_receiver: NoAck receiver state machine """
+
+from schc_machines import SCHCReceiver
+
+
+class NoAckReceiver(SCHCReceiver):
+    """
+    NoAck Receiver State Machine with No-ACK Mode. Fragments are
+    reassembled in order of arrival and the RCS of All-1 fragment is
+    checked, nothing is ever sent back
+
+    Attributes
+    ----------
+    protocol
+    state
+    __fragments__ : int
+        Number of regular fragments received
+    """
+    class ReceivingPhase(SCHCReceiver.ReceiverState):
+        """
+        Receiving Phase of No Ack
+        """
+        __name__ = "Receiving Phase"
+
+        def on_expiration_time(self, alarm):
+            """
+            Executed on expiration time
+
+            Parameters
+            ----------
+            alarm : Timer
+                Timer that triggers expiration
+
+            Returns
+            -------
+            None, alter state to error
+            """
+            self.sm.__exit_msg__ = "Connection timeout"
+            self.sm.state = self.sm.states["error"]
+            self.sm.state.enter_state()
+            return
+
+        def generate_message(self, mtu):
+            """
+            Nothing is sent on No-ACK mode
+
+            Parameters
+            ----------
+            mtu : int
+                MTU available
+
+            Raises
+            ------
+            GeneratorExit
+                No message to be send
+            """
+            raise GeneratorExit("No message to send, keep receiving")
+
+        def receive_regular_schc_fragment(self, schc_message):
+            """
+            Appends payload of fragment to packet
+
+            Parameters
+            ----------
+            schc_message : RegularSCHCFragment
+                A regular Fragment received
+
+            Returns
+            -------
+            None, alter state
+            """
+            self.sm.inactivity_timer.reset()
+            self.sm.payload.add_tile(self.sm.__fragments__, 0, schc_message.payload.as_buffer())
+            self.sm.__fragments__ += 1
+            self._logger_.debug("Fragment {} received", self.sm.__fragments__)
+            return
+
+        def receive_all1_schc_fragment(self, schc_message):
+            """
+            Behaviour when receiving All-1 SCHC Fragment, the packet ends
+            (or fails) according to the integrity check
+
+            Parameters
+            ----------
+            schc_message : All1SCHCFragment
+                Last fragment to be received
+
+            Returns
+            -------
+            None, alter state
+            """
+            self.sm.inactivity_timer.stop()
+            self.sm.payload.add_last_tile(schc_message.payload.as_buffer())
+            rcs = self.sm.payload.rcs()
+            if rcs == schc_message.header.rcs.rcs:
+                self._logger_.debug("Integrity check successful")
+                self.sm.state = self.sm.states["end"]
+            else:
+                self._logger_.error("Integrity check failed:\tSender: {}\tReceiver:{}",
+                                    schc_message.header.rcs.rcs, rcs)
+                self.sm.__exit_msg__ = "Integrity check failed"
+                self.sm.state = self.sm.states["error"]
+            self.sm.state.enter_state()
+            return
+
+    def __init__(self, protocol, dtag=None, wheel=None):
+        super().__init__(protocol, dtag=dtag, wheel=wheel)
+        self.states["receiving_phase"] = NoAckReceiver.ReceivingPhase(self)
+        self.state = self.states["receiving_phase"]
+        self.state.enter_state()
+        self.__fragments__ = 0
+        return
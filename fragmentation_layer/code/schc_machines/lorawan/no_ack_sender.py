@@ -0,0 +1,82 @@
+""" no_ack_sender: NoAck sender state machine """
+
+from schc_base import BitBuffer, Tile
+from schc_machines import SCHCSender
+from schc_messages import RegularSCHCFragment, All1SCHCFragment
+
+
+class NoAckSender(SCHCSender):
+    """
+    NoAck Sender State Machine with No-ACK Mode. Fragments are sent back
+    to back, with as many bytes of packet as MTU allows, and the last one
+    (All-1) carries the RCS. There are no windows, bitmaps nor timers
+
+    Attributes
+    ----------
+    protocol
+    state
+    residue
+    __cursor__ : int
+        Bits of remaining_packet already sent
+    """
+    class SendingPhase(SCHCSender.SenderState):
+        """
+        Sending Phase of No Ack
+        """
+        __name__ = "Sending Phase"
+
+        def generate_message(self, mtu):
+            """
+            Generate regular fragments until the rest of packet fits on an
+            All-1 fragment
+            Parameters
+            ----------
+            mtu : int
+                MTU in bytes
+            Returns
+            -------
+            SCHCMessage :
+                RegularSCHCFragment until the rest of packet fits on an
+                All1SCHCFragment, then All1SCHCFragment
+            Raises
+            ------
+            ValueError
+                MTU cannot carry a byte of packet
+            """
+            protocol = self.sm.protocol
+            remaining = len(self.sm.remaining_packet) - self.sm.__cursor__
+            if remaining <= mtu * 8 - protocol.FRAGMENT_HEADER_SIZE - protocol.U:
+                all1 = All1SCHCFragment(
+                    self.sm.__rule_id__,
+                    protocol.id,
+                    self.sm.__dtag__,
+                    None,
+                    self.sm.rcs
+                )
+                if remaining != 0:
+                    # padded to bytes, as the packet used to calculate RCS
+                    all1.add_tile(Tile(BitBuffer(self.sm.remaining_packet[self.sm.__cursor__:].as_bytes())))
+                self.sm.__cursor__ += remaining
+                all1.add_padding()
+                self._logger_.schc_message(all1)
+                self.sm.state = self.sm.states["end"]
+                self.sm.state.enter_state()
+                return all1
+            size = min((mtu * 8 - protocol.FRAGMENT_HEADER_SIZE) // 8, remaining // 8) * 8
+            if size == 0:
+                raise ValueError("MTU of {} bytes cannot carry SCHC Fragments".format(mtu))
+            regular_message = RegularSCHCFragment(self.sm.__rule_id__, 0, protocol.id, self.sm.__dtag__)
+            regular_message.add_tile(Tile(self.sm.remaining_packet[self.sm.__cursor__:self.sm.__cursor__ + size]))
+            self.sm.__cursor__ += size
+            regular_message.add_padding()
+            self._logger_.schc_message(regular_message)
+            return regular_message
+
+    def __init__(self, protocol, payload, residue="", dtag=None, wheel=None):
+        super().__init__(protocol, payload, residue=residue, dtag=dtag, wheel=wheel)
+        self.states["sending_phase"] = NoAckSender.SendingPhase(self)
+        self.state = self.states["sending_phase"]
+        self.state.enter_state()
+        self.__cursor__ = 0
+        self.__end_msg__ = "Message sent"
+        return
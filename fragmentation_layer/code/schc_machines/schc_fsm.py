@@ -60,27 +60,50 @@ class SCHCFiniteStateMachine:
 
         class Logger:
             """
-            SCHC Logger to log SCHC Fragmentation
+            SCHC Logger to log SCHC Fragmentation. Messages are formatted
+            (with str.format and args given) only if their level is
+            enabled on the logger of machines, so logging costs a level
+            check when it is off
             """
+            __logger__ = logging.getLogger("schc_machines")
+
             def __init__(self, state) -> None:
                 self.__state__ = state
                 return
 
-            def __log__(self, mode) -> None:
-                mode("SCHC Fragment on '{}' mode, {} on '{}' state".format(
-                    self.__state__.sm.__mode__,
-                    self.__state__.sm.__type__,
-                    self.__state__.__name__
-                ))
-                second_line = "\tProtocol: {}, Rule ID: {}".format(
-                    self.__state__.sm.protocol.__name__,
-                    self.__state__.sm.__rule_id__
-                )
-                if self.__state__.sm.__dtag__ is not None:
-                    second_line += ", DTag: {}".format(
-                        self.__state__.sm.__dtag__
-                    )
-                mode(second_line)
+            def is_enabled(self, level):
+                """
+                Whether messages of a level are logged
+
+                Parameters
+                ----------
+                level : int
+                    Logging level
+
+                Returns
+                -------
+                bool :
+                    True if a message of level would be logged
+                """
+                return self.__logger__.isEnabledFor(level)
+
+            def __log__(self, level) -> None:
+                sm = self.__state__.sm
+                self.__logger__.log(level, "SCHC Fragment on '%s' mode, %s on '%s' state",
+                                    sm.__mode__, sm.__type__, self.__state__.__name__)
+                if sm.__dtag__ is not None:
+                    self.__logger__.log(level, "\tProtocol: %s, Rule ID: %s, DTag: %s",
+                                        sm.protocol.__name__, sm.__rule_id__, sm.__dtag__)
+                else:
+                    self.__logger__.log(level, "\tProtocol: %s, Rule ID: %s",
+                                        sm.protocol.__name__, sm.__rule_id__)
+                return
+
+            def __message__(self, level, message, args):
+                if not self.__logger__.isEnabledFor(level):
+                    return
+                self.__log__(level)
+                self.__logger__.log(level, "\t%s", message.format(*args) if len(args) != 0 else message)
                 return
 
             def enter_state(self):
@@ -91,7 +114,38 @@ class SCHCFiniteStateMachine:
                 -------
                 None
                 """
-                self.__log__(logging.debug)
+                if self.__logger__.isEnabledFor(logging.DEBUG):
+                    self.__log__(logging.DEBUG)
+                return
+
+            def event(self, name, level=logging.DEBUG, **fields):
+                """
+                Logs a structured event, fields are given to handlers of
+                logger on the record (as record.schc, a dictionary with
+                name of event, mode, state, rule_id, dtag and fields)
+
+                Parameters
+                ----------
+                name : str
+                    Name of event
+                level : int, optional
+                    Logging level, default DEBUG
+                fields : Dict[str, object]
+                    Data of event
+
+                Returns
+                -------
+                None
+                """
+                if not self.__logger__.isEnabledFor(level):
+                    return
+                sm = self.__state__.sm
+                data = dict(event=name, mode=sm.__mode__, state=self.__state__.__name__,
+                            rule_id=sm.__rule_id__, dtag=sm.__dtag__)
+                data.update(fields)
+                self.__logger__.log(level, "\t%s: %s", name,
+                                    ", ".join("{}={}".format(key, value) for key, value in fields.items()),
+                                    extra={"schc": data})
                 return
 
             def schc_message(self, message):
@@ -107,76 +161,84 @@ class SCHCFiniteStateMachine:
                 -------
                 None
                 """
+                if not self.__logger__.isEnabledFor(logging.DEBUG):
+                    return
                 self.enter_state()
-                logging.debug("\tMessage:\n{}".format(message.as_text()))
+                self.event("schc_message", type=message.__class__.__name__, size=message.size,
+                           w=getattr(message.header.w, "w", None), fcn=getattr(message.header.fcn, "fcn", None))
+                self.__logger__.debug("\tMessage:\n%s", message.as_text())
                 return
 
-            def error(self, message):
+            def error(self, message, *args):
                 """
                 Logs an error
 
                 Parameters
                 ----------
                 message : str
-                    Message to show
+                    Message to show, formatted with args (str.format) if it is logged
+                args : object
+                    Arguments of message
 
                 Returns
                 -------
                 None
                 """
-                self.__log__(logging.error)
-                logging.error("\t{}".format(message))
+                self.__message__(logging.ERROR, message, args)
                 return
 
-            def warning(self, message):
+            def warning(self, message, *args):
                 """
                 Logs a warn
 
                 Parameters
                 ----------
                 message : str
-                    Message to show
+                    Message to show, formatted with args (str.format) if it is logged
+                args : object
+                    Arguments of message
 
                 Returns
                 -------
                 None
                 """
-                self.__log__(logging.warning)
-                logging.warning("\t{}".format(message))
+                self.__message__(logging.WARNING, message, args)
                 return
 
-            def debug(self, message):
+            def debug(self, message, *args):
                 """
                 Logs an debug
 
                 Parameters
                 ----------
                 message : str
-                    Message to show
+                    Message to show, formatted with args (str.format) if it is logged
+                args : object
+                    Arguments of message
 
                 Returns
                 -------
                 None
                 """
-                self.__log__(logging.debug)
-                logging.debug("\t{}".format(message))
+                self.__message__(logging.DEBUG, message, args)
                 return
 
-            def info(self, message):
+            def info(self, message, *args):
                 """
-                Logs an error
+                Logs an info
 
                 Parameters
                 ----------
                 message : str
-                    Message to show
+                    Message to show, formatted with args (str.format) if it is logged
+                args : object
+                    Arguments of message
 
                 Returns
                 -------
                 None
                 """
-                self.__log__(logging.info)
-                logging.info("\t{}".format(message))
+                self.__message__(logging.INFO, message, args)
                 return
 
         def __init__(self, state_machine):
@@ -346,6 +408,18 @@ class SCHCFiniteStateMachine:
             """
             raise SystemExit(self.sm.__end_msg__)
 
+        def linger(self):
+            """
+            Seconds a finished machine is kept to answer its peer again
+            (e.g. when its last message was lost)
+
+            Returns
+            -------
+            float :
+                0, peer is never answered after end
+            """
+            return 0
+
     def __init__(self, protocol, dtag=None):
         """
         Constructor
@@ -434,3 +508,13 @@ class SCHCFiniteStateMachine:
         """
         self.state.on_expiration_time(alarm)
         return
+
+    def stop_timers(self):
+        """
+        Stops timers of machine, to be used when it is discarded
+
+        Returns
+        -------
+        None
+        """
+        return
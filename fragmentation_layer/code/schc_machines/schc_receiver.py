@@ -1,8 +1,8 @@
 """ schc_receiver: SCHC Finite State Machine Receiver Behaviour """
 
-from schc_base import SCHCTimer
+from schc_base import SCHCTimer, ReassemblyBuffer
 from schc_machines import SCHCFiniteStateMachine
-from schc_messages import RegularSCHCFragment, All1SCHCFragment, SCHCAckReq, SCHCSenderAbort, SCHCPayload
+from schc_messages import RegularSCHCFragment, All1SCHCFragment, SCHCAckReq, SCHCSenderAbort
 from schc_parsers import SCHCParser
 
 
@@ -13,7 +13,7 @@ class SCHCReceiver(SCHCFiniteStateMachine):
     Attributes
     ----------
     protocol
-    payload : SCHCPayload
+    payload : ReassemblyBuffer
         Payload reassembled
     inactivity_timer : Timer
         Inactivity Timer to abort waiting for SCHC Message
@@ -135,9 +135,20 @@ class SCHCReceiver(SCHCFiniteStateMachine):
             self.sm.state.enter_state()
             return
 
-    def __init__(self, protocol, dtag=None):
+    def __init__(self, protocol, dtag=None, wheel=None):
         super().__init__(protocol, dtag=dtag)
-        self.payload: SCHCPayload = SCHCPayload()
-        self.inactivity_timer = SCHCTimer(self.on_expiration_time, protocol.INACTIVITY_TIMER)
+        self.payload = ReassemblyBuffer(protocol)
+        self.inactivity_timer = SCHCTimer(self.on_expiration_time, protocol.INACTIVITY_TIMER, wheel=wheel)
         self.__end_msg__ = "Message received and resembled"
         return
+
+    def stop_timers(self):
+        """
+        Stops inactivity timer
+
+        Returns
+        -------
+        None
+        """
+        self.inactivity_timer.stop()
+        return
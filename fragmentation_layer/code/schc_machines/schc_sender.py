@@ -1,6 +1,6 @@
 """ schc_sender: SCHC Finite State Machine Sender Behaviour """
 
-from schc_base import SCHCTimer, SCHCObject
+from schc_base import SCHCTimer, BitBuffer
 from schc_machines import SCHCFiniteStateMachine
 from schc_messages import SCHCAck, SCHCReceiverAbort
 from schc_parsers import SCHCParser
@@ -15,12 +15,12 @@ class SCHCSender(SCHCFiniteStateMachine):
     protocol
     retransmission_timer : Timer
         Retransmission Timer to abort retransmitting SCHC Messages
-    packet : bytes
+    packet : bytes or BitBuffer
         Packet to send
-    residue : str
+    residue : str or BitBuffer
         Compression residue (as bits)
-    remaining_packet : str
-        Rest of packet to send encoding as 0 and 1 string
+    remaining_packet : BitBuffer
+        Rest of packet to send as a bit sequence
     """
     __type__ = "Sender"
 
@@ -91,25 +91,45 @@ class SCHCSender(SCHCFiniteStateMachine):
             self.sm.state.enter_state()
             return
 
-    def __init__(self, protocol, payload, residue="", dtag=None):
+    def __init__(self, protocol, payload, residue="", dtag=None, wheel=None):
         """
         Constructor
 
         Parameters
         ----------
         protocol
-        payload : bytes
-            Payload to fragment
-        residue : str
-            Bits (as a string) obtained as residue of compression process
+        payload : bytes or BitBuffer
+            Payload to fragment, a BitBuffer can hold a SCHC Packet whose
+            length is not a multiple of 8 bits (e.g. Rule ID, residue and
+            payload written by a compressor)
+        residue : str or BitBuffer
+            Bits (as a string or a BitBuffer) obtained as residue of compression process
         dtag
+        wheel : TimerWheel, optional
+            Wheel of timers, default TimerWheel.default()
         """
         super().__init__(protocol, dtag=dtag)
-        self.retransmission_timer = SCHCTimer(self.on_expiration_time, protocol.RETRANSMISSION_TIMER)
+        self.retransmission_timer = SCHCTimer(self.on_expiration_time, protocol.RETRANSMISSION_TIMER, wheel=wheel)
         self.retransmission_timer.stop()
         self.packet = payload
         self.residue = residue
-        self.remaining_packet = residue + SCHCObject.bytes_2_bits(payload)
+        payload = payload if isinstance(payload, BitBuffer) else BitBuffer(payload)
+        if len(residue) == 0:
+            self.remaining_packet = payload  # packet is not copied
+        else:
+            self.remaining_packet = BitBuffer.join([residue, payload])
+        # bytes of the packet are padded with zeroes to match L2 word
         self.rcs = self.protocol.calculate_rcs(self.remaining_packet)
         self.__end_msg__ = "Message sent and acknowledged"
         return
+
+    def stop_timers(self):
+        """
+        Stops retransmission timer
+
+        Returns
+        -------
+        None
+        """
+        self.retransmission_timer.stop()
+        return
@@ -1,7 +1,7 @@
 """all_1_schc_fragment: All1SCHCFragment Concrete Class"""
 
 from schc_base import Tile
-from schc_messages import SCHCFragment, SCHCMessage
+from schc_messages import SCHCFragment
 from schc_messages.schc_header import FragmentedCompressedNumber
 
 
@@ -33,7 +33,7 @@ class All1SCHCFragment(SCHCFragment):
             Optional
         """
         super().__init__(rule_id, protocol=protocol, dtag=dtag, w=w, rcs=rcs)
-        self.header.fcn = FragmentedCompressedNumber(int(2**self.protocol.N) - 1,
+        self.header.fcn = FragmentedCompressedNumber(self.protocol.ALL1_FCN,
                                                      self.protocol.N)
         self.header.size += self.header.fcn.size
         self.size += self.header.fcn.size
@@ -58,16 +58,16 @@ class All1SCHCFragment(SCHCFragment):
         """
         protocol_to_use, bits_received, pointer, rule_id, dtag, w = All1SCHCFragment._get_common_(
             received, protocol=protocol)
-        fcn = bits_received[pointer:pointer+protocol_to_use.N]
-        assert fcn == "1" * protocol_to_use.N, "FCN not all-1 in an All-1 SCHC Fragment"
+        fcn = bits_received[pointer:pointer+protocol_to_use.N].to_int()
+        assert fcn == 2**protocol_to_use.N - 1, "FCN not all-1 in an All-1 SCHC Fragment"
         pointer += protocol_to_use.N
-        rcs = hex(int(bits_received[pointer:pointer+protocol_to_use.U], 2))
+        rcs = hex(bits_received[pointer:pointer+protocol_to_use.U].to_int())
         message = All1SCHCFragment(rule_id, protocol=protocol,
                                    dtag=dtag, w=w, rcs=rcs)
         pointer += protocol_to_use.U
         payload = bits_received[pointer:]
         payload = protocol_to_use.payload_condition_all1(payload)
         if len(payload) != 0:
-            message.add_tile(Tile(SCHCMessage.bits_2_bytes(payload)))
+            message.add_tile(Tile(payload.as_bytes()))
             message.add_padding()
         return message
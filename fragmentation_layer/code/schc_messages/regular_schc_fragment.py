@@ -1,7 +1,7 @@
 """regular_schc_fragment: Regular SCHCFragment Concrete Class"""
 
 from schc_base import Tile
-from schc_messages import SCHCFragment, SCHCMessage
+from schc_messages import SCHCFragment
 
 
 class RegularSCHCFragment(SCHCFragment):
@@ -53,7 +53,7 @@ class RegularSCHCFragment(SCHCFragment):
         """
         protocol_to_use, bits_received, pointer, rule_id, dtag, w = RegularSCHCFragment._get_common_(
             received, protocol=protocol)
-        fcn = int(bits_received[pointer:pointer+protocol_to_use.N], 2)
+        fcn = bits_received[pointer:pointer+protocol_to_use.N].to_int()
         pointer += protocol_to_use.N
         message = RegularSCHCFragment(rule_id, protocol=protocol,
                                       dtag=dtag, w=w, fcn=fcn)
@@ -64,6 +64,6 @@ class RegularSCHCFragment(SCHCFragment):
         if len(payload) % tile_size > 0:
             padding_size = len(payload) % tile_size
             payload = payload[0:-padding_size]
-        message.add_tile(Tile(SCHCMessage.bits_2_bytes(payload)))
+        message.add_tile(Tile(payload.as_bytes()))
         message.add_padding()
         return message
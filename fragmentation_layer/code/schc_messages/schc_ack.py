@@ -32,16 +32,16 @@ class SCHCAck(SCHCMessage):
         super().__init__(rule_id=rule_id, protocol=protocol, dtag=dtag,
                          w=w, c=c, compressed_bitmap=compressed_bitmap)
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Bits sequence representation
 
         Returns
         -------
-        str :
-            Bits sequence in a string
+        BitBuffer :
+            Bits sequence
         """
-        return self.header.as_bits() + self.padding.as_bits()
+        return self.header.as_buffer() + self.padding.as_buffer()
 
     def as_text(self):
         """
@@ -73,7 +73,7 @@ class SCHCAck(SCHCMessage):
             An new instance of SCHC Ack
         """
         protocol_to_use, bits_received, pointer, rule_id, dtag, w = SCHCAck._get_common_(received, protocol=protocol)
-        c = bits_received[pointer:pointer + 1] == "1"
+        c = bits_received[pointer:pointer + 1].to_int() == 1
         pointer += 1
         if c:
             message = SCHCAck(rule_id, protocol=protocol,
@@ -83,12 +83,12 @@ class SCHCAck(SCHCMessage):
             bitmap = bits_received[pointer:]
             if len(bitmap) > protocol_to_use.WINDOW_SIZE:
                 bitmap = bitmap[0:protocol_to_use.WINDOW_SIZE]
-                bitmap = [i == "1" for i in bitmap]
+                bitmap = [i == 1 for i in bitmap]
                 message = SCHCAck(rule_id, protocol=protocol, c=c,
                                   dtag=dtag, w=w, compressed_bitmap=bitmap)
                 message.add_padding()
             else:
-                bitmap = [i == "1" for i in bitmap]
+                bitmap = [i == 1 for i in bitmap]
                 message = SCHCAck(rule_id, protocol=protocol, c=c,
                                   dtag=dtag, w=w, compressed_bitmap=bitmap)
         return message
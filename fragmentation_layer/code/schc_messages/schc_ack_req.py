@@ -23,16 +23,16 @@ class SCHCAckReq(SCHCMessage):
         self.size += self.header.fcn.size
         return
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Bits sequence representation
 
         Returns
         -------
-        str :
-            Bits sequence in a string
+        BitBuffer :
+            Bits sequence
         """
-        return self.header.as_bits() + self.padding.as_bits()
+        return self.header.as_buffer() + self.padding.as_buffer()
 
     def as_text(self):
         """
@@ -64,8 +64,8 @@ class SCHCAckReq(SCHCMessage):
             An new instance of SCHC Ack Req
         """
         protocol_to_use, bits_received, pointer, rule_id, dtag, w = SCHCAckReq._get_common_(received, protocol=protocol)
-        fcn = bits_received[pointer:pointer+protocol_to_use.N]
-        assert fcn == "0" * protocol_to_use.N, "FCN not all-0 in an SCHC Ack Req"
+        fcn = bits_received[pointer:pointer+protocol_to_use.N].to_int()
+        assert fcn == 0, "FCN not all-0 in an SCHC Ack Req"
         message = SCHCAckReq(rule_id, protocol=protocol,
                              dtag=dtag, w=w)
         message.add_padding()
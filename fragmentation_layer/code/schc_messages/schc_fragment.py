@@ -1,5 +1,6 @@
 """schc_fragment: SCHCFragment Class"""
 
+from schc_base import BitBuffer
 from schc_messages import SCHCMessage
 
 
@@ -53,20 +54,20 @@ class SCHCFragment(SCHCMessage):
         int :
             Size of current SCHC Fragment
         """
-        payload_size = self.payload.add_content(tile.as_bits())
+        payload_size = self.payload.add_content(tile.as_buffer())
         self.size = self.header.size + payload_size + self.padding.size
         return self.size
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Bits sequence representation
 
         Returns
         -------
-        str :
-            Bits sequence in a string
+        BitBuffer :
+            Bits sequence
         """
-        return self.header.as_bits() + self.payload.as_bits() + self.padding.as_bits()
+        return BitBuffer.join([self.header.as_buffer(), self.payload.as_buffer(), self.padding.as_buffer()])
 
     def as_text(self):
         """
@@ -1,5 +1,6 @@
 """compressed_bitmap: Compressed Bitmap Class"""
 
+from schc_base import BitBuffer
 from schc_messages.schc_header import SCHCField
 
 
@@ -33,22 +34,19 @@ class CompressedBitmap(SCHCField):
         self.size = len(bitmap)
         return
 
-    def as_bits(self):
+    def as_buffer(self):
         """
-        Returns the bytes representation of the SCHC Header
+        Returns the bits representation of the SCHC Header
 
         Returns
         -------
-        str :
-            String with bit representation
+        BitBuffer :
+            Bit representation
         """
-        out = ""
+        value = 0
         for bit in self.bitmap:
-            if bit:
-                out += "1"
-            else:
-                out += "0"
-        return out
+            value = (value << 1) | bool(bit)
+        return BitBuffer.from_int(value, len(self.bitmap))
 
     def format_text(self):
         """
@@ -1,5 +1,6 @@
 """dtag: Datagram Tag Class"""
 
+from schc_base import BitBuffer
 from schc_messages.schc_header import SCHCField
 
 
@@ -32,19 +33,19 @@ class DTag(SCHCField):
         self.size = self.t
         return
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Returns the bits representation of the SCHC Header
 
         Returns
         -------
-        str :
+        BitBuffer :
             Bit representation
         """
         if self.t == 0:
-            return ""
+            return BitBuffer()
         else:
-            return self.zfill("{:0b}".format(self.dtag), self.t)
+            return BitBuffer.from_int(self.dtag, self.t)
 
     def format_text(self):
         """
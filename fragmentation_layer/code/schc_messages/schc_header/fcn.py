@@ -1,6 +1,7 @@
 """fcn: Fragment Compressed Number Class"""
 
 from math import log
+from schc_base import BitBuffer
 from schc_messages.schc_header import SCHCField
 
 
@@ -35,19 +36,19 @@ class FragmentedCompressedNumber(SCHCField):
         self.size = self.n
         return
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Returns the bits representation of the SCHC Header
 
         Returns
         -------
-        str :
+        BitBuffer :
             Bit representation
         """
         if self.n != 0:
-            return self.zfill("{:0b}".format(self.fcn), self.n)
+            return BitBuffer.from_int(self.fcn, self.n)
         else:
-            return ""
+            return BitBuffer()
 
     def format_text(self):
         """
@@ -1,5 +1,6 @@
 """integrity_check: Integrity Check Class"""
 
+from schc_base import BitBuffer
 from schc_messages.schc_header import SCHCField
 
 
@@ -26,16 +27,16 @@ class IntegrityCheck(SCHCField):
         self.c = c
         self.size = 1
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Returns the bits representation of the SCHC Header
 
         Returns
         -------
-        str :
+        BitBuffer :
             Bit representation
         """
-        return "{:0b}".format(self.c)
+        return BitBuffer.from_int(int(self.c), 1)
 
     def format_text(self):
         """
@@ -1,5 +1,6 @@
 """rcs: Reassembly Check Sequence Class"""
 
+from schc_base import BitBuffer
 from schc_messages.schc_header import SCHCField
 
 
@@ -32,17 +33,16 @@ class ReassemblyCheckSequence(SCHCField):
         self.size = self.u
         return
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Returns the bits representation of the SCHC Header
 
         Returns
         -------
-        str :
+        BitBuffer :
             Bit representation
         """
-        rcs = int(self.rcs, 0)
-        return self.zfill("{:0b}".format(rcs), self.u)
+        return BitBuffer.from_int(int(self.rcs, 0), self.u)
 
     def format_text(self):
         """
@@ -1,7 +1,7 @@
 """rule_id: RuleId Class"""
 
 from math import log
-from schc_base import SCHCObject
+from schc_base import SCHCObject, BitBuffer
 from schc_protocols import get_protocol, SCHCProtocol
 
 
@@ -46,17 +46,17 @@ class RuleID(SCHCObject):
         if self.protocol.id == 0:
             return self.bits_2_bytes(self.as_bits())
         elif self.protocol.id == SCHCProtocol.LoRaWAN:
-            return self.bits_2_bytes(self.zfill(self.as_bits(), self.protocol.FPORT_LENGTH))
+            return BitBuffer.from_int(self.rule_id, max(self.size, self.protocol.FPORT_LENGTH)).as_bytes()
         else:
             raise NotImplemented("Just LoRaWAN protocol is currently implemented")
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Representation of bits sequence
 
         Returns
         -------
-        str :
-            Bits sequence as text
+        BitBuffer :
+            Bits sequence
         """
-        return self.zfill("{:0b}".format(self.rule_id), self.protocol.RULE_SIZE)
+        return BitBuffer.from_int(self.rule_id, self.protocol.RULE_SIZE)
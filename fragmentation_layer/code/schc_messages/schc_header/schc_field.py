@@ -21,14 +21,14 @@ class SCHCField(SCHCObject):
         """
         return b''
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Represent the field as bits, depending on field
 
         Returns
         -------
-        str :
-            A string of bits
+        BitBuffer :
+            A bit sequence
         """
         pass
 
@@ -1,6 +1,6 @@
 """schc_header: SCHC Header Class"""
 
-from schc_base import SCHCObject
+from schc_base import SCHCObject, BitBuffer
 from schc_protocols import get_protocol
 from schc_messages.schc_header import SCHCField, SCHCNullField
 from schc_messages.schc_header import RuleID, DTag, WField, FragmentedCompressedNumber
@@ -82,27 +82,27 @@ class SCHCHeader(SCHCObject):
             self.compressed_bitmap = CompressedBitmap(kwargs.get("compressed_bitmap"), self.protocol.WINDOW_SIZE)
         self.size = sum([
             self.rule_id.size, self.dtag.t, self.w.m,
-            self.fcn.n, self.rcs.u, len(self.c.as_bits()),
+            self.fcn.n, self.rcs.u, self.c.size,
             self.compressed_bitmap.size
         ])
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Representation of bits sequence
 
         Returns
         -------
-        str :
-            Bits sequence as text
+        BitBuffer :
+            Bits sequence
         """
-        return ''.join([
-            self.rule_id.as_bits(),
-            self.dtag.as_bits(),
-            self.w.as_bits(),
-            self.fcn.as_bits(),
-            self.rcs.as_bits(),
-            self.c.as_bits(),
-            self.compressed_bitmap.as_bits(),
+        return BitBuffer.join([
+            self.rule_id.as_buffer(),
+            self.dtag.as_buffer(),
+            self.w.as_buffer(),
+            self.fcn.as_buffer(),
+            self.rcs.as_buffer(),
+            self.c.as_buffer(),
+            self.compressed_bitmap.as_buffer(),
         ])
 
     def as_bytes(self):
@@ -114,4 +114,4 @@ class SCHCHeader(SCHCObject):
         bytes :
             Header as bytes
         """
-        return SCHCObject.bits_2_bytes(self.as_bits())
+        return self.as_buffer().as_bytes()
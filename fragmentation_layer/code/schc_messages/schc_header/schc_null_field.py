@@ -1,5 +1,6 @@
 """ schc_null_field: SCHC Null Field Class"""
 
+from schc_base import BitBuffer
 from schc_messages.schc_header import SCHCField
 
 
@@ -33,13 +34,13 @@ class SCHCNullField(SCHCField):
         self.u = 0
         self.window_size = 0
 
-    def as_bits(self):
+    def as_buffer(self):
         """
-        Represent the field as an empty string
+        Represent the field as an empty sequence
 
         Returns
         -------
-        str :
-            An empty string
+        BitBuffer :
+            An empty sequence
         """
-        return ""
+        return BitBuffer()
@@ -1,5 +1,6 @@
 """w_field: W Class"""
 
+from schc_base import BitBuffer
 from schc_messages.schc_header import SCHCField
 
 
@@ -32,16 +33,16 @@ class WField(SCHCField):
         self.size = self.m
         return
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Returns the bits representation of the SCHC Header
 
         Returns
         -------
-        str :
+        BitBuffer :
             Bit representation
         """
-        return self.zfill("{:0b}".format(self.w), self.m)
+        return BitBuffer.from_int(self.w, self.m)
 
     def format_text(self):
         """
@@ -1,6 +1,6 @@
 """ schc_messages: SCHCMessage class """
 
-from schc_base import SCHCObject
+from schc_base import SCHCObject, BitBuffer
 from schc_protocols import get_protocol, SCHCProtocol
 from schc_messages import SCHCHeader, SCHCPayload, SCHCPadding
 
@@ -91,8 +91,7 @@ class SCHCMessage(SCHCObject):
         NotImplemented
             Any other SCHC protocol, but LoRaWAN
         """
-        message = self.as_bits()
-        return self.bits_2_bytes(message)
+        return self.as_buffer().as_bytes()
 
     def add_padding(self):
         """
@@ -199,8 +198,8 @@ class SCHCMessage(SCHCObject):
         -------
         SCHCProtocol :
             Protocol to use for parsing
-        str :
-            Bits received, a sequence of 0 as 1 that encode the message received
+        BitBuffer :
+            Bits received, the sequence that encodes the message received
         int :
             An integer representing current point on reading received bits
         int :
@@ -210,21 +209,20 @@ class SCHCMessage(SCHCObject):
         int :
             W value (as an integer)
         """
-        protocol_to_use = get_protocol(protocol)
-        bits_received = SCHCMessage.bytes_2_bits(received)
-        pointer = protocol_to_use.RULE_SIZE
-        rule_id = int(bits_received[0:pointer], 2)
-        protocol_to_use.set_rule_id(rule_id=rule_id)
+        bits_received = BitBuffer(received)
+        pointer = get_protocol(protocol).RULE_SIZE
+        rule_id = bits_received[0:pointer].to_int()
+        protocol_to_use = get_protocol(protocol, rule_id=rule_id)
         dtag = bits_received[pointer:pointer+protocol_to_use.T]
         pointer += protocol_to_use.T
-        if dtag == "":
+        if len(dtag) == 0:
             dtag = None
         else:
-            dtag = int(dtag, 2)
+            dtag = dtag.to_int()
         w = bits_received[pointer:pointer+protocol_to_use.M]
         pointer += protocol_to_use.M
-        if w == "":
+        if len(w) == 0:
             w = None
         else:
-            w = int(w, 2)
+            w = w.to_int()
         return protocol_to_use, bits_received, pointer, rule_id, dtag, w
@@ -1,6 +1,6 @@
 """schc_padding: SCHC Padding Class"""
 
-from schc_base import SCHCObject
+from schc_base import SCHCObject, BitBuffer
 
 
 class SCHCPadding(SCHCObject):
@@ -28,16 +28,16 @@ class SCHCPadding(SCHCObject):
         self.size += size
         return self.size
 
-    def as_bits(self):
+    def as_buffer(self):
         """
-        Bit by bit representation
+        Bit sequence representation
 
         Returns
         -------
-        str :
-            A str with just '0'
+        BitBuffer :
+            A sequence with just 0s
         """
-        return '0' * self.size
+        return BitBuffer.from_int(0, self.size)
 
     def as_bytes(self):
         """
@@ -1,6 +1,6 @@
 """schc_payload: SCHC Payload Class"""
 
-from schc_base import SCHCObject
+from schc_base import SCHCObject, BitBuffer
 
 
 class SCHCPayload(SCHCObject):
@@ -9,23 +9,22 @@ class SCHCPayload(SCHCObject):
 
     Attributes
     ----------
-    content : str
+    content : BitBuffer
         Content of payload
     """
 
     def __init__(self):
         super().__init__()
-        self.content = ''
+        self.content = BitBuffer()
 
-    def as_bits(self):
+    def as_buffer(self):
         """
-        Represent the SCHCObject content in a string
-        representing bit by bit
+        Represent the payload as a bit sequence
 
         Returns
         -------
-        str :
-            Bit sequence as a string
+        BitBuffer :
+            Content of payload
         """
         return self.content
 
@@ -38,7 +37,7 @@ class SCHCPayload(SCHCObject):
         bytes:
             Payload as bytes
         """
-        return SCHCObject.bits_2_bytes(self.content)
+        return self.content.as_bytes()
 
     def add_content(self, to_add):
         """
@@ -46,7 +45,7 @@ class SCHCPayload(SCHCObject):
 
         Parameters
         ----------
-        to_add : str or bytes
+        to_add : str or bytes or BitBuffer
             An encoded content or bit sequence
 
         Returns
@@ -54,10 +53,5 @@ class SCHCPayload(SCHCObject):
         int :
             Size of current SCHC Payload
         """
-        if isinstance(to_add, str):
-            self.content += to_add
-            self.size = len(self.content)
-        elif isinstance(to_add, bytes):
-            self.content += self.bytes_2_bits(to_add)
-            self.size = len(self.content) * 8
+        self.size = self.content.append(to_add)
         return self.size
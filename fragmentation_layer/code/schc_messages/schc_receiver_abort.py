@@ -1,5 +1,6 @@
 """schc_receiver_abort: SCHC Receiver Abort Class"""
 
+from schc_base import BitBuffer
 from schc_messages import SCHCMessage
 from schc_messages.schc_header import IntegrityCheck
 
@@ -32,16 +33,16 @@ class SCHCReceiverAbort(SCHCMessage):
         self.__fill_ones__()
         return
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Bits sequence representation
 
         Returns
         -------
-        str :
-            Bits sequence in a string
+        BitBuffer :
+            Bits sequence
         """
-        return self.header.as_bits() + ("1" * self.ones)
+        return self.header.as_buffer() + BitBuffer.from_int((1 << self.ones) - 1, self.ones)
 
     def add_padding(self):
         """
@@ -122,10 +123,10 @@ class SCHCReceiverAbort(SCHCMessage):
             received, protocol=protocol)
         assert "{:0b}".format(w) == "1" * protocol_to_use.M,\
             "W != {}, must be all-1, Receiver Abort must be ignored".format("{:0b}".format(w))
-        c = bits_received[pointer:pointer+1] == "1"
+        c = bits_received[pointer:pointer+1].to_int() == 1
         assert c, "C = 0, Receiver Abort must be ignored"
         pointer += 1
-        padding = bits_received[pointer:]
+        padding = bits_received[pointer:].as_bits()
         padding_length = protocol_to_use.L2_WORD - (sum(
             [protocol_to_use.RULE_SIZE, protocol_to_use.T,
              protocol_to_use.M, 1]) % protocol_to_use.L2_WORD)
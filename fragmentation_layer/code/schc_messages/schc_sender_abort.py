@@ -18,7 +18,7 @@ class SCHCSenderAbort(SCHCMessage):
     def __init__(self, rule_id, protocol=1, dtag=None, w=None):
         super().__init__(rule_id=rule_id, protocol=protocol,
                          dtag=dtag, w=w)
-        self.header.fcn = FragmentedCompressedNumber(int(2**self.protocol.N) - 1,
+        self.header.fcn = FragmentedCompressedNumber(self.protocol.ALL1_FCN,
                                                      self.protocol.N)
         self.header.size += self.header.fcn.size
         self.size += self.header.fcn.size
@@ -26,16 +26,16 @@ class SCHCSenderAbort(SCHCMessage):
             self.header.w.w = int(2**self.header.w.size) - 1
         return
 
-    def as_bits(self):
+    def as_buffer(self):
         """
         Bits sequence representation
 
         Returns
         -------
-        str :
-            Bits sequence in a string
+        BitBuffer :
+            Bits sequence
         """
-        return self.header.as_bits() + self.padding.as_bits()
+        return self.header.as_buffer() + self.padding.as_buffer()
 
     def as_text(self):
         """
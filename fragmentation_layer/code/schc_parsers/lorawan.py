@@ -1,12 +1,20 @@
 """ lorawan: LoRaWAN parser function """
 
-from schc_messages import SCHCMessage, SCHCAck, SCHCAckReq, SCHCReceiverAbort, All1SCHCFragment, RegularSCHCFragment
-from schc_protocols import LoRaWAN
+from schc_base import BitBuffer, Tile
+from schc_messages import SCHCAck, SCHCAckReq, SCHCReceiverAbort, SCHCSenderAbort, All1SCHCFragment, \
+    RegularSCHCFragment
+from schc_protocols import LoRaWAN, SCHCProtocol, get_protocol
+
+__RULE_BYTES__ = get_protocol(SCHCProtocol.LoRaWAN).RULE_SIZE // 8
+__MORE__ = 4  # length class of messages longer than 3 L2 words
 
 
 def parse(message):
     """
-    Parses message receive according to LoRaWAN Profile
+    Parses message receive according to LoRaWAN Profile. Fields are
+    decoded straight from the bytes received: the RuleID (FPort) and
+    the number of L2 words select the decoder on a dispatch table and
+    payloads are views (memoryview) of message, not copies
 
     Parameters
     ----------
@@ -21,101 +29,164 @@ def parse(message):
     Raises
     ------
     ValueError:
-        Rule ID not defined in protocol
+        Rule ID not defined in protocol or message of unknown type
     RuntimeError:
         LoRaWAN cannot support fragmentation of message
     """
-    rule_id = int.from_bytes(message[0:LoRaWAN().FPORT_LENGTH // 8], "big")
-    if rule_id == LoRaWAN.ACK_ON_ERROR:
-        return __parse_ack_on_error__(message)
-    elif rule_id == LoRaWAN.ACK_ALWAYS:
-        return __parse_ack_always__(message)
-    elif rule_id == LoRaWAN.NOT_POSSIBLE:
-        raise RuntimeError("Cannot fragment message under LoRaWAN protocol")
-    else:
-        raise ValueError("Rule ID not defined in protocol")
+    rule_id = int.from_bytes(message[0:__RULE_BYTES__], "big")
+    decoder = __DISPATCH__.get((rule_id, min(len(message), __MORE__)))
+    if decoder is None:
+        if rule_id == LoRaWAN.NOT_POSSIBLE:
+            raise RuntimeError("Cannot fragment message under LoRaWAN protocol")
+        elif rule_id in __PROFILES__:
+            raise ValueError("Message of unknown type for LoRaWAN SCHC Compression")
+        else:
+            raise ValueError("Rule ID not defined in protocol")
+    return decoder(__PROFILES__[rule_id], memoryview(message))
 
 
-def __parse_ack_on_error__(message):
+def __w__(protocol, message):
     """
-    Parses message on ack_on_error mode
-
-    Parameters
-    ----------
-    message : bytes
-        Content received
+    W field, first M bits after the RuleID (DTag is not used, T = 0),
+    None if windows are not used (M = 0)
+    """
+    if protocol.M == 0:
+        return None
+    return message[__RULE_BYTES__] >> (8 - protocol.M)
 
-    Returns
-    -------
-    SCHCMessage :
-        SCHCMessage with attributes given by content received
 
-    Raises
-    ------
-    AssertionError :
-        Message receive do not match L2 Word size
-    ValueError :
-        Message of unknown type for LoRaWAN SCHC Compression
+def __fcn__(protocol, message):
     """
-    protocol = LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR)
-    bits_received = SCHCMessage.bytes_2_bits(message)
-    length = len(bits_received)
-    assert length % protocol.L2_WORD == 0, "Bits received does not match L2 word"
-    pointer = protocol.RULE_SIZE + protocol.T + protocol.M
-    bit_to_check = bits_received[pointer:pointer + 1]
-    bits_to_check = bits_received[pointer:pointer + protocol.N]
-    if length == protocol.L2_WORD * 2:
-        if bits_to_check == "0" * protocol.N:
-            return SCHCAckReq.from_bytes(message, protocol=protocol.id)
-        else:
-            return SCHCAck.from_bytes(message, protocol=protocol.id)
-    elif length == protocol.L2_WORD * 3:
-        if bit_to_check == "0":
-            return SCHCAck.from_bytes(message, protocol=protocol.id)
-        elif bit_to_check == "1":
-            return SCHCReceiverAbort.from_bytes(message, protocol=protocol.id)
-    elif length > protocol.L2_WORD * 3:
-        if bits_to_check == "1" * protocol.N:
-            return All1SCHCFragment.from_bytes(message, protocol=protocol.id)
-        elif length >= protocol.L2_WORD * 2 + protocol.TILE_SIZE:
-            return RegularSCHCFragment.from_bytes(message, protocol=protocol.id)
-        else:
-            return SCHCAck.from_bytes(message, protocol=protocol.id)
-    else:
-        raise ValueError("Message of unknown type for LoRaWAN SCHC Compression")
+    FCN field, N bits after W (M + N fits in the byte after the RuleID)
+    """
+    return (message[__RULE_BYTES__] >> (8 - protocol.M - protocol.N)) & ((1 << protocol.N) - 1)
 
 
-def __parse_ack_always__(message):
+def __c__(protocol, message):
+    """
+    C bit (or first bit of FCN), the bit after W
     """
-    Parses message on ack_always mode
+    return (message[__RULE_BYTES__] >> (7 - protocol.M)) & 1
 
-    Parameters
-    ----------
-    message : bytes
-        Content received
 
-    Returns
-    -------
-    SCHCMessage :
-        SCHCMessage with attributes given by content received
-    """
-    protocol = LoRaWAN(rule_id=LoRaWAN.ACK_ALWAYS)
-    bits_received = SCHCMessage.bytes_2_bits(message)
-    length = len(bits_received)
-    assert length % protocol.L2_WORD == 0, "Bits received does not match L2 word"
-    pointer = protocol.RULE_SIZE + protocol.T + protocol.M
-    bit_to_check = bits_received[pointer:pointer + 1]
-    if length == protocol.L2_WORD * 2:
-        return SCHCAck.from_bytes(message, protocol=protocol.id)
-    elif length == protocol.L2_WORD * 3:
-        if bit_to_check == "0":
-            return RegularSCHCFragment.from_bytes(message, protocol=protocol.id)
-        elif bit_to_check == "1":
-            return SCHCReceiverAbort.from_bytes(message, protocol=protocol.id)
-    elif length > protocol.L2_WORD * 3:
-        if bit_to_check == "0":
-            return RegularSCHCFragment.from_bytes(message, protocol=protocol.id)
-        elif bit_to_check == "1":
-            return All1SCHCFragment.from_bytes(message, protocol=protocol.id)
+def __ack_req__(protocol, message):
+    ack_req = SCHCAckReq(protocol.RULE_ID, protocol=protocol.id, w=__w__(protocol, message))
+    ack_req.add_padding()
+    return ack_req
+
+
+def __ack__(protocol, message):
+    w = __w__(protocol, message)
+    if __c__(protocol, message) == 1:
+        ack = SCHCAck(protocol.RULE_ID, protocol=protocol.id, c=True, w=w)
+        ack.add_padding()
+        return ack
+    bitmap = BitBuffer(message, offset=protocol.ACK_HEADER_SIZE)
+    if len(bitmap) > protocol.WINDOW_SIZE:
+        ack = SCHCAck(protocol.RULE_ID, protocol=protocol.id, c=False, w=w,
+                      compressed_bitmap=[i == 1 for i in bitmap[0:protocol.WINDOW_SIZE]])
+        ack.add_padding()
     else:
-        raise ValueError("Message of unknown type for LoRaWAN SCHC Compression")
+        ack = SCHCAck(protocol.RULE_ID, protocol=protocol.id, c=False, w=w,
+                      compressed_bitmap=[i == 1 for i in bitmap])
+    return ack
+
+
+def __receiver_abort__(protocol, message):
+    # rare message, its padding is validated by from_bytes
+    return SCHCReceiverAbort.from_bytes(bytes(message), protocol=protocol.id)
+
+
+def __sender_abort__(protocol, message):
+    abort = SCHCSenderAbort(protocol.RULE_ID, protocol=protocol.id, w=__w__(protocol, message))
+    abort.add_padding()
+    return abort
+
+
+def __regular__(protocol, message):
+    fragment = RegularSCHCFragment(protocol.RULE_ID, __fcn__(protocol, message),
+                                   protocol=protocol.id, w=__w__(protocol, message))
+    payload = BitBuffer(message, offset=protocol.FRAGMENT_HEADER_SIZE)
+    tile_size = protocol.TILE_SIZE if protocol.TILE_SIZE != 0 else 8
+    fragment.add_tile(Tile(payload[0:len(payload) - len(payload) % tile_size]))
+    fragment.add_padding()
+    return fragment
+
+
+def __all1__(protocol, message):
+    received = BitBuffer(message, offset=protocol.FRAGMENT_HEADER_SIZE)
+    fragment = All1SCHCFragment(protocol.RULE_ID, protocol=protocol.id,
+                                w=__w__(protocol, message), rcs=hex(received[0:protocol.U].to_int()))
+    payload = protocol.payload_condition_all1(received[protocol.U:])
+    if len(payload) != 0:
+        if len(payload) % 8 != 0:
+            payload = BitBuffer(payload.as_bytes())  # tiles are whole bytes
+        fragment.add_tile(Tile(payload))
+        fragment.add_padding()
+    return fragment
+
+
+def __ack_on_error_short__(protocol, message):
+    fcn = __fcn__(protocol, message)
+    if fcn == 0:
+        return __ack_req__(protocol, message)
+    elif fcn == protocol.ALL1_FCN:
+        return __sender_abort__(protocol, message)
+    return __ack__(protocol, message)
+
+
+def __ack_on_error_3_words__(protocol, message):
+    if __c__(protocol, message) == 0:
+        return __ack__(protocol, message)
+    return __receiver_abort__(protocol, message)
+
+
+def __ack_on_error_long__(protocol, message):
+    if __fcn__(protocol, message) == protocol.ALL1_FCN:
+        return __all1__(protocol, message)
+    elif len(message) * 8 >= protocol.L2_WORD * 2 + protocol.TILE_SIZE:
+        return __regular__(protocol, message)
+    return __ack__(protocol, message)
+
+
+def __ack_always_3_words__(protocol, message):
+    if __c__(protocol, message) == 0:
+        return __regular__(protocol, message)
+    return __receiver_abort__(protocol, message)
+
+
+def __ack_always_long__(protocol, message):
+    if __c__(protocol, message) == 0:
+        return __regular__(protocol, message)
+    return __all1__(protocol, message)
+
+
+def __no_ack__(protocol, message):
+    if __fcn__(protocol, message) == 0:
+        return __regular__(protocol, message)
+    elif len(message) == __RULE_BYTES__ + 1:
+        return __sender_abort__(protocol, message)
+    elif len(message) * 8 >= protocol.FRAGMENT_HEADER_SIZE + protocol.U:
+        return __all1__(protocol, message)
+    raise ValueError("Message of unknown type for LoRaWAN SCHC Compression")
+
+
+__PROFILES__ = {
+    LoRaWAN.ACK_ON_ERROR: get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ON_ERROR),
+    LoRaWAN.ACK_ALWAYS: get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ALWAYS),
+    LoRaWAN.NO_ACK: get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.NO_ACK)
+}
+
+# decoders by (rule_id, length class), length class is the number of bytes (L2 words)
+# received, up to __MORE__
+__DISPATCH__ = {
+    (LoRaWAN.ACK_ON_ERROR, 2): __ack_on_error_short__,
+    (LoRaWAN.ACK_ON_ERROR, 3): __ack_on_error_3_words__,
+    (LoRaWAN.ACK_ON_ERROR, __MORE__): __ack_on_error_long__,
+    (LoRaWAN.ACK_ALWAYS, 2): __ack__,
+    (LoRaWAN.ACK_ALWAYS, 3): __ack_always_3_words__,
+    (LoRaWAN.ACK_ALWAYS, __MORE__): __ack_always_long__,
+    (LoRaWAN.NO_ACK, 2): __no_ack__,
+    (LoRaWAN.NO_ACK, 3): __no_ack__,
+    (LoRaWAN.NO_ACK, __MORE__): __no_ack__
+}
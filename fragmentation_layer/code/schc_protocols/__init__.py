@@ -3,11 +3,17 @@
 from schc_protocols.schc_protocol import SCHCProtocol
 from schc_protocols.lorawan import LoRaWAN
 from schc_protocols.sigfox import Sigfox
+from threading import Lock
 
+__profiles__ = dict()
+__profiles_lock__ = Lock()
 
-def get_protocol(protocol, rule_id=0):
+
+def get_protocol(protocol, rule_id=0, fec_ratio=None):
     """
-    Generates protocol from id defined
+    Gets protocol from id defined. Profiles are created once for each
+    (protocol, rule_id, fec_ratio) and frozen, then every message and
+    machine shares the same instance
 
     Parameters
     ----------
@@ -15,19 +21,33 @@ def get_protocol(protocol, rule_id=0):
         A valid Number
     rule_id : int
         Rule ID given
+    fec_ratio : float, optional
+        Fraction of tiles of each window used as parity tiles, default
+        the one of profile (see SCHCProtocol.set_fec_ratio)
 
     Returns
     -------
     SCHCProtocol :
-        SCHC Protocol associated to number given
+        SCHC Protocol associated to number given (frozen)
 
     Raises
     ------
     NotImplementedError
         Any Protocol currently not implemented
+    ValueError:
+        Rule ID not defined in protocol
+    RuntimeError:
+        Protocol cannot support fragmentation with Rule ID
     """
+    profile = __profiles__.get((protocol, rule_id, fec_ratio))
+    if profile is not None:
+        return profile
     if protocol == SCHCProtocol.LoRaWAN:
-        return LoRaWAN(rule_id=rule_id)
+        profile = LoRaWAN(rule_id=rule_id)
+        if fec_ratio is not None:
+            profile.set_fec_ratio(fec_ratio)
+        with __profiles_lock__:
+            return __profiles__.setdefault((protocol, rule_id, fec_ratio), profile.freeze())
     else:
         raise NotImplementedError("Protocol not implemented.\n"
                                   "Available Protocols:\n"
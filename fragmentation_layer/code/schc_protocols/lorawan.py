@@ -10,6 +10,7 @@ class LoRaWAN(SCHCProtocol):
     ACK_ON_ERROR = 20
     ACK_ALWAYS = 21
     NOT_POSSIBLE = 22
+    NO_ACK = 23
 
     def __init__(self, rule_id=0):
         """
@@ -33,6 +34,7 @@ class LoRaWAN(SCHCProtocol):
         self.RULE_SIZE = 8  # in bits
         self.L2_WORD = 8  # in bits
         self.__set_parameters__()
+        self.__derive__()
 
     def set_rule_id(self, rule_id):
         """
@@ -56,6 +58,7 @@ class LoRaWAN(SCHCProtocol):
         """
         super().set_rule_id(rule_id)
         self.__set_parameters__()
+        self.__derive__()
         return
 
     def __set_parameters__(self):
@@ -68,9 +71,11 @@ class LoRaWAN(SCHCProtocol):
             self.U = 32  # in bits
             self.WINDOW_SIZE = 63  # 2^(n=6) = 64 - {All-1 fragment}
             self.TILE_SIZE = 10 * 8  # 10 bytes = 80 bits
-            self.MAX_ACK_REQUEST = 1e6  # TODO
-            self.INACTIVITY_TIMER = 10  # in seconds TODO
+            self.FEC_RATIO = 0  # parity tiles disabled, see set_fec_ratio
+            self.MAX_ACK_REQUEST = 8
             self.RETRANSMISSION_TIMER = 10  # in seconds TODO
+            # in seconds, receiver waits while sender asks for an Ack (up to MAX_ACK_REQUEST times)
+            self.INACTIVITY_TIMER = self.RETRANSMISSION_TIMER * (self.MAX_ACK_REQUEST + 1)
         elif self.RULE_ID == LoRaWAN.ACK_ALWAYS:  # Downlink data transfer
             self.T = 0  # in bits
             self.M = 1  # in bits
@@ -81,6 +86,16 @@ class LoRaWAN(SCHCProtocol):
             self.MAX_ACK_REQUEST = 8
             self.INACTIVITY_TIMER = 12 * 60 * 60  # in seconds (12 hours)
             self.RETRANSMISSION_TIMER = 30  # in seconds
+        elif self.RULE_ID == LoRaWAN.NO_ACK:  # Uplink data transfer without Acks
+            self.T = 0  # in bits
+            self.M = 0  # in bits, windows are not used
+            self.N = 1  # in bits, All-1 fragment has FCN = 1
+            self.U = 32  # in bits
+            self.WINDOW_SIZE = 0  # windows are not used
+            self.TILE_SIZE = 0  # fragments carry any number of bytes
+            self.MAX_ACK_REQUEST = 0  # Acks are not used
+            self.INACTIVITY_TIMER = 12 * 60 * 60  # in seconds (12 hours)
+            self.RETRANSMISSION_TIMER = 0  # Acks are not used
         elif self.RULE_ID == LoRaWAN.NOT_POSSIBLE:
             raise RuntimeError("Cannot fragment message under LoRaWAN protocol")
         else:
@@ -91,21 +106,23 @@ class LoRaWAN(SCHCProtocol):
         """
         Just one tile is allowed
 
-        payload : str
-            Payload received as a binary string
+        payload : BitBuffer
+            Payload received as a bit sequence
 
         Returns
         -------
-        str :
+        BitBuffer :
             Payload without padding
         """
-        if payload == "":
-            return ""
+        if len(payload) == 0:
+            return payload
         else:
             if self.RULE_ID == LoRaWAN.ACK_ON_ERROR:
                 return payload[0: self.TILE_SIZE]
             elif self.RULE_ID == LoRaWAN.ACK_ALWAYS:
                 return payload
+            elif self.RULE_ID == LoRaWAN.NO_ACK:
+                return payload[0: len(payload) - len(payload) % 8]  # whole bytes are sent
 
     def calculate_rcs(self, packet):
         """
@@ -113,8 +130,8 @@ class LoRaWAN(SCHCProtocol):
 
         Parameters
         ----------
-        packet : str
-            SCHC Packet as binary string
+        packet : BitBuffer or str
+            SCHC Packet as a bit sequence (or binary string)
 
         Returns
         -------
@@ -1,6 +1,8 @@
 """ schc_protocol: Class with SCHC Protocols"""
 
-from schc_base import SCHCObject
+from binascii import crc32
+from math import ceil
+from schc_base import BitBuffer
 
 
 class SCHCProtocol:
@@ -27,6 +29,27 @@ class SCHCProtocol:
         Number of Tiles on a window (max)
     TILE_SIZE : int
         Size of Tile in bits
+    FEC_RATIO : float
+        Fraction of the tiles of a window used as parity tiles (forward
+        error correction), 0 disables it
+    FRAGMENT_HEADER_SIZE : int
+        Size of header of a SCHC Fragment (RuleID, DTag, W, FCN) in bits
+    ACK_HEADER_SIZE : int
+        Size of header of a SCHC ACK up to the bitmap (RuleID, DTag, W, C) in bits
+    ALL1_FCN : int
+        FCN value of an All-1 SCHC Fragment
+    TILE_BYTES : int
+        Size of Tile in bytes
+    FEC_TILES : int
+        Number of parity tiles of a window, sent on the first FCNs of it
+    WINDOW_TILES : int
+        Number of tiles of packet on a window (WINDOW_SIZE - FEC_TILES)
+    COMPRESSED_BITMAP_SIZES : Tuple[int]
+        Bits sent of a compressed bitmap, by number of bits before its
+        trailing ones (so the SCHC ACK ends on an L2 word boundary)
+
+    Profiles given by get_protocol are shared (interned by protocol
+    and Rule ID) and frozen: they cannot be altered once created
     """
 
     LoRaWAN = 1
@@ -54,11 +77,53 @@ class SCHCProtocol:
         self.U = 0
         self.WINDOW_SIZE = 0
         self.TILE_SIZE = 0
+        self.FEC_RATIO = 0
         self.MAX_ACK_REQUEST = 0
         self.INACTIVITY_TIMER = 0
         self.RETRANSMISSION_TIMER = 0
+        self.__derive__()
         return
 
+    def __setattr__(self, name, value):
+        if self.__dict__.get("__frozen__", False):
+            raise AttributeError("{} profile is shared and cannot be altered, "
+                                 "use get_protocol to get another Rule ID".format(self.__name__))
+        super().__setattr__(name, value)
+        return
+
+    def __derive__(self):
+        """
+        Calculates sizes derived from parameters of profile
+
+        Returns
+        -------
+        None
+            Alter instance
+        """
+        self.FRAGMENT_HEADER_SIZE = self.RULE_SIZE + self.T + self.M + self.N
+        self.ACK_HEADER_SIZE = self.RULE_SIZE + self.T + self.M + 1
+        self.ALL1_FCN = (1 << self.N) - 1
+        self.TILE_BYTES = self.TILE_SIZE // 8
+        self.FEC_TILES = ceil(self.WINDOW_SIZE * self.FEC_RATIO)
+        self.WINDOW_TILES = self.WINDOW_SIZE - self.FEC_TILES
+        word = self.L2_WORD if self.L2_WORD > 0 else 1
+        self.COMPRESSED_BITMAP_SIZES = tuple(
+            size + -(size + self.ACK_HEADER_SIZE) % word for size in range(self.WINDOW_SIZE + 1)
+        )
+        return
+
+    def freeze(self):
+        """
+        Forbids any change of profile, so it can be shared
+
+        Returns
+        -------
+        SCHCProtocol :
+            Same instance
+        """
+        self.__frozen__ = True
+        return self
+
     def set_rule_id(self, rule_id):
         """
         Sets Rule ID changing parameters
@@ -76,6 +141,33 @@ class SCHCProtocol:
         self.RULE_ID = rule_id
         return
 
+    def set_fec_ratio(self, fec_ratio):
+        """
+        Sets fraction of tiles of each window used as parity tiles
+
+        Parameters
+        ----------
+        fec_ratio : float
+            Ratio from 0 (no parity tiles) to 0.5
+
+        Returns
+        -------
+        None
+            Alter instance
+
+        Raises
+        ------
+        ValueError:
+            Ratio out of range or profile without fixed size tiles
+        """
+        if not 0 <= fec_ratio <= 0.5:
+            raise ValueError("FEC ratio must be between 0 and 0.5")
+        if fec_ratio != 0 and (self.TILE_SIZE == 0 or self.WINDOW_SIZE < 2):
+            raise ValueError("FEC requires windows of fixed size tiles")
+        self.FEC_RATIO = fec_ratio
+        self.__derive__()
+        return
+
     def payload_condition_all1(self, payload):
         """
         Payload on All1 SCHC Fragment is specified in each profile,
@@ -84,16 +176,16 @@ class SCHCProtocol:
 
         Parameters
         ----------
-        payload : str
-            Payload received as a binary string
+        payload : BitBuffer
+            Payload received as a bit sequence
 
         Returns
         -------
-        str :
+        BitBuffer :
             Payload without padding, or, in case All-1 has not
-            payload allowed an empty string
+            payload allowed an empty sequence
         """
-        return ""
+        return BitBuffer()
 
     def calculate_rcs(self, packet):
         """
@@ -101,16 +193,37 @@ class SCHCProtocol:
 
         Parameters
         ----------
-        packet : str
-            SCHC Packet as binary string
+        packet : BitBuffer or str
+            SCHC Packet as a bit sequence (or binary string), padded to L2 word
 
         Returns
         -------
         str :
             Result of Reassembly Check Sequence (RCS)
         """
-        from binascii import crc32
-        return hex(crc32(SCHCObject.bits_2_bytes(packet)))
+        if isinstance(packet, str):
+            packet = BitBuffer.from_bits(packet)
+        return hex(self.update_rcs(0, packet.as_bytes()))
+
+    def update_rcs(self, rcs, content):
+        """
+        Folds the next bytes of a packet into a running RCS, so it can be
+        calculated as the packet is received. calculate_rcs of a packet is
+        hex of the RCS obtained folding its bytes in order starting with 0
+
+        Parameters
+        ----------
+        rcs : int
+            RCS of the bytes preceding content (0 at the beginning)
+        content : bytes
+            Next bytes of the packet
+
+        Returns
+        -------
+        int :
+            RCS including content
+        """
+        return crc32(content, rcs)
 
     def penultimate_tile(self):
         """
@@ -0,0 +1,4 @@
+""" schc_runtime: Runtimes hosting SCHC handlers """
+
+from schc_runtime.async_runtime import SCHCAsyncRuntime
+from schc_runtime.simulator import SCHCSimulator, SimulatedSession
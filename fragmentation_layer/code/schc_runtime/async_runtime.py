@@ -0,0 +1,296 @@
+""" async_runtime: SCHCAsyncRuntime class, SCHC handlers on an asyncio loop """
+
+import asyncio
+import logging
+import socket
+from schc_base import TimerWheel
+from schc_protocols import SCHCProtocol
+
+
+class SCHCAsyncRuntime(asyncio.DatagramProtocol):
+    """
+    Hosts the sessions of a SCHC handler on an asyncio event loop. SCHC
+    messages are exchanged as datagrams of a single persistent UDP
+    endpoint (the address of the peer identifies the device, as a LoRaWAN
+    network server does with the DevEUI) and timers of machines run on a
+    TimerWheel advanced by the loop, so no thread nor socket is created
+    per session or per message. Once timers expire, sessions are polled
+    to send the messages their machines generate on expiration
+
+    On LoRaWAN, each datagram is a SCHC message starting with its RuleID
+    (the FPort of the LoRaWAN frame)
+
+    Attributes
+    ----------
+    handler : SCHCHandler
+        Handler with the sessions
+    wheel : TimerWheel
+        Wheel of timers of machines, advanced by the loop (see attach)
+    mtu : int
+        MTU (in bytes) used to generate messages
+    transport : asyncio.DatagramTransport
+        Endpoint used to exchange messages
+    __finished__ : Dict[Tuple, asyncio.Future]
+        Futures of sessions awaited, by (device, rule_id, dtag)
+    """
+
+    def __init__(self, handler, wheel, mtu=50):
+        """
+        Constructor, see open to create an instance listening on an endpoint
+
+        Parameters
+        ----------
+        handler : SCHCHandler
+            Handler with the sessions, its machines must use wheel
+        wheel : TimerWheel
+            Wheel of timers, advanced once attach is called
+        mtu : int, optional
+            MTU in bytes, default 50
+        """
+        self.handler = handler
+        self.wheel = wheel
+        self.mtu = mtu
+        self.transport = None
+        self.__handle__ = None
+        self.__finished__ = dict()
+        handler.session_listeners.append(self.__on_session_finished__)
+        return
+
+    @staticmethod
+    async def open(handler_class, protocol, local_addr, mtu=50, max_sessions=65536,
+                   resolution=0.1, receive_buffer=None, fec_ratio=None):
+        """
+        Creates a handler and a runtime listening on a UDP endpoint of the running loop
+
+        Parameters
+        ----------
+        handler_class : type
+            SCHCGatewayHandler or SCHCNodeHandler
+        protocol : int
+            SCHC Protocol
+        local_addr : Tuple[str, int]
+            Local address of the endpoint
+        mtu : int, optional
+            MTU in bytes, default 50
+        max_sessions : int, optional
+            Hard limit of sessions of handler, default 65536
+        resolution : float, optional
+            Resolution of timers in seconds, default 0.1
+        receive_buffer : int, optional
+            Size in bytes of the receive buffer of the socket (SO_RCVBUF),
+            default given by the system. A larger buffer avoids losing
+            datagrams when many devices send at once
+        fec_ratio : float, optional
+            Fraction of tiles of each Ack-on-Error window used as parity
+            tiles, default the one of profile. Both ends must use the same
+
+        Returns
+        -------
+        SCHCAsyncRuntime :
+            Runtime ready to send and receive messages
+        """
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(clock=loop.time, resolution=resolution)
+        handler = handler_class(protocol, max_sessions=max_sessions, wheel=wheel, fec_ratio=fec_ratio)
+        runtime = SCHCAsyncRuntime(handler, wheel, mtu=mtu)
+        transport, _ = await loop.create_datagram_endpoint(lambda: runtime, local_addr=local_addr)
+        if receive_buffer is not None:
+            transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+        runtime.attach(loop)
+        return runtime
+
+    def attach(self, loop):
+        """
+        Advances the wheel every tick on loop, polling sessions when timers expire
+
+        Parameters
+        ----------
+        loop : asyncio.AbstractEventLoop
+            Loop running the runtime
+
+        Returns
+        -------
+        None
+        """
+        def tick():
+            if self.wheel.advance() != 0:
+                self.poll()
+            self.__handle__ = loop.call_later(self.wheel.resolution, tick)
+        self.__handle__ = loop.call_later(self.wheel.resolution, tick)
+        return
+
+    def close(self):
+        """
+        Closes endpoint and stops timers
+
+        Returns
+        -------
+        None
+        """
+        if self.transport is not None:
+            self.transport.close()
+        if self.__handle__ is not None:
+            self.__handle__.cancel()
+            self.__handle__ = None
+        return
+
+    def connection_made(self, transport):
+        self.transport = transport
+        return
+
+    def datagram_received(self, data, addr):
+        try:
+            self.receive_message(data, addr)
+        except (ValueError, AssertionError, RuntimeError, KeyError) as error:
+            logging.warning("Message from %s discarded: %s", addr, error)
+        return
+
+    def error_received(self, exc):
+        logging.warning("Endpoint error: %s", exc)
+        return
+
+    def identify_session(self, message):
+        """
+        Rule ID and DTag of a message received
+
+        Parameters
+        ----------
+        message : bytes
+            SCHC Message as bytes
+
+        Returns
+        -------
+        int :
+            Rule ID
+        int :
+            DTag, None if it is not used
+        """
+        if self.handler.__protocol__.id == SCHCProtocol.LoRaWAN:
+            size = self.handler.__protocol__.FPORT_LENGTH // 8
+            return self.handler.identify_session_from_message(message[size:], f_port=message[:size])
+        raise NotImplementedError("Just LoRaWAN implemented")
+
+    def receive_message(self, message, device):
+        """
+        Delivers a message to its session and sends the messages it generates
+
+        Parameters
+        ----------
+        message : bytes
+            SCHC Message received
+        device : Tuple[str, int]
+            Address of the peer that sent message
+
+        Returns
+        -------
+        None
+        """
+        rule_id, dtag = self.identify_session(message)
+        try:
+            self.handler.receive(rule_id, dtag, message, device=device)
+        except SystemExit:
+            pass  # machine already ended, removed by handler
+        self.flush(rule_id, dtag, device)
+        return
+
+    def flush(self, rule_id, dtag, device):
+        """
+        Sends every message the machine of a session can generate now
+
+        Parameters
+        ----------
+        rule_id : int
+            Rule ID of session
+        dtag : int
+            DTag of session
+        device : Tuple[str, int]
+            Address of the peer of session
+
+        Returns
+        -------
+        int :
+            Number of messages sent
+        """
+        sent = 0
+        while (device, rule_id, dtag) in self.handler.__sessions__:
+            try:
+                message = self.handler.generate_message(rule_id, dtag, mtu=self.mtu, device=device)
+            except SystemExit:
+                break
+            if len(message) == 0:
+                break
+            self.transport.sendto(message, device)
+            sent += 1
+        return sent
+
+    def poll(self):
+        """
+        Sends the messages every session can generate now and releases
+        finished sessions (e.g. after their timers expired) and idle ones
+
+        Returns
+        -------
+        int :
+            Number of messages sent
+        """
+        self.handler.__sessions__.evict_idle()
+        sent = 0
+        for device, rule_id, dtag in list(self.handler.__sessions__):
+            sent += self.flush(rule_id, dtag, device)
+        return sent
+
+    def send_package(self, packet, device, rule_id, dtag=None):
+        """
+        Starts fragmentation of a packet to a peer
+
+        Parameters
+        ----------
+        packet : bytes
+            Packet to fragment
+        device : Tuple[str, int]
+            Address of the peer
+        rule_id : int
+            Rule ID to use
+        dtag : int, optional
+            DTag to use
+
+        Returns
+        -------
+        asyncio.Future :
+            Resolved with the machine of the session when it ends
+        """
+        finished = self.wait_session(rule_id, dtag, device)
+        self.handler.send_package(rule_id, packet, dtag=dtag, device=device)
+        self.flush(rule_id, dtag, device)
+        return finished
+
+    def wait_session(self, rule_id, dtag, device):
+        """
+        Future of the end of a session, it can be requested before the session starts
+
+        Parameters
+        ----------
+        rule_id : int
+            Rule ID of session
+        dtag : int
+            DTag of session
+        device : Tuple[str, int]
+            Address of the peer of session
+
+        Returns
+        -------
+        asyncio.Future :
+            Resolved with the machine of the session when it ends (or
+            when the session is evicted, then machine is not on its end
+            nor error state)
+        """
+        key = (device, rule_id, dtag)
+        if key not in self.__finished__:
+            self.__finished__[key] = asyncio.get_running_loop().create_future()
+        return self.__finished__[key]
+
+    def __on_session_finished__(self, rule_id, dtag, machine, device=None):
+        finished = self.__finished__.pop((device, rule_id, dtag), None)
+        if finished is not None and not finished.done():
+            finished.set_result(machine)
+        return
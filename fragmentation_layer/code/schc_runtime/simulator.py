@@ -0,0 +1,416 @@
+""" simulator: SCHCSimulator class, sessions over a simulated channel with a virtual clock """
+
+import heapq
+import random
+from schc_base import BitBuffer, TimerWheel
+from schc_machines import SCHCFiniteStateMachine
+from schc_messages import SCHCAck, SCHCFragment
+from schc_protocols import LoRaWAN, SCHCProtocol, get_protocol
+
+
+class SimulatedSession:
+    """
+    Pair of machines (sender and receiver) of a simulated device
+
+    Attributes
+    ----------
+    device : int
+        Number of device
+    packet : bytes
+        Packet fragmented
+    sender : SCHCSender
+        Machine of device
+    receiver : SCHCReceiver
+        Machine of gateway
+    start : float
+        Time (virtual) when fragmentation starts
+    end : float
+        Time (virtual) when both machines ended, None while running
+    error : str
+        Error that stopped the session, None if there was not
+    messages : Dict[str, int]
+        Messages sent by direction ('uplink' by sender, 'downlink' by receiver)
+    bytes : Dict[str, int]
+        Bytes sent by direction
+    acks : int
+        SCHC ACKs sent by receiver
+    retransmissions : int
+        Fragments sent with a (W, FCN) already sent (always 0 on No-ACK mode)
+    """
+
+    def __init__(self, device, packet, sender, receiver, start):
+        self.device = device
+        self.packet = packet
+        self.sender = sender
+        self.receiver = receiver
+        self.start = start
+        self.end = None
+        self.error = None
+        self.messages = {"uplink": 0, "downlink": 0}
+        self.bytes = {"uplink": 0, "downlink": 0}
+        self.acks = 0
+        self.retransmissions = 0
+        self.__sent__ = set()
+        self.__free__ = {"uplink": start, "downlink": start}
+        return
+
+    def is_finished(self):
+        """
+        Whether both machines reached end or error state (or session failed)
+
+        Returns
+        -------
+        bool :
+            True if session cannot go on
+        """
+        finished = (SCHCFiniteStateMachine.EndState, SCHCFiniteStateMachine.ErrorState)
+        return self.error is not None or (isinstance(self.sender.state, finished) and
+                                          isinstance(self.receiver.state, finished))
+
+    def is_delivered(self):
+        """
+        Whether packet was received and acknowledged
+
+        Returns
+        -------
+        bool :
+            True if both machines reached end state and the packet
+            reassembled is the one sent
+        """
+        if self.error is not None or not isinstance(self.sender.state, SCHCFiniteStateMachine.EndState) \
+                or not isinstance(self.receiver.state, SCHCFiniteStateMachine.EndState):
+            return False
+        packet = self.packet.as_bytes() if isinstance(self.packet, BitBuffer) else bytes(self.packet)
+        return self.receiver.payload.as_bytes() == packet
+
+    def is_timeout(self):
+        """
+        Whether receiver gave up waiting for sender (its inactivity timer
+        expired), e.g. when the Sender-Abort or the last fragments were lost
+
+        Returns
+        -------
+        bool :
+            True if receiver ended on a connection timeout
+        """
+        return self.error is None and isinstance(self.receiver.state, SCHCFiniteStateMachine.ErrorState) \
+            and self.receiver.__exit_msg__ == "Connection timeout"
+
+    def register(self, direction, message):
+        """
+        Counts a message sent
+
+        Parameters
+        ----------
+        direction : str
+            'uplink' or 'downlink'
+        message : SCHCMessage
+            Message sent
+
+        Returns
+        -------
+        None, alter self
+        """
+        self.messages[direction] += 1
+        self.bytes[direction] += message.size // 8
+        if isinstance(message, SCHCAck):
+            self.acks += 1
+        elif isinstance(message, SCHCFragment) and hasattr(message.header.w, "w"):
+            # fragments without W (No-ACK mode) are never retransmitted
+            key = (message.header.w.w, message.header.fcn.fcn)
+            if key in self.__sent__:
+                self.retransmissions += 1
+            self.__sent__.add(key)
+        return
+
+
+class SCHCSimulator:
+    """
+    Runs SCHC fragmentation sessions of many devices in process, over a
+    simulated channel and a virtual clock: timers of machines run on a
+    TimerWheel whose clock is the simulation time, and the simulator
+    jumps from one event (delivery of a message or expiration of a
+    timer) to the next one, so hours of protocol time run in
+    milliseconds. Each message takes an airtime on the direction of its
+    session (a device sends one message at a time) and can be lost,
+    duplicated or delayed (reordered). Results only depend on seed
+
+    Attributes
+    ----------
+    protocol : SCHCProtocol
+        Profile of sessions
+    mtu : int
+        MTU (in bytes) used to generate messages
+    loss : float
+        Probability of losing a message
+    duplication : float
+        Probability of delivering a message twice
+    reordering : float
+        Probability of delaying a message up to reorder_delay seconds
+        (so messages sent later can arrive first)
+    reorder_delay : float
+        Maximum delay of a reordered message in seconds
+    airtime : Callable[[int], float]
+        Seconds needed to send a message of a given number of bytes
+    now : float
+        Current time of simulation in seconds
+    wheel : TimerWheel
+        Wheel of timers of machines, driven by now
+    sessions : List[SimulatedSession]
+        Sessions simulated
+    """
+
+    def __init__(self, protocol=SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ON_ERROR, mtu=50, loss=0.0,
+                 duplication=0.0, reordering=0.0, reorder_delay=1.0, airtime=0.0, seed=0, resolution=0.1,
+                 fec_ratio=None):
+        """
+        Constructor
+
+        Parameters
+        ----------
+        protocol : int, optional
+            SCHC Protocol, default LoRaWAN
+        rule_id : int, optional
+            Rule ID of sessions, default LoRaWAN.ACK_ON_ERROR
+        mtu : int, optional
+            MTU in bytes, default 50
+        loss : float, optional
+            Probability of losing a message, default 0
+        duplication : float, optional
+            Probability of duplicating a message, default 0
+        reordering : float, optional
+            Probability of delaying a message, default 0
+        reorder_delay : float, optional
+            Maximum extra delay of a reordered message in seconds, default 1
+        airtime : float or Callable[[int], float], optional
+            Airtime of a message in seconds, or a function of its size in
+            bytes (e.g. lambda size: 0.05 + size * 8 / 5470), default 0
+        seed : int, optional
+            Seed of random decisions of channel, default 0
+        resolution : float, optional
+            Resolution of timers in seconds, default 0.1
+        fec_ratio : float, optional
+            Fraction of tiles of each window used as parity tiles, default
+            the one of profile
+        """
+        self.protocol = get_protocol(protocol, rule_id=rule_id, fec_ratio=fec_ratio)
+        self.mtu = mtu
+        self.loss = loss
+        self.duplication = duplication
+        self.reordering = reordering
+        self.reorder_delay = reorder_delay
+        self.airtime = airtime if callable(airtime) else (lambda size: airtime)
+        self.now = 0.0
+        self.wheel = TimerWheel(clock=lambda: self.now, resolution=resolution)
+        self.sessions = list()
+        self.__random__ = random.Random(seed)
+        self.__events__ = list()
+        self.__sequence__ = 0
+        self.__expired__ = list()
+        return
+
+    def __machines__(self):
+        if self.protocol.id == SCHCProtocol.LoRaWAN:
+            from schc_machines.lorawan import AckOnErrorSender, AckOnErrorReceiver, NoAckSender, NoAckReceiver
+            if self.protocol.RULE_ID == LoRaWAN.ACK_ON_ERROR:
+                return AckOnErrorSender, AckOnErrorReceiver
+            elif self.protocol.RULE_ID == LoRaWAN.NO_ACK:
+                return NoAckSender, NoAckReceiver
+        raise NotImplementedError("Just LoRaWAN Ack-on-Error and No-ACK are simulated")
+
+    def add_session(self, packet, start=0.0):
+        """
+        Adds a device fragmenting a packet
+
+        Parameters
+        ----------
+        packet : bytes
+            Packet to fragment
+        start : float, optional
+            Time (virtual) when fragmentation starts, default 0
+
+        Returns
+        -------
+        SimulatedSession :
+            Session added
+        """
+        sender_class, receiver_class = self.__machines__()
+        session = SimulatedSession(
+            len(self.sessions), packet,
+            sender_class(self.protocol, packet, wheel=self.wheel),
+            receiver_class(self.protocol, wheel=self.wheel),
+            start
+        )
+        self.__watch__(session, session.sender.retransmission_timer)
+        self.__watch__(session, session.receiver.inactivity_timer)
+        self.sessions.append(session)
+        self.__push__(start, session, None, None)
+        return session
+
+    def __watch__(self, session, timer):
+        """
+        Registers session to be flushed once timer expires
+        """
+        handler = timer.__handler__
+
+        def expire(alarm):
+            self.__expired__.append(session)
+            handler(alarm)
+        timer.__handler__ = expire
+        return
+
+    def __push__(self, time, session, direction, message):
+        heapq.heappush(self.__events__, (time, self.__sequence__, session, direction, message))
+        self.__sequence__ += 1
+        return
+
+    def __transmit__(self, session, direction, message):
+        """
+        Sends a message on the channel of session, scheduling its deliveries
+        """
+        content = message.as_bytes()
+        session.register(direction, message)
+        start = max(self.now, session.__free__[direction])
+        arrival = start + self.airtime(len(content))
+        session.__free__[direction] = arrival
+        copies = 2 if self.__random__.random() < self.duplication else 1
+        for _ in range(copies):
+            if self.__random__.random() < self.loss:
+                continue
+            delay = 0.0
+            if self.__random__.random() < self.reordering:
+                delay = self.__random__.uniform(0, self.reorder_delay)
+            self.__push__(arrival + delay, session, direction, content)
+        return
+
+    def __flush__(self, session):
+        """
+        Sends every message machines of session can generate now
+        """
+        for direction, machine in (("uplink", session.sender), ("downlink", session.receiver)):
+            while not session.is_finished():
+                try:
+                    self.__transmit__(session, direction, machine.generate_message(self.mtu))
+                except GeneratorExit:
+                    break
+                except SystemExit:
+                    break
+                except (RuntimeError, ValueError, AssertionError) as error:
+                    # message could not be generated nor encoded
+                    self.__fail__(session, error)
+                    break
+        if session.end is None and session.is_finished():
+            session.end = self.now
+            session.sender.stop_timers()
+            session.receiver.stop_timers()
+        return
+
+    def __fail__(self, session, error):
+        session.error = "{}: {}".format(error.__class__.__name__, error)
+        return
+
+    def __deliver__(self, session, direction, content):
+        """
+        Delivers a message to the peer of its direction
+        """
+        machine = session.receiver if direction == "uplink" else session.sender
+        try:
+            machine.receive_message(content)
+        except SystemExit:
+            pass  # machine already ended
+        except (RuntimeError, ValueError, AssertionError) as error:
+            self.__fail__(session, error)
+        return
+
+    def __advance__(self, now):
+        """
+        Expires timers up to now and flushes sessions of timers expired
+        """
+        if len(self.wheel) == 0:
+            return
+        self.wheel.advance(now)
+        expired, self.__expired__ = self.__expired__, list()
+        for session in expired:
+            if session.end is None:
+                self.__flush__(session)
+        return
+
+    def run(self, until=None):
+        """
+        Runs simulation until every session finishes, no more events are
+        pending (remaining sessions are stalled) or time reaches until
+
+        Parameters
+        ----------
+        until : float, optional
+            Time (virtual) limit in seconds, default no limit
+
+        Returns
+        -------
+        Dict[str, float] :
+            Report of simulation, see report
+        """
+        while True:
+            next_event = self.__events__[0][0] if len(self.__events__) != 0 else None
+            next_timer = self.wheel.next_expiration() if len(self.wheel) != 0 else None
+            if next_timer is not None and (next_event is None or next_timer < next_event):
+                if until is not None and next_timer > until:
+                    break
+                self.now = max(self.now, next_timer)
+                # half a tick more, so the tick of next_timer is reached whatever the rounding of now
+                self.__advance__(self.now + self.wheel.resolution / 2)
+            elif next_event is not None:
+                if until is not None and next_event > until:
+                    break
+                time, _, session, direction, content = heapq.heappop(self.__events__)
+                self.now = max(self.now, time)
+                self.__advance__(self.now)
+                if session.end is not None:
+                    continue
+                if content is not None:
+                    self.__deliver__(session, direction, content)
+                self.__flush__(session)
+            else:
+                break
+        if until is not None:
+            self.now = max(self.now, until)
+        return self.report()
+
+    def report(self):
+        """
+        Report of sessions simulated so far
+
+        Returns
+        -------
+        Dict[str, float] :
+            Sessions (total, delivered, failed, timeout and stalled ones,
+            timeout ones ended by the inactivity timer of receiver), time
+            (virtual seconds until the last session ended), messages and
+            bytes by direction, acks, retransmissions, ack_overhead
+            (downlink bytes per payload byte delivered) and goodput
+            (payload bits delivered per second)
+        """
+        delivered = [session for session in self.sessions if session.is_delivered()]
+        ended = [session for session in self.sessions if session.end is not None and not session.is_delivered()]
+        failed = [session for session in ended if not session.is_timeout()]
+        timeout = len(ended) - len(failed)
+        payload = sum(len(session.packet) for session in delivered)
+        ends = [session.end for session in self.sessions if session.end is not None]
+        time = max(ends) if len(ends) != 0 else self.now
+        downlink = sum(session.bytes["downlink"] for session in self.sessions)
+        return {
+            "sessions": len(self.sessions),
+            "delivered": len(delivered),
+            "failed": len(failed),
+            "timeout": timeout,
+            "stalled": len(self.sessions) - len(delivered) - len(ended),
+            "time": time,
+            "uplink_messages": sum(session.messages["uplink"] for session in self.sessions),
+            "downlink_messages": sum(session.messages["downlink"] for session in self.sessions),
+            "uplink_bytes": sum(session.bytes["uplink"] for session in self.sessions),
+            "downlink_bytes": downlink,
+            "acks": sum(session.acks for session in self.sessions),
+            "retransmissions": sum(session.retransmissions for session in self.sessions),
+            "ack_overhead": downlink / payload if payload != 0 else 0.0,
+            "goodput": payload * 8 / time if time > 0 else 0.0
+        }
@@ -0,0 +1,39 @@
+""" test_async: Test script of many devices fragmenting on one asyncio loop """
+
+import asyncio
+import logging
+from schc_handlers import SCHCGatewayHandler, SCHCNodeHandler
+from schc_protocols import LoRaWAN, SCHCProtocol
+from schc_runtime import SCHCAsyncRuntime
+from common_methods import HOST, MTU
+
+GATEWAY_PORT = 50008
+DEVICES = 200
+MESSAGE = b"Static Context Header Compression and fragmentation over LoRaWAN! " * 5 + b"Bye"
+
+
+async def main():
+    received = dict()
+    gateway = await SCHCAsyncRuntime.open(SCHCGatewayHandler, SCHCProtocol.LoRaWAN, (HOST, GATEWAY_PORT), mtu=MTU,
+                                         receive_buffer=1 << 22)
+    gateway.handler.session_listeners.append(
+        lambda rule_id, dtag, machine, device=None: received.update({device: machine.payload.as_bytes()}))
+    nodes = [
+        await SCHCAsyncRuntime.open(SCHCNodeHandler, SCHCProtocol.LoRaWAN, (HOST, 0), mtu=MTU)
+        for _ in range(DEVICES)
+    ]
+    sessions = [
+        node.send_package(MESSAGE, (HOST, GATEWAY_PORT), LoRaWAN.ACK_ON_ERROR)
+        for node in nodes
+    ]
+    machines = await asyncio.wait_for(asyncio.gather(*sessions), timeout=60)
+    for node in nodes + [gateway]:
+        node.close()
+    ended = sum(machine.__end_msg__ == "Message sent and acknowledged" for machine in machines)
+    correct = sum(payload == MESSAGE for payload in received.values())
+    print("{} sessions ended, {} packets reassembled correctly".format(ended, correct))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main())
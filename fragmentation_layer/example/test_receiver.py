@@ -24,13 +24,12 @@ if __name__ == '__main__':
 
     messaging_loop(receiver, socket_rx, SENDER_PORT)
 
-    packet = receiver.payload.as_bits()
-    residue = packet[0:7]
+    packet = receiver.payload.as_buffer()
+    residue = packet[0:7].as_bits()
     packet = packet[7:-1]
     assert len(packet) % 8 == 0
 
-    from schc_base import SCHCObject
-    message = SCHCObject.bits_2_bytes(packet)
+    message = packet.as_bytes()
     with open("received.txt", "w", encoding="utf-8") as received_file:
         received_file.write(message.decode("ascii"))
         received_file.write("\nAnd residue:\t{}\n".format(residue))
@@ -1,3 +1,6 @@
 """ test of schc_base package """
 
 from test_base.test_schc_object import SCHCObjectTest
+from test_base.test_bit_buffer import BitBufferTest
+from test_base.test_timer_wheel import TimerWheelTest
+from test_base.test_reassembly_buffer import ReassemblyBufferTest
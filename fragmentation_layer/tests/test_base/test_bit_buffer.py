@@ -0,0 +1,61 @@
+""" test_bit_buffer: Unit testing of BitBuffer class """
+
+from unittest import TestCase, main
+from schc_base import BitBuffer
+
+
+class BitBufferTest(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.hello = BitBuffer(b'Hello')
+        self.hello_bits = "01001000" + "01100101" + "01101100" + "01101100" + "01101111"
+
+    def test_constructors(self):
+        self.assertEqual(40, len(self.hello), "Wrong length from bytes")
+        self.assertEqual(self.hello_bits, self.hello.as_bits(), "Hello wrong encoded")
+        self.assertEqual(self.hello, BitBuffer.from_bits(self.hello_bits), "Wrong buffer from bits")
+        self.assertEqual("0011", BitBuffer.from_int(3, 4).as_bits(), "Wrong buffer from int")
+        self.assertEqual("010", BitBuffer(b'H', 3).as_bits(), "Wrong buffer from bytes and length")
+        self.assertEqual(0, len(BitBuffer()), "Empty buffer with content")
+        self.assertRaises(ValueError, BitBuffer.from_bits, "0120")
+        self.assertRaises(ValueError, BitBuffer.from_int, 4, 2)
+
+    def test_slices(self):
+        self.assertEqual(self.hello_bits[3:21], self.hello[3:21].as_bits(), "Wrong slice")
+        self.assertEqual(self.hello_bits[-7:], self.hello[-7:].as_bits(), "Wrong negative slice")
+        self.assertEqual(self.hello_bits[5:9][1:3], self.hello[5:9][1:3].as_bits(), "Wrong slice of slice")
+        self.assertEqual(0, len(self.hello[45:]), "Slice out of range not empty")
+        self.assertEqual(int(self.hello_bits[3:21], 2), self.hello[3:21].to_int(), "Wrong slice value")
+        self.assertEqual(1, self.hello[1], "Wrong bit")
+        self.assertEqual(1, self.hello[-1], "Wrong last bit")
+        self.assertEqual([int(i) for i in self.hello_bits[6:14]], list(self.hello[6:14]), "Wrong iteration")
+
+    def test_as_bytes(self):
+        self.assertEqual(b'Hello', self.hello.as_bytes(), "Wrong bytes")
+        self.assertEqual(b'ello', self.hello[8:].as_bytes(), "Wrong bytes of an aligned slice")
+        self.assertEqual(b'\x90', self.hello[1:5].as_bytes(), "Last byte not padded to the right")
+        self.assertEqual(b'\x90\xca', self.hello[1:16].as_bytes(), "Wrong bytes of an unaligned slice")
+
+    def test_append(self):
+        buffer = BitBuffer()
+        self.assertEqual(3, buffer.append("010"), "Wrong length after appending bits")
+        self.assertEqual(43, buffer.append(self.hello), "Wrong length after appending a buffer")
+        self.assertEqual(51, buffer.append(b'!'), "Wrong length after appending bytes")
+        self.assertEqual("010" + self.hello_bits + "00100001", buffer.as_bits(), "Wrong content after append")
+        view = buffer[3:11]
+        buffer.append("1")
+        self.assertEqual("01001000", view.as_bits(), "View changed after append")
+        self.assertEqual(buffer.as_bits(), BitBuffer.join(["010", self.hello, b'!', "1"]).as_bits(),
+                         "Join differs from append")
+        self.assertEqual("010" + self.hello_bits, ("010" + self.hello).as_bits(), "Wrong concatenation")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,32 +9,32 @@ class TestBitmap(TestCase):
 
     def test_constructor(self):
         bitmap = Bitmap(LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR))
-        self.assertEqual([False] * LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE, bitmap.__bitmap__,
+        self.assertEqual([False] * LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE, list(bitmap),
                          "Wrong bitmap generated")
-        self.assertEqual(LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE, len(bitmap.__bitmap__), "Wrong length of bitmap")
+        self.assertEqual(LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE, len(bitmap), "Wrong length of bitmap")
         bitmap = Bitmap(LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR), short_size=10)
-        self.assertEqual([False] * 10, bitmap.__bitmap__, "Wrong bitmap generated (short)")
-        self.assertEqual(10, len(bitmap.__bitmap__), "Wrong length of bitmap (short)")
+        self.assertEqual([False] * 10, list(bitmap), "Wrong bitmap generated (short)")
+        self.assertEqual(10, len(bitmap), "Wrong length of bitmap (short)")
 
     def test_register_tile(self):
         bitmap = Bitmap(LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR))
         bitmap.tile_received(LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE - 1)
-        self.assertTrue(bitmap.__bitmap__[0], "Wrong first tile registered")
+        self.assertTrue(list(bitmap)[0], "Wrong first tile registered")
         fcn = 30
         bitmap.tile_received(fcn)
-        self.assertTrue(bitmap.__bitmap__[LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE - fcn - 1],
+        self.assertTrue(list(bitmap)[LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE - fcn - 1],
                         "Wrong tile registered {}".format(fcn))
         bitmap.tile_received(0)
-        self.assertTrue(bitmap.__bitmap__[LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE - 1],
+        self.assertTrue(list(bitmap)[LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE - 1],
                         "Wrong last tile registered")
-        self.assertEqual(LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE, len(bitmap.__bitmap__),
-                         "Length changed")
-        self.assertEqual(3, sum(bitmap.__bitmap__), "Wrong registration")
+        self.assertEqual(LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR).WINDOW_SIZE, len(bitmap), "Length changed")
+        self.assertEqual(3, bitmap.received(), "Wrong registration")
 
     def test_compression_all_one(self):
         protocol_to_use = LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR)
         bitmap = Bitmap(protocol_to_use)
-        bitmap.__bitmap__ = [True] * protocol_to_use.WINDOW_SIZE
+        for fcn in range(protocol_to_use.WINDOW_SIZE):
+            bitmap.tile_received(fcn)
         compressed_bitmap = bitmap.generate_compress()
         self.assertEqual(
             protocol_to_use.L2_WORD - (sum([
@@ -57,8 +57,10 @@ class TestBitmap(TestCase):
     def test_compression(self):
         protocol_to_use = LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR)
         bitmap = Bitmap(protocol_to_use)
-        bitmap.__bitmap__ = [True] * protocol_to_use.WINDOW_SIZE
-        bitmap.__bitmap__[protocol_to_use.L2_WORD] = False
+        # every tile but the one on index L2_WORD of bitmap
+        for fcn in range(protocol_to_use.WINDOW_SIZE):
+            if fcn != protocol_to_use.WINDOW_SIZE - 1 - protocol_to_use.L2_WORD:
+                bitmap.tile_received(fcn)
         compressed_bitmap = bitmap.generate_compress()
         self.assertEqual(
             protocol_to_use.L2_WORD - (sum([
@@ -73,5 +75,35 @@ class TestBitmap(TestCase):
             sum(compressed_bitmap), "Wrong compression")
 
 
+    def test_missing(self):
+        protocol_to_use = LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR)
+        bitmap = Bitmap(protocol_to_use)
+        for fcn in range(protocol_to_use.WINDOW_SIZE):
+            if fcn not in (40, 7):
+                bitmap.tile_received(fcn)
+        self.assertEqual(protocol_to_use.WINDOW_SIZE - 2, bitmap.received(), "Wrong count of tiles")
+        self.assertTrue(bitmap.is_missing(), "Missing tiles not reported")
+        self.assertEqual(40, bitmap.get_missing(fcn=True), "Wrong first missing tile")
+        self.assertEqual(protocol_to_use.WINDOW_SIZE - 41, bitmap.get_missing(), "Wrong first missing index")
+        self.assertEqual([40, 7], list(bitmap.missing()), "Wrong missing tiles")
+        bitmap.tile_received(40)
+        bitmap.tile_received(7)
+        self.assertFalse(bitmap.is_missing(), "Missing tiles reported")
+        self.assertEqual([], list(bitmap.missing()), "Wrong missing tiles")
+        self.assertRaises(ValueError, bitmap.get_missing)
+
+    def test_from_compress_bitmap(self):
+        protocol_to_use = LoRaWAN(rule_id=LoRaWAN.ACK_ON_ERROR)
+        bitmap = Bitmap(protocol_to_use)
+        for fcn in range(protocol_to_use.WINDOW_SIZE):
+            if fcn != 50:
+                bitmap.tile_received(fcn)
+        compressed_bitmap = bitmap.generate_compress()
+        self.assertLess(len(compressed_bitmap), protocol_to_use.WINDOW_SIZE, "Bitmap not compressed")
+        calculated_bitmap = Bitmap.from_compress_bitmap(compressed_bitmap, protocol_to_use)
+        self.assertEqual(list(bitmap), list(calculated_bitmap), "Wrong bitmap calculated")
+        self.assertEqual([50], list(calculated_bitmap.missing()), "Wrong missing tiles")
+
+
 if __name__ == '__main__':
     main()
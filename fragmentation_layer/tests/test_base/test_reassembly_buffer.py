@@ -0,0 +1,82 @@
+""" test_reassembly_buffer: Unit testing of ReassemblyBuffer class """
+
+from unittest import TestCase, main
+from schc_base import ReassemblyBuffer, BitBuffer
+from schc_protocols import LoRaWAN
+
+
+class ReassemblyBufferTest(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.protocol = LoRaWAN(LoRaWAN.ACK_ON_ERROR)
+        self.tiles = [bytes([i]) * 10 for i in range(70)]
+
+    def test_out_of_order(self):
+        buffer = ReassemblyBuffer(self.protocol)
+        order = list(range(70))
+        order.reverse()
+        for i in order:
+            self.assertTrue(buffer.add_tile(i // 63, 62 - i % 63, self.tiles[i]), "Tile {} not written".format(i))
+        buffer.add_last_tile(BitBuffer(b'end'))
+        self.assertEqual(b''.join(self.tiles) + b'end', buffer.as_bytes(), "Wrong packet reassembled")
+        self.assertEqual((70 * 10 + 3) * 8, buffer.size, "Wrong size of packet")
+        self.assertEqual(self.protocol.calculate_rcs(buffer.as_buffer()), buffer.rcs(), "Wrong running RCS")
+
+    def test_duplicates(self):
+        buffer = ReassemblyBuffer(self.protocol)
+        self.assertTrue(buffer.add_tile(0, 62, BitBuffer(self.tiles[0])), "First tile not written")
+        self.assertFalse(buffer.add_tile(0, 62, self.tiles[1]), "Duplicated tile written")
+        self.assertTrue(buffer.has_tile(0, 62), "Tile received not found")
+        self.assertFalse(buffer.has_tile(1, 62), "Tile not received found")
+        self.assertEqual(self.tiles[0], buffer.as_bytes(), "Duplicated tile changed packet")
+
+    def test_last_tile_after_late_tile(self):
+        buffer = ReassemblyBuffer(self.protocol)
+        buffer.add_tile(0, 62, self.tiles[0])
+        buffer.add_last_tile(b'end')
+        self.assertEqual(self.protocol.calculate_rcs(BitBuffer(self.tiles[0] + b'end')), buffer.rcs(),
+                         "Wrong running RCS before late tile")
+        self.assertEqual(self.tiles[0] + b'end', buffer.as_bytes(), "Wrong packet before late tile")
+        buffer.add_tile(0, 61, self.tiles[1])
+        self.assertEqual(self.tiles[0] + self.tiles[1] + b'end', buffer.as_bytes(), "Wrong packet after late tile")
+        self.assertEqual(self.protocol.calculate_rcs(buffer.as_buffer()), buffer.rcs(),
+                         "Wrong running RCS after late tile")
+        buffer.add_tile(0, 59, self.tiles[4])
+        self.assertEqual(self.protocol.calculate_rcs(buffer.as_buffer()), buffer.rcs(), "Wrong RCS with a hole")
+
+    def test_rcs_with(self):
+        protocol = LoRaWAN(LoRaWAN.ACK_ON_ERROR)
+        protocol.set_fec_ratio(0.1)
+        buffer = ReassemblyBuffer(protocol)
+        for i in (0, 1, 3):
+            buffer.add_tile(0, 55 - i, self.tiles[i])
+        buffer.add_last_tile(b'end')
+        self.assertEqual(self.tiles[3], buffer.get_tile(0, 52), "Wrong tile")
+        self.assertIsNone(buffer.get_tile(0, 53), "Tile not received found")
+        expected = protocol.calculate_rcs(BitBuffer(b''.join(self.tiles[0:5]) + b'end'))
+        self.assertEqual(expected, buffer.rcs_with({53: self.tiles[2], 51: self.tiles[4]}, 0, 5),
+                         "Wrong RCS with tiles rebuilt")
+        self.assertNotEqual(expected, buffer.rcs_with({53: self.tiles[2]}, 0, 4), "Wrong RCS of fewer tiles")
+        self.assertIsNone(buffer.rcs_with({}, 0, 3), "Tiles after end ignored")
+        self.assertEqual(self.tiles[0] + self.tiles[1] + bytes(10) + self.tiles[3] + b'end', buffer.as_bytes(),
+                         "Packet altered")
+
+    def test_variable_tiles(self):
+        buffer = ReassemblyBuffer(LoRaWAN(LoRaWAN.ACK_ALWAYS))
+        self.assertTrue(buffer.add_tile(0, 0, b'Hello '), "First tile not written")
+        self.assertFalse(buffer.add_tile(0, 0, b'Hello '), "Retransmitted tile written")
+        self.assertTrue(buffer.add_tile(1, 0, b'World'), "Second tile not written")
+        buffer.add_last_tile(b'!')
+        self.assertEqual(b'Hello World!', buffer.as_bytes(), "Wrong packet reassembled")
+        self.assertEqual(buffer.protocol.calculate_rcs(BitBuffer(b'Hello World!')), buffer.rcs(), "Wrong running RCS")
+
+
+if __name__ == '__main__':
+    main()
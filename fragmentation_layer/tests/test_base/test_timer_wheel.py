@@ -0,0 +1,68 @@
+""" test_timer_wheel: Unit test of TimerWheel and SCHCTimer """
+
+from unittest import TestCase, main
+from schc_base import TimerWheel, SCHCTimer
+
+
+class TimerWheelTest(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.now = 0
+        self.wheel = TimerWheel(clock=lambda: self.now, resolution=1, buckets=8)
+        self.expired = list()
+
+    def timer(self, name, max_time):
+        return SCHCTimer(lambda timer: self.expired.append(name), max_time, wheel=self.wheel)
+
+    def test_expiration(self) -> None:
+        self.timer("late", 5)
+        self.timer("early", 2)
+        self.assertEqual(2, len(self.wheel), "Timers not scheduled")
+        self.assertEqual(0, self.wheel.advance(2), "Timer expired before its whole time")
+        self.assertEqual(1, self.wheel.advance(3), "Timer not expired")
+        self.assertEqual(["early"], self.expired, "Wrong timer expired")
+        self.wheel.advance(6)
+        self.assertEqual(["early", "late"], self.expired, "Timers not expired in order")
+        self.assertEqual(0, len(self.wheel), "Expired timers kept")
+
+    def test_reset_stop(self) -> None:
+        reset = self.timer("reset", 3)
+        stopped = self.timer("stopped", 3)
+        self.now = 2
+        reset.reset()
+        stopped.stop()
+        self.assertFalse(stopped.is_running(), "Stopped timer running")
+        self.wheel.advance(4)
+        self.assertEqual([], self.expired, "Timer expired after reset or stop")
+        self.wheel.advance(6)
+        self.assertEqual(["reset"], self.expired, "Reset timer not expired")
+        self.assertFalse(reset.is_running(), "Expired timer running")
+
+    def test_long_jump(self) -> None:
+        self.timer("second", 100)
+        self.timer("first", 20)
+        self.assertEqual(21, self.wheel.next_expiration(), "Wrong next expiration")
+        self.assertEqual(2, self.wheel.advance(1000), "Timers of more than a wheel round not expired")
+        self.assertEqual(["first", "second"], self.expired, "Timers not expired in order")
+        self.assertIsNone(self.wheel.next_expiration(), "Expiration without timers")
+
+    def test_reschedule_on_expiration(self) -> None:
+        def handler(timer):
+            self.expired.append(self.now)
+            if len(self.expired) < 3:
+                timer.reset()
+        SCHCTimer(handler, 2, wheel=self.wheel)
+        for self.now in range(10):
+            self.wheel.advance()
+        self.assertEqual([3, 6, 9], self.expired, "Timer not rescheduled from its handler")
+
+
+if __name__ == '__main__':
+    main()
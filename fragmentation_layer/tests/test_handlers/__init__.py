@@ -0,0 +1 @@
+""" test of schc_handlers package """
@@ -0,0 +1,51 @@
+""" test_handlers: Unit test of profiles of SCHCNodeHandler and SCHCGatewayHandler """
+
+from unittest import TestCase, main
+from schc_base import TimerWheel
+from schc_handlers import SCHCGatewayHandler, SCHCNodeHandler
+from schc_protocols import LoRaWAN, SCHCProtocol
+
+
+class TestHandlers(TestCase):
+
+    def test_profile(self) -> None:
+        node = SCHCNodeHandler(SCHCProtocol.LoRaWAN, wheel=TimerWheel(), fec_ratio=0.1)
+        self.assertEqual(0.1, node.get_profile(LoRaWAN.ACK_ON_ERROR).FEC_RATIO, "FEC ratio not set")
+        self.assertGreater(node.get_profile(LoRaWAN.ACK_ON_ERROR).FEC_TILES, 0, "No parity tiles")
+        # windows without fixed size tiles have no parity tiles
+        self.assertEqual(0, node.get_profile(LoRaWAN.NO_ACK).FEC_TILES, "Parity tiles on No-ACK mode")
+        self.assertEqual(0, node.get_profile(LoRaWAN.ACK_ALWAYS).FEC_TILES, "Parity tiles on Ack-Always mode")
+        self.assertEqual(0, SCHCNodeHandler(SCHCProtocol.LoRaWAN, wheel=TimerWheel()).get_profile(
+            LoRaWAN.ACK_ON_ERROR).FEC_TILES, "Parity tiles by default")
+
+    def test_fec_round_trip(self) -> None:
+        wheel = TimerWheel()
+        packet = bytes(i % 256 for i in range(635))
+        received = list()
+        gateway = SCHCGatewayHandler(SCHCProtocol.LoRaWAN, wheel=wheel, fec_ratio=0.1)
+        gateway.session_listeners.append(lambda rule_id, dtag, machine, device=None: received.append(machine))
+        node = SCHCNodeHandler(SCHCProtocol.LoRaWAN, wheel=wheel, fec_ratio=0.1)
+        node.send_package(LoRaWAN.ACK_ON_ERROR, packet)
+        sent = list()
+        for _ in range(100):
+            if len(node.__sessions__) == 0:
+                break
+            while True:
+                # one tile by fragment
+                message = node.generate_message(LoRaWAN.ACK_ON_ERROR, None, mtu=12)
+                if message == b'':
+                    break
+                sent.append(message)
+                if len(sent) != 5:  # a tile of window 0 is lost
+                    gateway.receive(LoRaWAN.ACK_ON_ERROR, None, message, device=b'device01')
+            ack = gateway.generate_message(LoRaWAN.ACK_ON_ERROR, None, mtu=12, device=b'device01')
+            if ack != b'':
+                node.receive(LoRaWAN.ACK_ON_ERROR, None, ack)
+        self.assertEqual(1, len(received), "Packet not reassembled")
+        self.assertGreater(received[0].protocol.FEC_TILES, 0, "Receiver without parity tiles")
+        self.assertEqual(packet, received[0].payload.as_bytes(), "Wrong packet reassembled")
+        self.assertEqual(1, sent.count(sent[4]), "Tile lost sent again instead of rebuilt from parity")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+""" test_session_table: Unit test of SCHCSessionTable and its use by handlers """
+
+from unittest import TestCase, main
+from schc_base import TimerWheel
+from schc_handlers import SCHCSessionTable, SCHCNodeHandler, SCHCGatewayHandler
+from schc_machines.lorawan import AckOnErrorSender
+from schc_protocols import LoRaWAN, SCHCProtocol
+
+
+class Clock:
+    """
+    Manual clock
+    """
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionTable(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.clock = Clock()
+        self.table = SCHCSessionTable(max_sessions=3, clock=self.clock)
+
+    @staticmethod
+    def machine():
+        return AckOnErrorSender(LoRaWAN(LoRaWAN.ACK_ON_ERROR), b'Hello World, Hello World, Hello World')
+
+    def test_add_get(self) -> None:
+        first = self.table.add(b'device01', LoRaWAN.ACK_ON_ERROR, None, self.machine())
+        second = self.table.add(b'device02', LoRaWAN.ACK_ON_ERROR, None, self.machine())
+        self.assertEqual(2, len(self.table), "Sessions of different devices merged")
+        self.assertIs(first, self.table.get(b'device01', LoRaWAN.ACK_ON_ERROR, None), "Wrong machine of device01")
+        self.assertIs(second, self.table.get(b'device02', LoRaWAN.ACK_ON_ERROR, None), "Wrong machine of device02")
+        self.assertIs(first, self.table.add(b'device01', LoRaWAN.ACK_ON_ERROR, None, self.machine()),
+                      "Existing session replaced")
+        self.assertIsNone(self.table.get(b'device03', LoRaWAN.ACK_ON_ERROR, None), "Unknown session found")
+        self.assertIs(first, self.table.remove(b'device01', LoRaWAN.ACK_ON_ERROR, None), "Wrong machine removed")
+        self.assertNotIn((b'device01', LoRaWAN.ACK_ON_ERROR, None), self.table, "Session not removed")
+
+    def test_evict_idle(self) -> None:
+        inactivity_timer = LoRaWAN(LoRaWAN.ACK_ON_ERROR).INACTIVITY_TIMER
+        self.table.add(b'device01', LoRaWAN.ACK_ON_ERROR, None, self.machine())
+        self.clock.now = 6
+        self.table.add(b'device02', LoRaWAN.ACK_ON_ERROR, None, self.machine())
+        self.clock.now = 9
+        self.table.get(b'device01', LoRaWAN.ACK_ON_ERROR, None)
+        self.clock.now = 6 + inactivity_timer
+        self.assertEqual(1, len(self.table.evict_idle()), "Idle session not evicted")
+        self.assertIn((b'device01', LoRaWAN.ACK_ON_ERROR, None), self.table, "Active session evicted")
+        self.clock.now = 9 + inactivity_timer
+        self.assertEqual(1, len(self.table.evict_idle()), "Idle session not evicted")
+        self.assertEqual(0, len(self.table), "Sessions left")
+
+    def test_max_sessions(self) -> None:
+        for i in range(3):
+            self.clock.now = i
+            self.table.add(i, LoRaWAN.ACK_ON_ERROR, None, self.machine())
+        self.table.get(0, LoRaWAN.ACK_ON_ERROR, None)
+        self.table.add(3, LoRaWAN.ACK_ON_ERROR, None, self.machine())
+        self.assertEqual(3, len(self.table), "Hard limit exceeded")
+        self.assertNotIn((1, LoRaWAN.ACK_ON_ERROR, None), self.table, "Least recently used session kept")
+        self.assertIn((0, LoRaWAN.ACK_ON_ERROR, None), self.table, "Recently used session evicted")
+
+    def test_on_evicted(self) -> None:
+        evicted = list()
+        self.table.on_evicted = lambda key, machine: evicted.append(key)
+        for i in range(4):
+            self.clock.now = i
+            self.table.add(i, LoRaWAN.ACK_ON_ERROR, None, self.machine())
+        self.assertEqual([(0, LoRaWAN.ACK_ON_ERROR, None)], evicted, "Least recently used session not reported")
+        self.clock.now = 100
+        self.table.evict_idle()
+        self.assertEqual(4, len(evicted), "Idle sessions not reported")
+
+    def test_handlers(self) -> None:
+        messages = {b'device01': b'Hello World! ' * 21, b'device02': bytes(range(256)) * 2,
+                    b'device03': b'Tile sized' * 26}
+        received = dict()
+
+        class Gateway(SCHCGatewayHandler):
+            def on_session_finished(self, rule_id, dtag, machine, device=None):
+                received[device] = machine.payload.as_bytes()
+
+        gateway = Gateway(SCHCProtocol.LoRaWAN)
+        nodes = dict()
+        for device, message in messages.items():
+            nodes[device] = SCHCNodeHandler(SCHCProtocol.LoRaWAN)
+            nodes[device].send_package(LoRaWAN.ACK_ON_ERROR, message)
+        for _ in range(100):
+            for device, node in nodes.items():
+                if len(node.__sessions__) == 0:
+                    continue
+                while True:
+                    message = node.generate_message(LoRaWAN.ACK_ON_ERROR, None, mtu=50)
+                    if message == b'':
+                        break
+                    gateway.receive(LoRaWAN.ACK_ON_ERROR, None, message, device=device)
+                if len(gateway.__sessions__) == 0:
+                    continue
+                ack = gateway.generate_message(LoRaWAN.ACK_ON_ERROR, None, mtu=50, device=device)
+                if ack != b'':
+                    node.receive(LoRaWAN.ACK_ON_ERROR, None, ack)
+        self.assertEqual(messages, received, "Packets of devices wrong reassembled")
+        for key in gateway.__sessions__:
+            self.assertTrue(gateway.__sessions__.is_tombstone(*key), "Finished session kept as an active one")
+        gateway.__sessions__.evict_idle(now=gateway.__sessions__.clock() + 3600)
+        self.assertEqual(0, len(gateway.__sessions__), "Finished sessions kept on gateway")
+        for node in nodes.values():
+            self.assertEqual(0, len(node.__sessions__), "Finished sessions kept on node")
+
+    def test_lost_last_ack(self) -> None:
+        wheel = TimerWheel(clock=self.clock)
+        received = list()
+        gateway = SCHCGatewayHandler(SCHCProtocol.LoRaWAN, wheel=wheel)
+        gateway.session_listeners.append(lambda rule_id, dtag, machine, device=None: received.append(machine))
+        node = SCHCNodeHandler(SCHCProtocol.LoRaWAN, wheel=wheel)
+        packet = bytes(range(256))
+        node.send_package(LoRaWAN.ACK_ON_ERROR, packet)
+        while True:
+            message = node.generate_message(LoRaWAN.ACK_ON_ERROR, None, mtu=50)
+            if message == b'':
+                break
+            gateway.receive(LoRaWAN.ACK_ON_ERROR, None, message, device=b'device01')
+        # last Ack is lost, then the first Ack Request too
+        self.assertNotEqual(b'', gateway.generate_message(LoRaWAN.ACK_ON_ERROR, None, device=b'device01'))
+        self.assertEqual(1, len(received), "Session not finished")
+        for _ in range(2):
+            self.clock.now += LoRaWAN(LoRaWAN.ACK_ON_ERROR).RETRANSMISSION_TIMER + 1
+            wheel.advance()
+            ack_req = node.generate_message(LoRaWAN.ACK_ON_ERROR, None, mtu=50)
+        gateway.receive(LoRaWAN.ACK_ON_ERROR, None, ack_req, device=b'device01')
+        ack = gateway.generate_message(LoRaWAN.ACK_ON_ERROR, None, device=b'device01')
+        try:
+            node.receive(LoRaWAN.ACK_ON_ERROR, None, ack)
+        except SystemExit:
+            pass
+        self.assertEqual(0, len(node.__sessions__), "Last Ack not answered again")
+        self.assertEqual(1, len(received), "Packet reassembled twice")
+        self.assertEqual(packet, received[0].payload.as_bytes()[0:len(packet)], "Wrong packet reassembled")
+        # a new packet replaces the finished session
+        node.send_package(LoRaWAN.ACK_ON_ERROR, packet[0:100])
+        gateway.receive(LoRaWAN.ACK_ON_ERROR, None, node.generate_message(LoRaWAN.ACK_ON_ERROR, None, mtu=50),
+                        device=b'device01')
+        self.assertFalse(gateway.__sessions__.is_tombstone(b'device01', LoRaWAN.ACK_ON_ERROR, None),
+                         "New packet received by finished session")
+
+
+if __name__ == '__main__':
+    main()
@@ -125,6 +125,18 @@ class TestParserLoRaWAN(TestCase):
             "SCHC ACK Request not parsed (ack_on_error mode)"
         )
 
+    def test_sender_abort(self):
+        # AckOnError
+        expected_send_abort = SCHCParser.from_bytes(LoRaWAN(), b'\x14\xff')
+        self.assertEqual(
+            "|- Sender-Abort Header        -|\n" +
+            "         |-- M=2 --|--- N=6 ---|\n" +
+            "| RuleID | W       | FCN       |\n" +
+            "|00010100|11       |111111     |",
+            expected_send_abort.as_text(),
+            "SCHC Sender Abort not parsed (ack_on_error mode)"
+        )
+
     def test_receiver_abort(self):
         # AckOnError
         expected_rec_abort = SCHCParser.from_bytes(LoRaWAN(), b'\x14\xff\xff')
@@ -147,6 +159,49 @@ class TestParserLoRaWAN(TestCase):
             "SCHC Receiver Abort not parsed (downlink mode)"
         )
 
+    def test_no_ack(self):
+        expected_regular = SCHCParser.from_bytes(LoRaWAN(), b'\x17\x1e\x80')
+        self.assertEqual(
+            "|--- SCHC Fragment Header ---|\n" +
+            "         |--- N=1 ---|\n" +
+            "| RuleID | FCN       | Fragment Payload | padding |\n" +
+            "|00010111|0          |00111101          |0000000  |",
+            expected_regular.as_text(),
+            "SCHC Fragment not parsed (no_ack mode)"
+        )
+        expected_all1 = SCHCParser.from_bytes(LoRaWAN(), b'\x17\x9f)\xf5x\x90\x80')
+        self.assertEqual(
+            "|--- SCHC Fragment Header                          ---|\n" +
+            "         |--- N=1 ---| U=32                           |\n" +
+            "| RuleID | FCN       | RCS                            | Fragment Payload | padding |\n" +
+            "|00010111|1          |00111110010100111110101011110001|00100001          |0000000  |",
+            expected_all1.as_text(),
+            "SCHC All-1 not parsed (no_ack mode)"
+        )
+        expected_send_abort = SCHCParser.from_bytes(LoRaWAN(), b'\x17\x80')
+        self.assertEqual(
+            "|- Sender-Abort Header -|\n" +
+            "         |--- N=1 ---|\n" +
+            "| RuleID | FCN       | padding |\n" +
+            "|00010111|1          |0000000  |",
+            expected_send_abort.as_text(),
+            "SCHC Sender Abort not parsed (no_ack mode)"
+        )
+
+    def test_round_trip(self):
+        for received in [b'\x14\x3e' + bytes(range(40)), b'\x14\xbf\xac\xde2\x14HelloWorld', b'\x14W', b'\x14@',
+                         b'\x15\x12\x00', b'\x15 ', b'\x14\xff\xff', b'\x14\xff', b'\x17\x1e\x80',
+                         b'\x17\x9f)\xf5x\x90\x80', b'\x17\x80']:
+            self.assertEqual(received, SCHCParser.from_bytes(LoRaWAN(), received).as_bytes(),
+                             "Message changed after parsing {}".format(received))
+
+    def test_errors(self):
+        self.assertRaises(ValueError, SCHCParser.from_bytes, LoRaWAN(), b'\x14')
+        self.assertRaises(ValueError, SCHCParser.from_bytes, LoRaWAN(), b'\x03HelloWorld')
+        self.assertRaises(RuntimeError, SCHCParser.from_bytes, LoRaWAN(), b'\x16HelloWorld')
+        self.assertRaises(ValueError, SCHCParser.from_bytes, LoRaWAN(), b'\x17\x80\x00')
+        self.assertRaises(AssertionError, SCHCParser.from_bytes, LoRaWAN(), b'\x14\x3f\xff')
+
 
 if __name__ == '__main__':
     main()
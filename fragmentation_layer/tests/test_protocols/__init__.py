@@ -0,0 +1,3 @@
+""" test of schc_protocols package """
+
+from test_protocols.test_profiles import ProfilesTest
@@ -0,0 +1,52 @@
+""" test_profiles: Unit test of profiles given by get_protocol """
+
+from unittest import TestCase, main
+from schc_protocols import LoRaWAN, SCHCProtocol, get_protocol
+
+
+class ProfilesTest(TestCase):
+
+    def test_interned(self):
+        profile = get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ON_ERROR)
+        self.assertIs(profile, get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ON_ERROR), "Profile not shared")
+        self.assertIsNot(profile, get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ALWAYS),
+                         "Profiles of different Rule ID shared")
+        self.assertEqual(LoRaWAN.ACK_ON_ERROR, profile.RULE_ID, "Wrong Rule ID")
+
+    def test_frozen(self):
+        profile = get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ALWAYS)
+        self.assertRaises(AttributeError, profile.set_rule_id, LoRaWAN.ACK_ON_ERROR)
+        self.assertEqual(LoRaWAN.ACK_ALWAYS, profile.RULE_ID, "Profile altered")
+        protocol = LoRaWAN()
+        protocol.set_rule_id(LoRaWAN.ACK_ALWAYS)
+        self.assertEqual(profile.WINDOW_SIZE, protocol.WINDOW_SIZE, "Own instance not altered")
+
+    def test_derived_sizes(self):
+        profile = get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ON_ERROR)
+        self.assertEqual(16, profile.FRAGMENT_HEADER_SIZE, "Wrong fragment header size")
+        self.assertEqual(11, profile.ACK_HEADER_SIZE, "Wrong ACK header size")
+        self.assertEqual(63, profile.ALL1_FCN, "Wrong All-1 FCN")
+        self.assertEqual(10, profile.TILE_BYTES, "Wrong tile size")
+        self.assertEqual(64, len(profile.COMPRESSED_BITMAP_SIZES), "Wrong compressed bitmap sizes")
+        self.assertEqual((5, 5, 13, 69), tuple(profile.COMPRESSED_BITMAP_SIZES[size] for size in (0, 5, 6, 63)),
+                         "Compressed bitmap not aligned to L2 word")
+
+    def test_fec_ratio(self):
+        profile = get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ON_ERROR, fec_ratio=0.1)
+        self.assertIs(profile, get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ON_ERROR, fec_ratio=0.1),
+                      "Profile not shared")
+        self.assertEqual(7, profile.FEC_TILES, "Wrong number of parity tiles")
+        self.assertEqual(56, profile.WINDOW_TILES, "Wrong number of tiles of packet")
+        default = get_protocol(SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ON_ERROR)
+        self.assertEqual((0, 63), (default.FEC_TILES, default.WINDOW_TILES), "FEC enabled by default")
+        self.assertRaises(ValueError, get_protocol, SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ON_ERROR, fec_ratio=0.6)
+        self.assertRaises(ValueError, get_protocol, SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.ACK_ALWAYS, fec_ratio=0.1)
+
+    def test_errors(self):
+        self.assertRaises(ValueError, get_protocol, SCHCProtocol.LoRaWAN, rule_id=3)
+        self.assertRaises(RuntimeError, get_protocol, SCHCProtocol.LoRaWAN, rule_id=LoRaWAN.NOT_POSSIBLE)
+        self.assertRaises(NotImplementedError, get_protocol, SCHCProtocol.Sigfox)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+""" test of schc_runtime package """
@@ -0,0 +1,80 @@
+""" test_async_runtime: Unit test of SCHCAsyncRuntime """
+
+import asyncio
+from unittest import TestCase, main
+from schc_handlers import SCHCGatewayHandler, SCHCNodeHandler, SCHCSessionTable
+from schc_protocols import LoRaWAN, SCHCProtocol
+from schc_runtime import SCHCAsyncRuntime
+
+HOST = "127.0.0.1"
+
+
+class TestAsyncRuntime(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.messages = [
+            b'Hello World! ' * 21,
+            bytes(range(256)) * 2 + b'!',
+            b'Static Context Header Compression' * 3
+        ]
+
+    async def fragment(self, fec_ratio=None):
+        received = dict()
+        gateway = await SCHCAsyncRuntime.open(SCHCGatewayHandler, SCHCProtocol.LoRaWAN, (HOST, 0), fec_ratio=fec_ratio)
+        gateway.handler.session_listeners.append(
+            lambda rule_id, dtag, machine, device=None: received.update({device: machine.payload.as_bytes()}))
+        address = gateway.transport.get_extra_info("sockname")
+        nodes = [await SCHCAsyncRuntime.open(SCHCNodeHandler, SCHCProtocol.LoRaWAN, (HOST, 0), fec_ratio=fec_ratio)
+                 for _ in self.messages]
+        sessions = [node.send_package(message, address, LoRaWAN.ACK_ON_ERROR)
+                    for node, message in zip(nodes, self.messages)]
+        machines = await asyncio.wait_for(asyncio.gather(*sessions), timeout=10)
+        devices = [node.transport.get_extra_info("sockname") for node in nodes]
+        for runtime in nodes + [gateway]:
+            runtime.close()
+        # finished receivers are kept (as tombstones) just to send the last Ack again
+        active = [[key for key in runtime.handler.__sessions__ if not runtime.handler.__sessions__.is_tombstone(*key)]
+                  for runtime in nodes + [gateway]]
+        return machines, devices, received, [len(keys) for keys in active]
+
+    async def evict(self):
+        node = await SCHCAsyncRuntime.open(SCHCNodeHandler, SCHCProtocol.LoRaWAN, (HOST, 0), max_sessions=1)
+        # nobody answers on those endpoints
+        first = node.send_package(self.messages[0], (HOST, 9), LoRaWAN.ACK_ON_ERROR)
+        second = node.send_package(self.messages[1], (HOST, 10), LoRaWAN.ACK_ON_ERROR)
+        machine = await asyncio.wait_for(first, timeout=1)
+        pending = len(node.__finished__)
+        node.close()
+        second.cancel()
+        return machine, pending
+
+    def test_fragmentation(self) -> None:
+        machines, devices, received, sessions = asyncio.run(self.fragment())
+        for machine in machines:
+            self.assertEqual("Message sent and acknowledged", machine.__end_msg__, "Session not ended")
+        for device, message in zip(devices, self.messages):
+            self.assertEqual(message, received[device], "Wrong message reassembled")
+        self.assertEqual([0] * len(sessions), sessions, "Finished sessions not released")
+
+    def test_fec(self) -> None:
+        machines, devices, received, _ = asyncio.run(self.fragment(fec_ratio=0.1))
+        for machine in machines:
+            self.assertGreater(machine.protocol.FEC_TILES, 0, "Sender without parity tiles")
+        for device, message in zip(devices, self.messages):
+            self.assertEqual(message, received[device], "Wrong message reassembled")
+
+    def test_eviction(self) -> None:
+        machine, pending = asyncio.run(self.evict())
+        self.assertFalse(SCHCSessionTable.is_finished(machine), "Evicted session finished")
+        self.assertEqual(1, pending, "Future of evicted session kept")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+""" test_simulator: Unit test of SCHCSimulator """
+
+from time import monotonic
+from unittest import TestCase, main
+from schc_base import BitBuffer
+from schc_machines import SCHCFiniteStateMachine
+from schc_messages import All1SCHCFragment, RegularSCHCFragment, SCHCSenderAbort
+from schc_protocols import LoRaWAN
+from schc_runtime import SCHCSimulator
+
+
+class DroppingSimulator(SCHCSimulator):
+    """
+    Simulator losing the first times messages sent for which drop returns True
+    """
+    def __init__(self, drop, times=1, **kwargs):
+        super().__init__(**kwargs)
+        self.drop = drop
+        self.times = times
+        self.dropped = list()
+
+    def __transmit__(self, session, direction, message):
+        if len(self.dropped) < self.times and self.drop(message):
+            self.dropped.append(message)
+            session.register(direction, message)
+            return
+        super().__transmit__(session, direction, message)
+
+
+class TestSimulator(TestCase):
+
+    def setUp(self) -> None:
+        """
+        Sets up unit test
+
+        Returns
+        -------
+        None
+        """
+        self.packets = [bytes((i + j) % 256 for j in range(100 + 37 * i)) for i in range(12)]
+
+    def simulate(self, **kwargs):
+        simulator = SCHCSimulator(**kwargs)
+        for i, packet in enumerate(self.packets):
+            simulator.add_session(packet, start=i * 2.0)
+        return simulator, simulator.run()
+
+    def test_reliable_channel(self):
+        simulator, report = self.simulate(airtime=lambda size: 0.05 + size * 8 / 5470)
+        self.assertEqual(len(self.packets), report["delivered"], "Packets not delivered")
+        self.assertEqual(0, report["retransmissions"], "Retransmissions on a reliable channel")
+        self.assertEqual(len(self.packets), report["acks"], "Wrong number of ACKs")
+        self.assertGreater(report["goodput"], 0, "No goodput")
+        self.assertGreater(report["time"], (len(self.packets) - 1) * 2.0, "Airtime not simulated")
+        for session in simulator.sessions:
+            self.assertEqual(session.packet, session.receiver.payload.as_bytes()[0:len(session.packet)],
+                             "Wrong packet reassembled")
+        # a session is delivered only with the packet sent
+        simulator.sessions[0].packet = bytes(len(self.packets[0]))
+        self.assertEqual(len(self.packets) - 1, simulator.report()["delivered"], "Wrong packet delivered")
+
+    def test_deterministic(self):
+        _, report = self.simulate(loss=0.1, duplication=0.1, reordering=0.1, seed=7)
+        _, same_report = self.simulate(loss=0.1, duplication=0.1, reordering=0.1, seed=7)
+        self.assertEqual(report, same_report, "Simulation depends on more than seed")
+
+    def test_virtual_clock(self):
+        start = monotonic()
+        _, report = self.simulate(loss=0.3, seed=1)
+        self.assertLess(monotonic() - start, 5, "Timers waited for real time")
+        self.assertEqual(len(self.packets), report["delivered"] + report["failed"] + report["timeout"]
+                         + report["stalled"], "Sessions not reported")
+        self.assertGreater(report["retransmissions"], 0, "No loss simulated")
+
+    def test_lossy_channel(self):
+        simulator, report = self.simulate(loss=0.1, seed=1, airtime=lambda size: 0.05 + size * 8 / 5470)
+        self.assertEqual(len(self.packets), report["delivered"], "Missing tiles not retransmitted")
+        self.assertGreater(report["retransmissions"], 0, "No loss simulated")
+        for session in simulator.sessions:
+            self.assertEqual(session.packet, session.receiver.payload.as_bytes()[0:len(session.packet)],
+                             "Wrong packet reassembled")
+
+    def test_fec(self):
+        _, report = self.simulate(loss=0.05, seed=1)
+        simulator, fec_report = self.simulate(loss=0.05, seed=1, fec_ratio=0.1)
+        self.assertEqual(len(self.packets), fec_report["delivered"], "Packets not delivered")
+        self.assertLess(fec_report["retransmissions"], report["retransmissions"], "Tiles not rebuilt from parity")
+        for session in simulator.sessions:
+            self.assertEqual(session.packet, session.receiver.payload.as_bytes()[0:len(session.packet)],
+                             "Wrong packet reassembled")
+
+    def test_packet_too_large(self):
+        packet = bytes(i % 256 for i in range(2000))
+        simulator = SCHCSimulator()
+        simulator.add_session(packet)
+        self.assertEqual(1, simulator.run()["delivered"], "Packet on 4 windows not delivered")
+        # parity tiles leave room for 4 * 44 tiles of 10 bytes
+        self.assertRaises(ValueError, SCHCSimulator(fec_ratio=0.3).add_session, packet)
+        self.assertRaises(ValueError, SCHCSimulator().add_session, packet + bytes(521))
+
+    def test_no_ack(self):
+        simulator, report = self.simulate(rule_id=LoRaWAN.NO_ACK, airtime=lambda size: 0.05 + size * 8 / 5470)
+        self.assertEqual(len(self.packets), report["delivered"], "Packets not delivered")
+        self.assertEqual(0, report["downlink_messages"], "Messages sent by receiver on No-ACK mode")
+        for session in simulator.sessions:
+            self.assertEqual(session.packet, session.receiver.payload.as_bytes(), "Wrong packet reassembled")
+        _, report = self.simulate(rule_id=LoRaWAN.NO_ACK, loss=0.1, seed=1)
+        self.assertEqual(0, report["retransmissions"], "Fragments retransmitted on No-ACK mode")
+        self.assertGreater(report["failed"], 0, "Lost fragments not detected")
+        self.assertEqual(0, report["stalled"], "Sessions not finished by inactivity timer")
+
+    def test_bit_buffer_packet(self):
+        # e.g. a SCHC Packet written by a compressor, with 4 bits of padding
+        packet = BitBuffer(self.packets[3][:-1] + b'\xa0', length=len(self.packets[3]) * 8 - 4)
+        for rule_id in (LoRaWAN.ACK_ON_ERROR, LoRaWAN.NO_ACK):
+            simulator = SCHCSimulator(rule_id=rule_id)
+            session = simulator.add_session(packet)
+            self.assertEqual(1, simulator.run()["delivered"], "Packet not delivered")
+            self.assertEqual(packet.as_bytes(), session.receiver.payload.as_bytes(), "Wrong packet reassembled")
+
+    def test_lost_all1_of_next_window(self):
+        # All-1 is the only fragment of window 1
+        simulator = DroppingSimulator(
+            lambda message: isinstance(message, All1SCHCFragment) and message.header.w.w == 1)
+        packet = bytes(i % 256 for i in range(635))
+        session = simulator.add_session(packet)
+        report = simulator.run()
+        self.assertEqual(1, len(simulator.dropped), "All-1 of window 1 not sent")
+        self.assertEqual(1, report["delivered"], "Window lost entirely not requested again")
+        self.assertEqual(packet, session.receiver.payload.as_bytes()[0:len(packet)], "Wrong packet reassembled")
+
+    def test_tile_always_lost(self):
+        # one tile per fragment, the tile of fcn 60 of window 0 never arrives while Acks do
+        simulator = DroppingSimulator(
+            lambda message: isinstance(message, RegularSCHCFragment) and message.header.w.w == 0
+            and message.header.fcn.fcn == 60, times=1000, mtu=12)
+        session = simulator.add_session(bytes(i % 256 for i in range(635)))
+        report = simulator.run()
+        self.assertIsInstance(session.sender.state, SCHCFiniteStateMachine.ErrorState, "Sender not aborted")
+        # first time and one retransmission by attempt
+        self.assertEqual(1 + simulator.protocol.MAX_ACK_REQUEST, len(simulator.dropped),
+                         "Tile sent again after MAX_ACK_REQUEST attempts")
+        self.assertEqual(1, report["failed"], "Aborted session not failed")
+        self.assertIsInstance(session.receiver.state, SCHCFiniteStateMachine.ErrorState,
+                              "Sender-Abort not received")
+
+    def test_lost_sender_abort(self):
+        simulator = DroppingSimulator(
+            lambda message: isinstance(message, SCHCSenderAbort) or isinstance(message, RegularSCHCFragment)
+            and message.header.w.w == 0 and message.header.fcn.fcn == 60, times=1000, mtu=12)
+        session = simulator.add_session(bytes(i % 256 for i in range(635)))
+        report = simulator.run()
+        self.assertIsInstance(simulator.dropped[-1], SCHCSenderAbort, "Sender-Abort not sent")
+        self.assertEqual(1, report["timeout"], "Receiver not stopped by inactivity timer")
+        self.assertEqual(0, report["stalled"], "Session stalled")
+        self.assertEqual(0, report["failed"], "Timeout reported as a failure")
+        self.assertIsNotNone(session.end, "Session not ended")
+
+    def test_high_loss(self):
+        _, report = self.simulate(loss=0.6, seed=3)
+        self.assertEqual(0, report["stalled"], "Sessions stalled")
+        self.assertGreater(report["timeout"], 0, "Receivers not stopped by inactivity timer")
+        self.assertEqual(len(self.packets), report["delivered"] + report["failed"] + report["timeout"],
+                         "Sessions not reported")
+
+    def test_broken_session(self):
+        simulator = SCHCSimulator()
+        broken = simulator.add_session(self.packets[0])
+        broken.sender.__cw__ = 1 << simulator.protocol.M  # W cannot be encoded
+        simulator.add_session(self.packets[1])
+        report = simulator.run()
+        self.assertIsNotNone(broken.error, "Error of session not recorded")
+        self.assertEqual(1, report["failed"], "Broken session not failed")
+        self.assertEqual(1, report["delivered"], "Other sessions stopped by a broken one")
+
+    def test_until(self):
+        simulator = SCHCSimulator(airtime=1.0)
+        simulator.add_session(self.packets[-1])
+        report = simulator.run(until=2.5)
+        self.assertEqual(2.5, simulator.now, "Time limit not reached")
+        self.assertEqual(0, report["delivered"], "Packet delivered before its airtime")
+        self.assertEqual(1, simulator.run()["delivered"], "Simulation not resumed")
+
+
+if __name__ == '__main__':
+    main()